@@ -17,10 +17,24 @@ target_metadata = Base.metadata
 # access to the values within the .ini file in use.
 config = context.config
 
+# URL БД можно передать из приложения: alembic -x db_url=... upgrade head
+db_url = context.get_x_argument(as_dictionary=True).get("db_url")
+if db_url:
+    config.set_main_option("sqlalchemy.url", db_url)
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    # Не отключаем логгеры приложения, если миграции запущены в его процессе
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+
+def include_object(object_, name, type_, reflected, compare_to):
+    """Исключает из автогенерации индексы FTS5 и их служебные таблицы."""
+    if type_ == "table" and name and "_fts" in name:
+        return False
+    return True
+
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -46,6 +60,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -67,7 +82,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,42 @@
+"""add_change_versions_table
+
+Revision ID: 5b2d7e91c4a0
+Revises: 88c32b2b47dd
+Create Date: 2026-10-18 10:12:41.532107
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2d7e91c4a0'
+down_revision: Union[str, None] = '88c32b2b47dd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ('factories', 'sections', 'equipment', 'section_equipment_association')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    change_versions = op.create_table(
+        'change_versions',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    op.bulk_insert(
+        change_versions,
+        [{'table_name': name, 'version': 1, 'updated_at': now} for name in VERSIONED_TABLES]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('change_versions')
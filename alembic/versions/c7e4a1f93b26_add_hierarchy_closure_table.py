@@ -0,0 +1,72 @@
+"""add_hierarchy_closure_table
+
+Revision ID: c7e4a1f93b26
+Revises: 5b2d7e91c4a0
+Create Date: 2026-10-18 11:47:05.218934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e4a1f93b26'
+down_revision: Union[str, None] = '5b2d7e91c4a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Заполнение замыканий по активным путям существующих данных
+BACKFILL_STATEMENTS = (
+    """
+    INSERT INTO hierarchy_closure (ancestor_type, ancestor_id, descendant_type, descendant_id, depth)
+    SELECT 'factory', f.id, 'section', s.id, 1
+    FROM sections s JOIN factories f ON f.id = s.factory_id
+    WHERE f.is_active = 1 AND s.is_active = 1
+    """,
+    """
+    INSERT INTO hierarchy_closure (ancestor_type, ancestor_id, descendant_type, descendant_id, depth)
+    SELECT 'section', a.section_id, 'equipment', a.equipment_id, 1
+    FROM section_equipment_association a
+    JOIN sections s ON s.id = a.section_id
+    JOIN equipment e ON e.id = a.equipment_id
+    WHERE s.is_active = 1 AND e.is_active = 1
+    """,
+    """
+    INSERT INTO hierarchy_closure (ancestor_type, ancestor_id, descendant_type, descendant_id, depth)
+    SELECT DISTINCT 'factory', f.id, 'equipment', a.equipment_id, 2
+    FROM section_equipment_association a
+    JOIN sections s ON s.id = a.section_id
+    JOIN factories f ON f.id = s.factory_id
+    JOIN equipment e ON e.id = a.equipment_id
+    WHERE f.is_active = 1 AND s.is_active = 1 AND e.is_active = 1
+    """,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'hierarchy_closure',
+        sa.Column('ancestor_type', sa.String(), nullable=False),
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_type', sa.String(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('ancestor_type', 'ancestor_id', 'descendant_type', 'descendant_id')
+    )
+    op.create_index(
+        'ix_hierarchy_closure_descendant',
+        'hierarchy_closure',
+        ['descendant_type', 'descendant_id', 'ancestor_type'],
+        unique=False
+    )
+    for statement in BACKFILL_STATEMENTS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hierarchy_closure_descendant', table_name='hierarchy_closure')
+    op.drop_table('hierarchy_closure')
@@ -0,0 +1,71 @@
+"""add_fts5_search_index
+
+Revision ID: d3f8b2a6c915
+Revises: c7e4a1f93b26
+Create Date: 2026-10-18 14:02:37.551208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f8b2a6c915'
+down_revision: Union[str, None] = 'c7e4a1f93b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Индексируемые текстовые колонки по таблицам справочников
+SEARCH_COLUMNS = {
+    'factories': ('name',),
+    'sections': ('name',),
+    'equipment': ('name', 'description'),
+}
+
+# unicode61 не различает регистр (в том числе кириллицы) и убирает диакритику
+# латиницы, prefix ускоряет поиск по началу слова из 2 и 3 символов
+FTS_OPTIONS = "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+
+
+def _values(prefix: str, columns: Sequence[str]) -> str:
+    return ', '.join(f'{prefix}.{column}' for column in columns)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, columns in SEARCH_COLUMNS.items():
+        fts = f'{table}_fts'
+        column_list = ', '.join(columns)
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{column_list}, content='{table}', content_rowid='id', {FTS_OPTIONS})"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {_values('new', columns)}); "
+            f"END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column_list}) "
+            f"VALUES ('delete', old.id, {_values('old', columns)}); "
+            f"END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column_list}) "
+            f"VALUES ('delete', old.id, {_values('old', columns)}); "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {_values('new', columns)}); "
+            f"END"
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in SEARCH_COLUMNS:
+        fts = f'{table}_fts'
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+        op.execute(f'DROP TABLE IF EXISTS {fts}')
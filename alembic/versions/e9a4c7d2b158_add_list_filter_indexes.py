@@ -0,0 +1,51 @@
+"""add_list_filter_indexes
+
+Revision ID: e9a4c7d2b158
+Revises: d3f8b2a6c915
+Create Date: 2026-10-18 15:26:48.104372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a4c7d2b158'
+down_revision: Union[str, None] = 'd3f8b2a6c915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Фильтр по активности вместе с сортировкой или префиксом наименования
+IS_ACTIVE_NAME_INDEXES = {
+    'factories': 'ix_factories_is_active_name',
+    'sections': 'ix_sections_is_active_name',
+    'equipment': 'ix_equipment_is_active_name',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, index_name in IS_ACTIVE_NAME_INDEXES.items():
+        op.create_index(index_name, table, ['is_active', 'name'], unique=False)
+    op.create_index(
+        'ix_sections_factory_id_is_active',
+        'sections',
+        ['factory_id', 'is_active'],
+        unique=False
+    )
+    op.create_index(
+        'ix_section_equipment_association_equipment_id',
+        'section_equipment_association',
+        ['equipment_id', 'section_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_section_equipment_association_equipment_id', table_name='section_equipment_association')
+    op.drop_index('ix_sections_factory_id_is_active', table_name='sections')
+    for table, index_name in IS_ACTIVE_NAME_INDEXES.items():
+        op.drop_index(index_name, table_name=table)
@@ -0,0 +1,35 @@
+from typing import Any, Callable, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def serialize(result: Any, response_model: Optional[Type[BaseModel]]) -> Any:
+    """
+    Преобразует результат функции crud в pydantic-схему.
+
+    Выполняется в том же контексте, что и запрос к БД, чтобы ленивые связи
+    подгружались до закрытия сессии и вне цикла событий.
+    """
+    if response_model is None or result is None:
+        return result
+    if isinstance(result, list):
+        return [response_model.model_validate(item) for item in result]
+    return response_model.model_validate(result)
+
+
+def call_and_serialize(session, fn: Callable, args: tuple, kwargs: dict, response_model):
+    """Вызывает функцию crud с синхронной сессией и сериализует результат."""
+    return serialize(fn(session, *args, **kwargs), response_model)
+
+
+async def run_sync(
+    db: AsyncSession,
+    fn: Callable,
+    *args,
+    response_model: Optional[Type[BaseModel]] = None,
+    **kwargs
+) -> Any:
+    """Выполняет синхронную функцию crud внутри AsyncSession (aiosqlite)."""
+    return await db.run_sync(call_and_serialize, fn, args, kwargs, response_model)
+
@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+from .config import settings
+
+
+class LRUCache:
+    """
+    Потокобезопасный кэш ограниченного размера с вытеснением по LRU.
+
+    Каждая инвалидация увеличивает поколение кэша: значение, вычисленное
+    до инвалидации, не будет сохранено (см. generation() и put()).
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self) -> int:
+        """Возвращает текущее поколение кэша (запоминается перед чтением из БД)."""
+        with self._lock:
+            return self._generation
+
+    def get(self, key: Hashable) -> Tuple[bool, object]:
+        """Возвращает пару (найдено, значение) и отмечает ключ как недавно использованный."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, value: object, generation: Optional[int] = None) -> bool:
+        """
+        Сохраняет значение, вытесняя самые давно использованные записи.
+
+        Если передано поколение и с тех пор была инвалидация, значение
+        считается устаревшим и не сохраняется.
+        """
+        if self.maxsize <= 0:
+            return False
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, keys: Iterable[Hashable]) -> int:
+        """Удаляет записи по ключам и возвращает число удалённых."""
+        with self._lock:
+            self._generation += 1
+            removed = 0
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    removed += 1
+            self.invalidations += removed
+            return removed
+
+    def clear(self) -> None:
+        """Очищает кэш (счётчики сохраняются)."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Возвращает размер кэша и счётчики попаданий, промахов и вытеснений."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+class VersionCoherence:
+    """
+    Согласует кэши процесса с изменениями, сделанными другими процессами.
+
+    Хранит версии таблиц, которым соответствует содержимое кэшей. Свои записи
+    процесс отмечает через note_local_write() (их последствия уже сброшены
+    точечно); если при проверке версия таблицы выросла сверх известной, значит
+    её изменил другой процесс, и кэши очищаются целиком.
+    """
+
+    def __init__(self, caches: Sequence[LRUCache]) -> None:
+        self.caches = caches
+        self._known: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.flushes = 0
+
+    def note_local_write(self, versions: Dict[str, int]) -> None:
+        """Учитывает версии, зафиксированные транзакцией этого процесса."""
+        with self._lock:
+            for table_name, version in versions.items():
+                if self._known.get(table_name) == version - 1:
+                    self._known[table_name] = version
+
+    def check(self, versions: Dict[str, int]) -> bool:
+        """
+        Сравнивает текущие версии таблиц с известными.
+
+        Возвращает True, если обнаружены чужие изменения и кэши очищены.
+        """
+        with self._lock:
+            changed = [
+                table_name for table_name, version in versions.items()
+                if version > self._known.get(table_name, -1)
+            ]
+            if not changed:
+                return False
+            for table_name in changed:
+                self._known[table_name] = versions[table_name]
+            for cache in self.caches:
+                cache.clear()
+            self.flushes += 1
+            return True
+
+
+# Кэш построенных иерархий по ключу (тип сущности, ID)
+hierarchy_cache = LRUCache(settings.hierarchy_cache_size)
+
+# Проверка согласованности кэшей процесса по таблице change_versions
+cache_coherence = VersionCoherence([hierarchy_cache])
@@ -0,0 +1,79 @@
+import zlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+from fastapi import Depends, Request, Response
+
+from . import crud
+from .cache import cache_coherence
+from .db_runner import DbRunner, get_read_db_runner
+from .exceptions import NotModifiedError
+
+
+def make_etag(versions: Dict[str, Tuple[int, datetime]], tables: Sequence[str], request_key: str) -> str:
+    """
+    Формирует слабый ETag из версий таблиц и параметров запроса.
+
+    Параметры входят в ETag, чтобы разные страницы и фильтры одного списка
+    имели разные теги.
+    """
+    version_part = '.'.join(str(versions.get(table, (0, None))[0]) for table in tables)
+    return f'W/"{version_part}-{zlib.crc32(request_key.encode()):08x}"'
+
+
+def last_modified(versions: Dict[str, Tuple[int, datetime]], tables: Sequence[str]) -> Optional[str]:
+    """Возвращает значение Last-Modified — время последнего изменения таблиц."""
+    moments = [versions[table][1] for table in tables if table in versions]
+    if not moments:
+        return None
+    return format_datetime(max(moments).replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Проверяет заголовок If-None-Match (слабое сравнение, список тегов или "*")."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(
+        candidate.strip().removeprefix('W/') == opaque for candidate in if_none_match.split(',')
+    )
+
+
+async def get_change_versions(
+    db: DbRunner = Depends(get_read_db_runner)
+) -> Dict[str, Tuple[int, datetime]]:
+    """
+    Зависимость FastAPI: версии таблиц, прочитанные один раз за запрос.
+
+    Заодно проверяет согласованность кэшей процесса: изменения, сделанные
+    другими рабочими процессами, сбрасывают кэши до выполнения запроса.
+    """
+    versions = await db.run(crud.get_change_versions)
+    cache_coherence.check({table: version for table, (version, _) in versions.items()})
+    return versions
+
+
+def conditional_get(*tables: str):
+    """
+    Создаёт зависимость условного GET для ресурса, зависящего от таблиц.
+
+    Добавляет к ответу ETag и Last-Modified, а при совпадении If-None-Match
+    прерывает обработку ответом 304 до выполнения запросов к сущностям.
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        versions: Dict[str, Tuple[int, datetime]] = Depends(get_change_versions)
+    ) -> None:
+        request_key = f'{request.url.path}?{request.url.query}'
+        headers = {'ETag': make_etag(versions, tables, request_key)}
+        modified = last_modified(versions, tables)
+        if modified is not None:
+            headers['Last-Modified'] = modified
+        if etag_matches(request.headers.get('if-none-match'), headers['ETag']):
+            raise NotModifiedError(headers)
+        response.headers.update(headers)
+    return dependency
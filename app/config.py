@@ -0,0 +1,144 @@
+import os
+from typing import List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+DB_MODES = ('sync', 'async')
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Читает логический флаг из переменной окружения."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# PRAGMA профиля, применяемые и к соединениям только для чтения
+READ_PRAGMAS = ('cache_size', 'mmap_size', 'temp_store', 'busy_timeout')
+
+
+class StorageProfile(BaseModel):
+    """Профиль хранилища SQLite: PRAGMA соединений и параметры пула."""
+    name: str = Field(..., description='Наименование профиля')
+    journal_mode: Optional[Literal['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF']] = Field(
+        None, description='PRAGMA journal_mode'
+    )
+    synchronous: Optional[Literal['OFF', 'NORMAL', 'FULL', 'EXTRA']] = Field(
+        None, description='PRAGMA synchronous'
+    )
+    cache_size: Optional[int] = Field(
+        None, description='PRAGMA cache_size (отрицательное значение — в КиБ)'
+    )
+    mmap_size: Optional[int] = Field(None, ge=0, description='PRAGMA mmap_size, байт')
+    temp_store: Optional[Literal['DEFAULT', 'FILE', 'MEMORY']] = Field(
+        None, description='PRAGMA temp_store'
+    )
+    busy_timeout: Optional[int] = Field(None, ge=0, description='PRAGMA busy_timeout, мс')
+    pool_size: int = Field(5, ge=1, description='Размер пула соединений')
+    max_overflow: int = Field(10, ge=0, description='Дополнительные соединения сверх пула')
+
+    def pragmas(self, read_only: bool = False) -> List[Tuple[str, object]]:
+        """
+        Возвращает PRAGMA профиля в порядке применения (только заданные).
+
+        Для соединений только для чтения journal_mode и synchronous не
+        возвращаются: они относятся к записи, а смена режима журнала требует
+        записи в файл базы, открытой с mode=ro.
+        """
+        names = READ_PRAGMAS if read_only else ('journal_mode', 'synchronous') + READ_PRAGMAS
+        return [(name, getattr(self, name)) for name in names if getattr(self, name) is not None]
+
+
+# Предустановленные профили хранилища
+STORAGE_PROFILES = {
+    # Настройки SQLite по умолчанию (журнал отката, без ожидания блокировок)
+    'default': {},
+    # WAL: читатели не блокируют писателя, fsync только на контрольных точках
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -20000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # WAL с увеличенным кэшем и отображением файла в память для чтения
+    'wal-fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # WAL с fsync на каждой фиксации транзакции
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'busy_timeout': 10000,
+    },
+}
+
+
+def build_storage_profile(name: str, overrides: Optional[dict] = None) -> StorageProfile:
+    """Собирает профиль хранилища из предустановки и переопределений."""
+    if name not in STORAGE_PROFILES:
+        raise ValueError(
+            f'Неизвестный профиль хранилища "{name}", допустимо: {", ".join(STORAGE_PROFILES)}.'
+        )
+    values = dict(STORAGE_PROFILES[name])
+    values.update(overrides or {})
+    return StorageProfile(name=name, **values)
+
+
+def _storage_overrides_from_env() -> dict:
+    """Читает переопределения профиля хранилища из переменных SQLITE_* и DB_POOL_*."""
+    env_names = {
+        'journal_mode': 'SQLITE_JOURNAL_MODE',
+        'synchronous': 'SQLITE_SYNCHRONOUS',
+        'cache_size': 'SQLITE_CACHE_SIZE',
+        'mmap_size': 'SQLITE_MMAP_SIZE',
+        'temp_store': 'SQLITE_TEMP_STORE',
+        'busy_timeout': 'SQLITE_BUSY_TIMEOUT',
+        'pool_size': 'DB_POOL_SIZE',
+        'max_overflow': 'DB_MAX_OVERFLOW',
+    }
+    overrides = {}
+    for field, env_name in env_names.items():
+        value = (os.getenv(env_name) or '').strip()
+        if value:
+            overrides[field] = int(value) if value.lstrip('-').isdigit() else value.upper()
+    return overrides
+
+
+class Settings:
+    """Настройки приложения, считываемые из переменных окружения."""
+
+    def __init__(self) -> None:
+        self.database_url = os.getenv(
+            'SQLALCHEMY_DATABASE_URL', 'sqlite:///./spravochniki.db'
+        )
+        # sync — маршруты работают через пул потоков и Session,
+        # async — через AsyncSession (aiosqlite) в цикле событий
+        self.db_mode = os.getenv('DB_MODE', 'sync').strip().lower()
+        if self.db_mode not in DB_MODES:
+            raise ValueError(
+                f'Неизвестный режим БД "{self.db_mode}", допустимо: {", ".join(DB_MODES)}.'
+            )
+        self.storage_profile = build_storage_profile(
+            os.getenv('SQLITE_PROFILE', 'wal').strip().lower(),
+            _storage_overrides_from_env()
+        )
+        # Соединений в пуле писателя (1 — записи процесса строго последовательны)
+        self.write_pool_size = int(os.getenv('DB_WRITE_POOL_SIZE', '1'))
+        # Открывать соединения чтения через URI с mode=ro (помимо query_only)
+        self.sqlite_read_mode_ro = _env_bool('SQLITE_READ_MODE_RO', False)
+        # Заголовки X-DB-Queries и X-DB-Time-ms в ответах API
+        self.db_stats_headers = _env_bool('DB_STATS_HEADERS', False)
+        # JSON-журнал запросов к API (логгер app.requests)
+        self.request_log = _env_bool('REQUEST_LOG', False)
+        # Число иерархий в кэше процесса (0 — кэш отключён)
+        self.hierarchy_cache_size = int(os.getenv('HIERARCHY_CACHE_SIZE', '1024'))
+
+
+settings = Settings()
@@ -1,7 +1,13 @@
-from typing import List, Optional, Type
-from sqlalchemy.orm import Session, selectinload
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Type
+from sqlalchemy import and_, delete, event, exists, func, insert, literal, or_, select, text, tuple_, update
+from sqlalchemy.orm import Session, aliased, selectinload
 
 from . import models, schemas
+from .cache import cache_coherence, hierarchy_cache
 from .exceptions import (
     NotFoundError,
     RelatedEntityNotFoundError,
@@ -9,6 +15,7 @@ from .exceptions import (
     DependentActiveChildError,
     AlreadyActiveError
 )
+from .pagination import LIST_SORTS, sort_field
 
 
 def _get_active_entity(db: Session, model: Type[models.Base], entity_id: int) -> Optional[models.Base]:
@@ -16,6 +23,308 @@ def _get_active_entity(db: Session, model: Type[models.Base], entity_id: int) ->
     return db.query(model).filter(model.id == entity_id, model.is_active == True).first()
 
 
+# Размер порции значений в одном IN-условии (ограничение SQLite на число параметров)
+_IN_CHUNK_SIZE = 500
+
+
+def _query_in(query, column, values) -> Iterator:
+    """Выполняет запрос с IN-условием порциями, не превышая лимит параметров."""
+    values = list(values)
+    for start in range(0, len(values), _IN_CHUNK_SIZE):
+        yield from query.filter(column.in_(values[start:start + _IN_CHUNK_SIZE]))
+
+
+def _resolve_active_entities(
+    db: Session, model: Type[models.Base], entity_ids: Sequence[int]
+) -> Tuple[List[models.Base], List[int]]:
+    """
+    Одним IN-запросом находит активные сущности по списку ID.
+
+    Возвращает найденные сущности в порядке запроса (без повторов) и список
+    отсутствующих или неактивных ID.
+    """
+    if not entity_ids:
+        return [], []
+    found_by_id = {
+        entity.id: entity
+        for entity in _query_in(
+            db.query(model).filter(model.is_active == True), model.id, set(entity_ids)
+        )
+    }
+    found = []
+    seen_ids = set()
+    missing_ids = []
+    for entity_id in entity_ids:
+        entity = found_by_id.get(entity_id)
+        if entity is None:
+            missing_ids.append(entity_id)
+        elif entity_id not in seen_ids:
+            seen_ids.add(entity_id)
+            found.append(entity)
+    return found, missing_ids
+
+
+# Стратегии загрузки связей для списочных запросов: каждая связь подгружается
+# для всей страницы одним IN-запросом, а не отдельным SELECT на строку.
+_LIST_LOADERS = {
+    models.Factory: (models.Factory.sections,),
+    models.Section: (models.Section.equipment,),
+    models.Equipment: (models.Equipment.sections,),
+}
+
+
+def _with_list_loaders(query, model: Type[models.Base]):
+    """Добавляет к списочному запросу пакетную загрузку связей модели."""
+    return query.options(*(selectinload(rel) for rel in _LIST_LOADERS[model]))
+
+
+def _paginate(
+    query,
+    model: Type[models.Base],
+    skip: int,
+    limit: int,
+    after_id: Optional[int],
+    sort: str = 'id',
+    after_value: object = None
+):
+    """
+    Применяет сортировку из LIST_SORTS и offset- или keyset-пагинацию к запросу.
+
+    Сортировка по имени дополняется ID, а позиция keyset задаётся парой
+    (значение поля, ID), поэтому страница продолжается по индексу поля.
+    """
+    if sort not in LIST_SORTS:
+        raise ValueError(f'Недопустимая сортировка "{sort}".')
+    descending = sort.startswith('-')
+    field = sort_field(sort)
+    columns = [model.id] if field == 'id' else [getattr(model, field), model.id]
+    if after_id is not None:
+        position = after_id if field == 'id' else tuple_(literal(after_value), literal(after_id))
+        key = columns[0] if field == 'id' else tuple_(*columns)
+        query = query.filter(key < position if descending else key > position)
+    query = query.order_by(*(column.desc() if descending else column for column in columns))
+    if skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
+def _filter_list(
+    query,
+    model: Type[models.Base],
+    only_active: bool,
+    is_active: Optional[bool],
+    name_prefix: Optional[str]
+):
+    """
+    Применяет общие фильтры списков: активность и начало наименования.
+
+    Явный is_active важнее only_active. Префикс сравнивается с учётом регистра
+    как диапазон строк, чтобы использовался индекс по наименованию.
+    """
+    if is_active is not None:
+        query = query.filter(model.is_active == is_active)
+    elif only_active:
+        query = query.filter(model.is_active == True)
+    if name_prefix:
+        query = query.filter(model.name >= name_prefix, model.name < name_prefix + '\U0010ffff')
+    return query
+
+
+# --- Версии изменений таблиц ---
+
+# Таблицы, для которых ведутся версии изменений (ETag условных GET-запросов)
+VERSIONED_TABLES = ('factories', 'sections', 'equipment', 'section_equipment_association')
+
+
+# Ключ Session.info с версиями, которые станут известны процессу после фиксации
+_PENDING_VERSIONS_KEY = 'pending_change_versions'
+
+
+def _bump_versions(db: Session, *table_names: str) -> None:
+    """Увеличивает версии изменённых таблиц в текущей транзакции."""
+    rows = db.execute(
+        update(models.ChangeVersion).where(
+            models.ChangeVersion.table_name.in_(table_names)
+        ).values(
+            version=models.ChangeVersion.version + 1,
+            updated_at=datetime.now(timezone.utc).replace(tzinfo=None)
+        ).returning(models.ChangeVersion.table_name, models.ChangeVersion.version)
+    )
+    db.info.setdefault(_PENDING_VERSIONS_KEY, {}).update(
+        {row.table_name: row.version for row in rows}
+    )
+
+@event.listens_for(Session, 'after_commit')
+def _note_committed_versions(session: Session) -> None:
+    """После фиксации сообщает кэшам процесса версии, созданные своей записью."""
+    versions = session.info.pop(_PENDING_VERSIONS_KEY, None)
+    if versions:
+        cache_coherence.note_local_write(versions)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_versions(session: Session, previous_transaction) -> None:
+    """Отбрасывает версии отменённой транзакции."""
+    session.info.pop(_PENDING_VERSIONS_KEY, None)
+
+def get_change_versions(db: Session) -> Dict[str, Tuple[int, datetime]]:
+    """Одним запросом получает версии и время последнего изменения всех таблиц."""
+    return {
+        row.table_name: (row.version, row.updated_at)
+        for row in db.query(
+            models.ChangeVersion.table_name,
+            models.ChangeVersion.version,
+            models.ChangeVersion.updated_at
+        )
+    }
+
+
+def touch_change_versions(db: Session, *table_names: str) -> None:
+    """
+    Отмечает таблицы изменёнными (без фиксации) после записи в обход функций crud.
+
+    Без аргументов увеличивает версии всех таблиц из VERSIONED_TABLES.
+    """
+    _bump_versions(db, *(table_names or VERSIONED_TABLES))
+
+
+# --- Таблица замыканий иерархии ---
+
+_CLOSURE_COLUMNS = ('ancestor_type', 'ancestor_id', 'descendant_type', 'descendant_id', 'depth')
+
+
+def _closure_selects(entity_type: Optional[str] = None, entity_ids: Sequence[int] = ()) -> list:
+    """
+    Возвращает SELECT-запросы строк замыкания по активным путям.
+
+    Если передан entity_type, выбираются только строки, в которых сущность
+    этого типа из entity_ids является предком или потомком.
+    """
+    assoc = models.section_equipment_association_table
+    factory, section, equipment = models.Factory, models.Section, models.Equipment
+    factory_section = select(
+        literal('factory'), factory.id, literal('section'), section.id, literal(1)
+    ).join_from(section, factory, factory.id == section.factory_id).where(
+        factory.is_active == True, section.is_active == True
+    )
+    section_equipment = select(
+        literal('section'), assoc.c.section_id, literal('equipment'), assoc.c.equipment_id, literal(1)
+    ).join_from(assoc, section, section.id == assoc.c.section_id).join(
+        equipment, equipment.id == assoc.c.equipment_id
+    ).where(section.is_active == True, equipment.is_active == True)
+    factory_equipment = select(
+        literal('factory'), section.factory_id, literal('equipment'), assoc.c.equipment_id, literal(2)
+    ).join_from(assoc, section, section.id == assoc.c.section_id).join(
+        factory, factory.id == section.factory_id
+    ).join(
+        equipment, equipment.id == assoc.c.equipment_id
+    ).where(
+        factory.is_active == True, section.is_active == True, equipment.is_active == True
+    ).distinct()
+    if entity_type is None:
+        return [factory_section, section_equipment, factory_equipment]
+    touching = {
+        'factory': ((factory_section, factory.id), (factory_equipment, section.factory_id)),
+        'section': ((factory_section, section.id), (section_equipment, assoc.c.section_id)),
+        'equipment': ((section_equipment, assoc.c.equipment_id), (factory_equipment, assoc.c.equipment_id)),
+    }
+    return [query.where(column.in_(entity_ids)) for query, column in touching[entity_type]]
+
+def _refresh_closure(db: Session, factory_ids=(), section_ids=(), equipment_ids=()) -> None:
+    """
+    Пересчитывает в текущей транзакции строки замыкания, затрагивающие сущности.
+
+    Строки, где сущность является предком или потомком, удаляются и заново
+    вставляются по текущему состоянию таблиц (после flush сессии).
+    """
+    db.flush()
+    closure = models.HierarchyClosure.__table__
+    for entity_type, entity_ids in (
+        ('factory', factory_ids), ('section', section_ids), ('equipment', equipment_ids)
+    ):
+        entity_ids = sorted(set(entity_ids))
+        for start in range(0, len(entity_ids), _IN_CHUNK_SIZE):
+            chunk = entity_ids[start:start + _IN_CHUNK_SIZE]
+            db.execute(delete(closure).where(or_(
+                and_(closure.c.ancestor_type == entity_type, closure.c.ancestor_id.in_(chunk)),
+                and_(closure.c.descendant_type == entity_type, closure.c.descendant_id.in_(chunk))
+            )))
+            for query in _closure_selects(entity_type, chunk):
+                db.execute(insert(closure).prefix_with('OR IGNORE').from_select(_CLOSURE_COLUMNS, query))
+
+def rebuild_hierarchy_closure(db: Session) -> int:
+    """Полностью перестраивает таблицу замыканий (без фиксации) и возвращает число строк."""
+    closure = models.HierarchyClosure.__table__
+    db.execute(delete(closure))
+    for query in _closure_selects():
+        db.execute(insert(closure).from_select(_CLOSURE_COLUMNS, query))
+    return db.query(models.HierarchyClosure).count()
+
+def _ids_of(keys: set, entity_type: str) -> set:
+    """Выбирает из ключей кэша иерархии ID сущностей указанного типа."""
+    return {entity_id for key_type, entity_id in keys if key_type == entity_type}
+
+
+# --- Инвалидация кэша иерархии ---
+
+def _factory_scope(db: Session, factory_ids) -> set:
+    """Ключи кэша иерархии поддеревьев фабрик: фабрики, их участки и оборудование участков."""
+    factory_ids = set(factory_ids)
+    if not factory_ids:
+        return set()
+    assoc = models.section_equipment_association_table
+    keys = {('factory', factory_id) for factory_id in factory_ids}
+    section_ids = {
+        row.id for row in _query_in(db.query(models.Section.id), models.Section.factory_id, factory_ids)
+    }
+    keys.update(('section', section_id) for section_id in section_ids)
+    keys.update(
+        ('equipment', row.equipment_id)
+        for row in _query_in(db.query(assoc.c.equipment_id), assoc.c.section_id, section_ids)
+    )
+    return keys
+
+def _section_scope(db: Session, section_ids) -> set:
+    """Ключи кэша иерархии, зависящие от участков: участки, их фабрики и оборудование."""
+    section_ids = set(section_ids)
+    if not section_ids:
+        return set()
+    assoc = models.section_equipment_association_table
+    keys = {('section', section_id) for section_id in section_ids}
+    keys.update(
+        ('factory', row.factory_id)
+        for row in _query_in(db.query(models.Section.factory_id), models.Section.id, section_ids)
+    )
+    keys.update(
+        ('equipment', row.equipment_id)
+        for row in _query_in(db.query(assoc.c.equipment_id), assoc.c.section_id, section_ids)
+    )
+    return keys
+
+def _equipment_scope(db: Session, equipment_ids) -> set:
+    """Ключи кэша иерархии, зависящие от оборудования: оно само, его участки и их фабрики."""
+    equipment_ids = set(equipment_ids)
+    if not equipment_ids:
+        return set()
+    assoc = models.section_equipment_association_table
+    keys = {('equipment', equipment_id) for equipment_id in equipment_ids}
+    rows = _query_in(
+        db.query(models.Section.id, models.Section.factory_id).join(
+            assoc, assoc.c.section_id == models.Section.id
+        ),
+        assoc.c.equipment_id,
+        equipment_ids
+    )
+    for row in rows:
+        keys.add(('section', row.id))
+        keys.add(('factory', row.factory_id))
+    return keys
+
+def _invalidate_hierarchy(keys: set) -> None:
+    """Сбрасывает записи кэша иерархии после фиксации транзакции."""
+    if keys:
+        hierarchy_cache.invalidate(keys)
+
+
 # --- CRUD для фабрик ---
 
 def get_factory(db: Session, factory_id: int, only_active: bool = True) -> Optional[models.Factory]:
@@ -32,12 +341,26 @@ def get_factory_by_name(db: Session, name: str, only_active: bool = True) -> Opt
         query = query.filter(models.Factory.is_active == True)
     return query.first()
 
-def get_factories(db: Session, skip: int = 0, limit: int = 100, only_active: bool = True) -> List[models.Factory]:
-    """Получает список фабрик с пагинацией."""
-    query = db.query(models.Factory)
-    if only_active:
-        query = query.filter(models.Factory.is_active == True)
-    return query.order_by(models.Factory.id).offset(skip).limit(limit).all()
+def get_factories(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    only_active: bool = True,
+    after_id: Optional[int] = None,
+    sort: str = 'id',
+    after_value: object = None,
+    name_prefix: Optional[str] = None,
+    is_active: Optional[bool] = None
+) -> List[models.Factory]:
+    """
+    Получает список фабрик с фильтрами, сортировкой и пагинацией.
+
+    Если передан after_id (и after_value для сортировки не по ID), используется
+    keyset-пагинация: выборка начинается сразу после указанной записи.
+    """
+    query = _with_list_loaders(db.query(models.Factory), models.Factory)
+    query = _filter_list(query, models.Factory, only_active, is_active, name_prefix)
+    return _paginate(query, models.Factory, skip, limit, after_id, sort, after_value)
 
 def create_factory(db: Session, factory_data: schemas.FactoryCreate) -> models.Factory:
     """Создаёт новую фабрику."""
@@ -46,8 +369,10 @@ def create_factory(db: Session, factory_data: schemas.FactoryCreate) -> models.F
         raise DuplicateError(f'Фабрика с наименованием "{factory_data.name}" уже существует (возможно, деактивирована).')
     db_factory = models.Factory(name=factory_data.name, is_active=True)
     db.add(db_factory)
+    _bump_versions(db, 'factories')
     db.commit()
     db.refresh(db_factory)
+    _invalidate_hierarchy({('factory', db_factory.id)})
     return db_factory
 
 def update_factory(db: Session, factory_id: int, factory_data: schemas.FactoryUpdate) -> models.Factory:
@@ -63,7 +388,9 @@ def update_factory(db: Session, factory_id: int, factory_data: schemas.FactoryUp
         if existing_factory_any_status:
             raise DuplicateError(f'Фабрика с наименованием "{factory_data.name}" уже существует (возможно, деактивирована).')
         db_factory.name = factory_data.name
+    _bump_versions(db, 'factories')
     db.commit()
+    _invalidate_hierarchy(_factory_scope(db, [factory_id]))
     db.refresh(db_factory)
     return db_factory
 
@@ -72,16 +399,19 @@ def soft_delete_factory(db: Session, factory_id: int) -> models.Factory:
     db_factory = _get_active_entity(db, models.Factory, factory_id)
     if not db_factory:
         raise NotFoundError(f'Активная фабрика с ID {factory_id} не найдена.')
-    active_sections_count = db.query(models.Section).filter(
+    active_sections_count = db.query(func.count(models.Section.id)).filter(
         models.Section.factory_id == factory_id,
         models.Section.is_active == True
-    ).count()
+    ).scalar()
     if active_sections_count > 0:
         raise DependentActiveChildError(
             f'Нельзя деактивировать фабрику ID {factory_id}, есть {active_sections_count} активных участков.'
         )
     db_factory.is_active = False
+    _refresh_closure(db, factory_ids=[factory_id])
+    _bump_versions(db, 'factories')
     db.commit()
+    _invalidate_hierarchy(_factory_scope(db, [factory_id]))
     db.refresh(db_factory)
     return db_factory
 
@@ -104,12 +434,40 @@ def get_equipment_by_name(db: Session, name: str, only_active: bool = True) -> O
         query = query.filter(models.Equipment.is_active == True)
     return query.first()
 
-def get_equipment_list(db: Session, skip: int = 0, limit: int = 100, only_active: bool = True) -> List[models.Equipment]:
-    """Получает список оборудования с пагинацией."""
-    query = db.query(models.Equipment)
-    if only_active:
-        query = query.filter(models.Equipment.is_active == True)
-    return query.order_by(models.Equipment.id).offset(skip).limit(limit).all()
+def get_equipment_list(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    only_active: bool = True,
+    after_id: Optional[int] = None,
+    sort: str = 'id',
+    after_value: object = None,
+    name_prefix: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    section_id: Optional[int] = None,
+    factory_id: Optional[int] = None
+) -> List[models.Equipment]:
+    """
+    Получает список оборудования с фильтрами, сортировкой и пагинацией.
+
+    section_id и factory_id отбирают оборудование, привязанное к участку или
+    к любому участку фабрики. Если передан after_id (и after_value для
+    сортировки не по ID), используется keyset-пагинация.
+    """
+    association = models.section_equipment_association_table
+    query = _with_list_loaders(db.query(models.Equipment), models.Equipment)
+    query = _filter_list(query, models.Equipment, only_active, is_active, name_prefix)
+    if section_id is not None:
+        query = query.filter(models.Equipment.id.in_(
+            select(association.c.equipment_id).where(association.c.section_id == section_id)
+        ))
+    if factory_id is not None:
+        query = query.filter(models.Equipment.id.in_(
+            select(association.c.equipment_id).join(
+                models.Section, models.Section.id == association.c.section_id
+            ).where(models.Section.factory_id == factory_id)
+        ))
+    return _paginate(query, models.Equipment, skip, limit, after_id, sort, after_value)
 
 def create_equipment(db: Session, equipment_data: schemas.EquipmentCreate) -> models.Equipment:
     """Создаёт новое оборудование с привязкой к участкам."""
@@ -121,21 +479,20 @@ def create_equipment(db: Session, equipment_data: schemas.EquipmentCreate) -> mo
         description=equipment_data.description,
         is_active=True
     )
-    found_sections = []
-    missing_or_inactive_section_ids = []
     if equipment_data.section_ids:
-        for section_id in equipment_data.section_ids:
-            section = _get_active_entity(db, models.Section, section_id)
-            if section:
-                found_sections.append(section)
-            else:
-                missing_or_inactive_section_ids.append(section_id)
+        found_sections, missing_or_inactive_section_ids = _resolve_active_entities(
+            db, models.Section, equipment_data.section_ids
+        )
         if missing_or_inactive_section_ids:
             raise RelatedEntityNotFoundError(f'Активные участки с ID {missing_or_inactive_section_ids} не найдены.')
         db_equipment.sections.extend(found_sections)
     db.add(db_equipment)
+    db.flush()
+    _refresh_closure(db, equipment_ids=[db_equipment.id])
+    _bump_versions(db, 'equipment', 'section_equipment_association')
     db.commit()
     db.refresh(db_equipment)
+    _invalidate_hierarchy(_equipment_scope(db, [db_equipment.id]))
     return db_equipment
 
 def update_equipment(db: Session, equipment_id: int, equipment_data: schemas.EquipmentUpdate) -> models.Equipment:
@@ -143,6 +500,7 @@ def update_equipment(db: Session, equipment_id: int, equipment_data: schemas.Equ
     db_equipment = _get_active_entity(db, models.Equipment, equipment_id)
     if not db_equipment:
         raise NotFoundError(f'Активное оборудование с ID {equipment_id} не найдено.')
+    stale_keys = _equipment_scope(db, [equipment_id])
     if equipment_data.name is not None and equipment_data.name != db_equipment.name:
         existing_equipment_any_status = db.query(models.Equipment).filter(
             models.Equipment.name == equipment_data.name,
@@ -155,18 +513,17 @@ def update_equipment(db: Session, equipment_id: int, equipment_data: schemas.Equ
         db_equipment.description = equipment_data.description
     if equipment_data.section_ids is not None:
         new_sections = []
-        missing_or_inactive_section_ids = []
         if equipment_data.section_ids:
-            for section_id in equipment_data.section_ids:
-                section = _get_active_entity(db, models.Section, section_id)
-                if section:
-                    new_sections.append(section)
-                else:
-                    missing_or_inactive_section_ids.append(section_id)
+            new_sections, missing_or_inactive_section_ids = _resolve_active_entities(
+                db, models.Section, equipment_data.section_ids
+            )
             if missing_or_inactive_section_ids:
                 raise RelatedEntityNotFoundError(f'Активные участки с ID {missing_or_inactive_section_ids} не найдены при обновлении оборудования.')
         db_equipment.sections = new_sections
+    _refresh_closure(db, equipment_ids=[equipment_id])
+    _bump_versions(db, 'equipment', 'section_equipment_association')
     db.commit()
+    _invalidate_hierarchy(stale_keys | _equipment_scope(db, [equipment_id]))
     db.refresh(db_equipment)
     return db_equipment
 
@@ -176,7 +533,10 @@ def soft_delete_equipment(db: Session, equipment_id: int) -> models.Equipment:
     if not db_equipment:
         raise NotFoundError(f'Активное оборудование с ID {equipment_id} не найдено.')
     db_equipment.is_active = False
+    _refresh_closure(db, equipment_ids=[equipment_id])
+    _bump_versions(db, 'equipment')
     db.commit()
+    _invalidate_hierarchy(_equipment_scope(db, [equipment_id]))
     db.refresh(db_equipment)
     return db_equipment
 
@@ -203,12 +563,36 @@ def get_section_by_name_and_factory(db: Session, name: str, factory_id: int, onl
         query = query.filter(models.Section.is_active == True)
     return query.first()
 
-def get_sections(db: Session, skip: int = 0, limit: int = 100, only_active: bool = True) -> List[models.Section]:
-    """Получает список участков с пагинацией."""
-    query = db.query(models.Section)
-    if only_active:
-        query = query.filter(models.Section.is_active == True)
-    return query.order_by(models.Section.id).offset(skip).limit(limit).all()
+def get_sections(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    only_active: bool = True,
+    after_id: Optional[int] = None,
+    sort: str = 'id',
+    after_value: object = None,
+    name_prefix: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    factory_id: Optional[int] = None,
+    equipment_id: Optional[int] = None
+) -> List[models.Section]:
+    """
+    Получает список участков с фильтрами, сортировкой и пагинацией.
+
+    factory_id отбирает участки фабрики, equipment_id — участки, к которым
+    привязано оборудование. Если передан after_id (и after_value для
+    сортировки не по ID), используется keyset-пагинация.
+    """
+    association = models.section_equipment_association_table
+    query = _with_list_loaders(db.query(models.Section), models.Section)
+    query = _filter_list(query, models.Section, only_active, is_active, name_prefix)
+    if factory_id is not None:
+        query = query.filter(models.Section.factory_id == factory_id)
+    if equipment_id is not None:
+        query = query.filter(models.Section.id.in_(
+            select(association.c.section_id).where(association.c.equipment_id == equipment_id)
+        ))
+    return _paginate(query, models.Section, skip, limit, after_id, sort, after_value)
 
 def create_section(db: Session, section_data: schemas.SectionCreate) -> models.Section:
     """Создаёт новый участок с привязкой к фабрике и оборудованию."""
@@ -222,21 +606,20 @@ def create_section(db: Session, section_data: schemas.SectionCreate) -> models.S
         factory_id=section_data.factory_id,
         is_active=True
     )
-    found_equipment = []
-    missing_or_inactive_equipment_ids = []
     if section_data.equipment_ids:
-        for eq_id in section_data.equipment_ids:
-            equipment_item = _get_active_entity(db, models.Equipment, eq_id)
-            if equipment_item:
-                found_equipment.append(equipment_item)
-            else:
-                missing_or_inactive_equipment_ids.append(eq_id)
+        found_equipment, missing_or_inactive_equipment_ids = _resolve_active_entities(
+            db, models.Equipment, section_data.equipment_ids
+        )
         if missing_or_inactive_equipment_ids:
             raise RelatedEntityNotFoundError(f'Активное оборудование с ID {missing_or_inactive_equipment_ids} не найдено.')
         db_section.equipment.extend(found_equipment)
     db.add(db_section)
+    db.flush()
+    _refresh_closure(db, section_ids=[db_section.id], equipment_ids=[eq.id for eq in db_section.equipment])
+    _bump_versions(db, 'sections', 'section_equipment_association')
     db.commit()
     db.refresh(db_section)
+    _invalidate_hierarchy(_section_scope(db, [db_section.id]))
     return db_section
 
 def update_section(db: Session, section_id: int, section_data: schemas.SectionUpdate) -> models.Section:
@@ -244,6 +627,7 @@ def update_section(db: Session, section_id: int, section_data: schemas.SectionUp
     db_section = _get_active_entity(db, models.Section, section_id)
     if not db_section:
         raise NotFoundError(f'Активный участок с ID {section_id} не найден.')
+    stale_keys = _section_scope(db, [section_id])
     target_factory_id = db_section.factory_id
     if section_data.factory_id is not None and section_data.factory_id != db_section.factory_id:
         new_factory = _get_active_entity(db, models.Factory, section_data.factory_id)
@@ -263,95 +647,255 @@ def update_section(db: Session, section_id: int, section_data: schemas.SectionUp
         db_section.name = section_data.name
     if section_data.equipment_ids is not None:
         new_equipment_list = []
-        missing_or_inactive_equipment_ids = []
         if section_data.equipment_ids:
-            for eq_id in section_data.equipment_ids:
-                equipment_item = _get_active_entity(db, models.Equipment, eq_id)
-                if equipment_item:
-                    new_equipment_list.append(equipment_item)
-                else:
-                    missing_or_inactive_equipment_ids.append(eq_id)
+            new_equipment_list, missing_or_inactive_equipment_ids = _resolve_active_entities(
+                db, models.Equipment, section_data.equipment_ids
+            )
             if missing_or_inactive_equipment_ids:
                 raise RelatedEntityNotFoundError(f'Активное оборудование с ID {missing_or_inactive_equipment_ids} не найдено при обновлении участка.')
         db_section.equipment = new_equipment_list
+    _refresh_closure(
+        db,
+        section_ids=[section_id],
+        equipment_ids=_ids_of(stale_keys, 'equipment') | {eq.id for eq in db_section.equipment}
+    )
+    _bump_versions(db, 'sections', 'section_equipment_association')
     db.commit()
+    _invalidate_hierarchy(stale_keys | _section_scope(db, [section_id]))
     db.refresh(db_section)
     return db_section
 
+def _orphaned_equipment_ids(section_ids_query):
+    """
+    Подзапрос ID оборудования участков из section_ids_query, у которого нет
+    активных участков вне этого набора (NOT EXISTS по таблице связей).
+    """
+    assoc = models.section_equipment_association_table
+    other_link = assoc.alias('other_link')
+    other_section = aliased(models.Section)
+    has_other_active_section = exists().where(
+        other_link.c.equipment_id == assoc.c.equipment_id,
+        other_link.c.section_id.not_in(section_ids_query),
+        other_section.id == other_link.c.section_id,
+        other_section.is_active == True
+    )
+    return select(assoc.c.equipment_id).where(
+        assoc.c.section_id.in_(section_ids_query),
+        ~has_other_active_section
+    )
+
+def _equipment_left_without_sections(db: Session, section_id: int) -> List[str]:
+    """Одним запросом находит активное оборудование участка, у которого нет других активных участков."""
+    rows = db.query(models.Equipment.name).filter(
+        models.Equipment.id.in_(_orphaned_equipment_ids(select(literal(section_id)))),
+        models.Equipment.is_active == True
+    ).order_by(models.Equipment.id)
+    return [row.name for row in rows]
+
 def soft_delete_section(db: Session, section_id: int) -> models.Section:
     """Мягко удаляет (деактивирует) участок."""
     db_section = _get_active_entity(db, models.Section, section_id)
     if not db_section:
         raise NotFoundError(f'Активный участок с ID {section_id} не найден.')
-    problematic_equipment_names = []
-    for eq in db_section.equipment:
-        other_active_sections_count = db.query(models.Section).join(models.section_equipment_association_table).filter(
-            models.section_equipment_association_table.c.equipment_id == eq.id,
-            models.Section.is_active == True,
-            models.Section.id != section_id
-        ).count()
-        if other_active_sections_count == 0:
-            problematic_equipment_names.append(eq.name)
+    problematic_equipment_names = _equipment_left_without_sections(db, section_id)
     if problematic_equipment_names:
         raise DependentActiveChildError(
             f'Нельзя деактивировать участок ID {section_id}, следующее активное оборудование ({", ".join(problematic_equipment_names)}) останется без других активных участков.'
         )
     db_section.is_active = False
+    _refresh_closure(db, section_ids=[section_id], equipment_ids=[eq.id for eq in db_section.equipment])
+    _bump_versions(db, 'sections')
     db.commit()
+    _invalidate_hierarchy(_section_scope(db, [section_id]))
     db.refresh(db_section)
     return db_section
 
 
 # --- Иерархия ---
 
+# Модели, для которых строится иерархия, по типу сущности
+HIERARCHY_MODELS = {
+    'factory': models.Factory,
+    'section': models.Section,
+    'equipment': models.Equipment,
+}
+
+
+def _equipment_children_by_section(db: Session, *section_filters) -> Dict[int, List[schemas.HierarchyChild]]:
+    """Одним запросом по таблице замыканий получает оборудование участков, сгруппированное по ID участка."""
+    closure = models.HierarchyClosure
+    rows = db.query(
+        closure.ancestor_id, models.Equipment.id, models.Equipment.name
+    ).join(
+        models.Equipment, models.Equipment.id == closure.descendant_id
+    ).join(
+        models.Section, models.Section.id == closure.ancestor_id
+    ).filter(
+        closure.ancestor_type == 'section',
+        closure.descendant_type == 'equipment',
+        *section_filters
+    ).order_by(models.Equipment.id).all()
+    children_by_section: Dict[int, List[schemas.HierarchyChild]] = defaultdict(list)
+    for section_id, eq_id, eq_name in rows:
+        children_by_section[section_id].append(
+            schemas.HierarchyChild(type='equipment', id=eq_id, name=eq_name, children=[])
+        )
+    return children_by_section
+
 def get_parents_for_equipment(db: Session, equipment_id: int) -> List[schemas.HierarchyParent]:
-    """Получает список родительских сущностей для оборудования."""
+    """Получает список родительских сущностей для оборудования одним запросом по таблице замыканий."""
+    closure = models.HierarchyClosure
+    rows = db.query(
+        models.Section.id.label('section_id'),
+        models.Section.name.label('section_name'),
+        models.Factory.id.label('factory_id'),
+        models.Factory.name.label('factory_name'),
+        models.Factory.is_active.label('factory_is_active')
+    ).select_from(closure).join(
+        models.Section, models.Section.id == closure.ancestor_id
+    ).join(
+        models.Factory, models.Factory.id == models.Section.factory_id
+    ).filter(
+        closure.descendant_type == 'equipment',
+        closure.descendant_id == equipment_id,
+        closure.ancestor_type == 'section'
+    ).order_by(models.Section.id).all()
     parents = []
-    equipment = _get_active_entity(db, models.Equipment, equipment_id)
-    if not equipment:
-        return parents
     processed_factories = set()
-    for section in equipment.sections:
-        parents.append(schemas.HierarchyParent(type='section', id=section.id, name=section.name))
-        if section.factory and section.factory.is_active and section.factory.id not in processed_factories:
-            parents.append(schemas.HierarchyParent(type='factory', id=section.factory.id, name=section.factory.name))
-            processed_factories.add(section.factory.id)
+    for row in rows:
+        parents.append(schemas.HierarchyParent(type='section', id=row.section_id, name=row.section_name))
+        if row.factory_is_active and row.factory_id not in processed_factories:
+            parents.append(schemas.HierarchyParent(type='factory', id=row.factory_id, name=row.factory_name))
+            processed_factories.add(row.factory_id)
     return parents
 
 def get_parents_for_section(db: Session, section_id: int) -> List[schemas.HierarchyParent]:
-    """Получает список родительских сущностей для участка."""
-    parents = []
-    section = _get_active_entity(db, models.Section, section_id)
-    if not section:
-        return parents
-    if section.factory and section.factory.is_active:
-        parents.append(schemas.HierarchyParent(type='factory', id=section.factory.id, name=section.factory.name))
-    return parents
+    """Получает список родительских сущностей для участка одним запросом по таблице замыканий."""
+    closure = models.HierarchyClosure
+    row = db.query(models.Factory.id, models.Factory.name).join(
+        closure, closure.ancestor_id == models.Factory.id
+    ).filter(
+        closure.descendant_type == 'section',
+        closure.descendant_id == section_id,
+        closure.ancestor_type == 'factory'
+    ).first()
+    if not row:
+        return []
+    return [schemas.HierarchyParent(type='factory', id=row.id, name=row.name)]
 
 def get_children_for_factory(db: Session, factory_id: int) -> List[schemas.HierarchyChild]:
-    """Получает список дочерних сущностей для фабрики."""
-    children = []
-    factory = _get_active_entity(db, models.Factory, factory_id)
-    if not factory:
-        return children
-    for section in factory.sections:
-        section_child = schemas.HierarchyChild(type='section', id=section.id, name=section.name)
-        equipment_children = []
-        for eq in section.equipment:
-            equipment_children.append(schemas.HierarchyChild(type='equipment', id=eq.id, name=eq.name, children=[]))
-        section_child.children = equipment_children
-        children.append(section_child)
-    return children
+    """Получает дерево дочерних сущностей фабрики двумя запросами по таблице замыканий."""
+    closure = models.HierarchyClosure
+    sections = db.query(models.Section.id, models.Section.name).join(
+        closure, closure.descendant_id == models.Section.id
+    ).filter(
+        closure.ancestor_type == 'factory',
+        closure.ancestor_id == factory_id,
+        closure.descendant_type == 'section'
+    ).order_by(models.Section.id).all()
+    if not sections:
+        return []
+    equipment_by_section = _equipment_children_by_section(db, models.Section.factory_id == factory_id)
+    return [
+        schemas.HierarchyChild(
+            type='section',
+            id=section.id,
+            name=section.name,
+            children=equipment_by_section.get(section.id, [])
+        )
+        for section in sections
+    ]
 
 def get_children_for_section(db: Session, section_id: int) -> List[schemas.HierarchyChild]:
-    """Получает список дочерних сущностей для участка."""
+    """Получает список дочерних сущностей для участка одним запросом."""
+    return _equipment_children_by_section(db, models.Section.id == section_id).get(section_id, [])
+
+def iter_factory_forest(db: Session, batch_size: int = 100) -> Iterator[schemas.HierarchyChild]:
+    """
+    Потоково отдаёт поддеревья всех активных фабрик.
+
+    Фабрики читаются серверным курсором (yield_per) пачками по batch_size;
+    участки и оборудование каждой пачки подгружаются двумя запросами, так что
+    в памяти одновременно находится только одна пачка поддеревьев.
+    """
+    factories = db.query(models.Factory.id, models.Factory.name).filter(
+        models.Factory.is_active == True
+    ).order_by(models.Factory.id).yield_per(batch_size)
+    factories_iter = iter(factories)
+    while True:
+        batch = list(islice(factories_iter, batch_size))
+        if not batch:
+            break
+        factory_ids = [factory.id for factory in batch]
+        sections = db.query(
+            models.Section.id, models.Section.name, models.Section.factory_id
+        ).filter(
+            models.Section.factory_id.in_(factory_ids),
+            models.Section.is_active == True
+        ).order_by(models.Section.id).all()
+        equipment_by_section = _equipment_children_by_section(
+            db, models.Section.factory_id.in_(factory_ids)
+        ) if sections else {}
+        sections_by_factory: Dict[int, List[schemas.HierarchyChild]] = defaultdict(list)
+        for section in sections:
+            sections_by_factory[section.factory_id].append(
+                schemas.HierarchyChild(
+                    type='section',
+                    id=section.id,
+                    name=section.name,
+                    children=equipment_by_section.get(section.id, [])
+                )
+            )
+        for factory in batch:
+            yield schemas.HierarchyChild(
+                type='factory',
+                id=factory.id,
+                name=factory.name,
+                children=sections_by_factory.get(factory.id, [])
+            )
+
+def get_entity_hierarchy(db: Session, entity_type: str, entity_id: int) -> Optional[schemas.HierarchyResponse]:
+    """
+    Возвращает иерархию активной сущности из кэша или строит её заново.
+
+    Возвращает None, если активная сущность не найдена (отсутствие не кэшируется).
+    """
+    key = (entity_type, entity_id)
+    found, hierarchy = hierarchy_cache.get(key)
+    if found:
+        return hierarchy
+    generation = hierarchy_cache.generation()
+    hierarchy = build_entity_hierarchy(db, entity_type, entity_id)
+    if hierarchy is not None:
+        hierarchy_cache.put(key, hierarchy, generation=generation)
+    return hierarchy
+
+def build_entity_hierarchy(db: Session, entity_type: str, entity_id: int) -> Optional[schemas.HierarchyResponse]:
+    """
+    Строит иерархию активной сущности фиксированным числом запросов.
+
+    Возвращает None, если активная сущность не найдена.
+    """
+    model = HIERARCHY_MODELS[entity_type]
+    entity_name = db.query(model.name).filter(model.id == entity_id, model.is_active == True).scalar()
+    if entity_name is None:
+        return None
+    parents = []
     children = []
-    section = _get_active_entity(db, models.Section, section_id)
-    if not section:
-        return children
-    for eq in section.equipment:
-        children.append(schemas.HierarchyChild(type='equipment', id=eq.id, name=eq.name, children=[]))
-    return children
+    if entity_type == 'factory':
+        children = get_children_for_factory(db, entity_id)
+    elif entity_type == 'section':
+        parents = get_parents_for_section(db, entity_id)
+        children = get_children_for_section(db, entity_id)
+    elif entity_type == 'equipment':
+        parents = get_parents_for_equipment(db, entity_id)
+    return schemas.HierarchyResponse(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        entity_name=entity_name,
+        parents=parents,
+        children=children
+    )
 
 def activate_factory(db: Session, factory_id: int) -> models.Factory:
     """Активирует ранее деактивированную фабрику."""
@@ -361,7 +905,10 @@ def activate_factory(db: Session, factory_id: int) -> models.Factory:
     if db_factory.is_active:
         raise AlreadyActiveError(f'Фабрика с ID {factory_id} уже активна.')
     db_factory.is_active = True
+    _refresh_closure(db, factory_ids=[factory_id])
+    _bump_versions(db, 'factories')
     db.commit()
+    _invalidate_hierarchy(_factory_scope(db, [factory_id]))
     db.refresh(db_factory)
     return db_factory
 
@@ -373,7 +920,10 @@ def activate_section(db: Session, section_id: int) -> models.Section:
     if db_section.is_active:
         raise AlreadyActiveError(f'Участок с ID {section_id} уже активен.')
     db_section.is_active = True
+    _refresh_closure(db, section_ids=[section_id], equipment_ids=[eq.id for eq in db_section.equipment])
+    _bump_versions(db, 'sections')
     db.commit()
+    _invalidate_hierarchy(_section_scope(db, [section_id]))
     db.refresh(db_section)
     return db_section
 
@@ -385,6 +935,559 @@ def activate_equipment(db: Session, equipment_id: int) -> models.Equipment:
     if db_equipment.is_active:
         raise AlreadyActiveError(f'Оборудование с ID {equipment_id} уже активно.')
     db_equipment.is_active = True
+    _refresh_closure(db, equipment_ids=[equipment_id])
+    _bump_versions(db, 'equipment')
     db.commit()
+    _invalidate_hierarchy(_equipment_scope(db, [equipment_id]))
     db.refresh(db_equipment)
     return db_equipment
+
+
+# --- Пакетное создание ---
+
+BULK_ALL_OR_NOTHING = 'all_or_nothing'
+BULK_BEST_EFFORT = 'best_effort'
+BULK_MAX_ITEMS = 10000
+
+def _active_ids(db: Session, model: Type[models.Base], entity_ids) -> set:
+    """Возвращает множество ID активных сущностей из переданных."""
+    return {
+        row.id for row in _query_in(
+            db.query(model.id).filter(model.is_active == True), model.id, set(entity_ids)
+        )
+    }
+
+
+def _finish_bulk_create(
+    db: Session,
+    table,
+    rows: List[dict],
+    errors: Dict[int, str],
+    total: int,
+    mode: str,
+    links_factory=None,
+    scope_factory=None
+) -> schemas.BulkCreateResult:
+    """
+    Вставляет валидные строки одним executemany и фиксирует транзакцию.
+
+    rows — словари значений валидных элементов с ключом '_index' (позиция
+    во входном массиве). links_factory(index, new_id) возвращает строки
+    таблицы связей для созданного объекта. scope_factory(db, new_ids)
+    возвращает ключи кэша иерархии, которые нужно сбросить после фиксации.
+    """
+    items = {
+        index: schemas.BulkItemResult(index=index, status='error', detail=detail)
+        for index, detail in errors.items()
+    }
+    if errors and mode == BULK_ALL_OR_NOTHING:
+        for row in rows:
+            items[row['_index']] = schemas.BulkItemResult(
+                index=row['_index'], status='skipped', detail='Пакет отклонён из-за ошибок в других элементах.'
+            )
+        rows = []
+    if rows:
+        values = [{key: value for key, value in row.items() if key != '_index'} for row in rows]
+        new_ids = db.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), values
+        ).scalars().all()
+        link_rows = []
+        for row, new_id in zip(rows, new_ids):
+            items[row['_index']] = schemas.BulkItemResult(index=row['_index'], status='created', id=new_id)
+            if links_factory is not None:
+                link_rows.extend(links_factory(row['_index'], new_id))
+        changed_tables = [table.name]
+        if link_rows:
+            db.execute(insert(models.section_equipment_association_table), link_rows)
+            changed_tables.append(models.section_equipment_association_table.name)
+        if table is models.Section.__table__:
+            _refresh_closure(
+                db, section_ids=new_ids, equipment_ids={link['equipment_id'] for link in link_rows}
+            )
+        elif table is models.Equipment.__table__:
+            _refresh_closure(db, equipment_ids=new_ids)
+        _bump_versions(db, *changed_tables)
+        db.commit()
+        if scope_factory is not None:
+            _invalidate_hierarchy(scope_factory(db, new_ids))
+    return schemas.BulkCreateResult(
+        mode=mode,
+        created=len(rows),
+        failed=len(errors),
+        items=[items[index] for index in range(total)]
+    )
+
+
+def bulk_create_factories(
+    db: Session, factories_data: Sequence[schemas.FactoryCreate], mode: str = BULK_ALL_OR_NOTHING
+) -> schemas.BulkCreateResult:
+    """Создаёт пакет фабрик с проверкой дубликатов наименований одним запросом."""
+    names = {item.name for item in factories_data}
+    existing_names = {
+        row.name for row in _query_in(db.query(models.Factory.name), models.Factory.name, names)
+    }
+    errors = {}
+    rows = []
+    batch_names = set()
+    for index, item in enumerate(factories_data):
+        if item.name in existing_names:
+            errors[index] = f'Фабрика с наименованием "{item.name}" уже существует (возможно, деактивирована).'
+        elif item.name in batch_names:
+            errors[index] = f'Фабрика с наименованием "{item.name}" повторяется в пакете.'
+        else:
+            batch_names.add(item.name)
+            rows.append({'_index': index, 'name': item.name, 'is_active': True})
+    return _finish_bulk_create(
+        db, models.Factory.__table__, rows, errors, len(factories_data), mode,
+        scope_factory=lambda db, new_ids: {('factory', factory_id) for factory_id in new_ids}
+    )
+
+
+def bulk_create_sections(
+    db: Session, sections_data: Sequence[schemas.SectionCreate], mode: str = BULK_ALL_OR_NOTHING
+) -> schemas.BulkCreateResult:
+    """Создаёт пакет участков с проверкой фабрик, дубликатов и оборудования набором запросов."""
+    active_factory_ids = _active_ids(db, models.Factory, {item.factory_id for item in sections_data})
+    active_equipment_ids = _active_ids(
+        db, models.Equipment, {eq_id for item in sections_data for eq_id in item.equipment_ids or []}
+    )
+    existing_pairs = {
+        (row.name, row.factory_id) for row in _query_in(
+            db.query(models.Section.name, models.Section.factory_id).filter(
+                models.Section.is_active == True,
+                models.Section.factory_id.in_(active_factory_ids)
+            ),
+            models.Section.name,
+            {item.name for item in sections_data}
+        )
+    }
+    errors = {}
+    rows = []
+    links = {}
+    batch_pairs = set()
+    for index, item in enumerate(sections_data):
+        pair = (item.name, item.factory_id)
+        missing_equipment_ids = [eq_id for eq_id in item.equipment_ids or [] if eq_id not in active_equipment_ids]
+        if item.factory_id not in active_factory_ids:
+            errors[index] = f'Активная фабрика с ID {item.factory_id} не найдена.'
+        elif pair in existing_pairs:
+            errors[index] = f'Активный участок с наименованием "{item.name}" уже существует на фабрике ID {item.factory_id}.'
+        elif pair in batch_pairs:
+            errors[index] = f'Участок с наименованием "{item.name}" для фабрики ID {item.factory_id} повторяется в пакете.'
+        elif missing_equipment_ids:
+            errors[index] = f'Активное оборудование с ID {missing_equipment_ids} не найдено.'
+        else:
+            batch_pairs.add(pair)
+            rows.append({'_index': index, 'name': item.name, 'factory_id': item.factory_id, 'is_active': True})
+            links[index] = list(dict.fromkeys(item.equipment_ids or []))
+    return _finish_bulk_create(
+        db, models.Section.__table__, rows, errors, len(sections_data), mode,
+        links_factory=lambda index, section_id: [
+            {'section_id': section_id, 'equipment_id': eq_id} for eq_id in links[index]
+        ],
+        scope_factory=_section_scope
+    )
+
+
+def bulk_create_equipment(
+    db: Session, equipment_data: Sequence[schemas.EquipmentCreate], mode: str = BULK_ALL_OR_NOTHING
+) -> schemas.BulkCreateResult:
+    """Создаёт пакет оборудования с проверкой дубликатов и участков набором запросов."""
+    existing_names = {
+        row.name for row in _query_in(
+            db.query(models.Equipment.name), models.Equipment.name, {item.name for item in equipment_data}
+        )
+    }
+    active_section_ids = _active_ids(
+        db, models.Section, {section_id for item in equipment_data for section_id in item.section_ids or []}
+    )
+    errors = {}
+    rows = []
+    links = {}
+    batch_names = set()
+    for index, item in enumerate(equipment_data):
+        missing_section_ids = [
+            section_id for section_id in item.section_ids or [] if section_id not in active_section_ids
+        ]
+        if item.name in existing_names:
+            errors[index] = f'Оборудование с наименованием "{item.name}" уже существует (возможно, деактивировано).'
+        elif item.name in batch_names:
+            errors[index] = f'Оборудование с наименованием "{item.name}" повторяется в пакете.'
+        elif missing_section_ids:
+            errors[index] = f'Активные участки с ID {missing_section_ids} не найдены.'
+        else:
+            batch_names.add(item.name)
+            rows.append({'_index': index, 'name': item.name, 'description': item.description, 'is_active': True})
+            links[index] = list(dict.fromkeys(item.section_ids or []))
+    return _finish_bulk_create(
+        db, models.Equipment.__table__, rows, errors, len(equipment_data), mode,
+        links_factory=lambda index, equipment_id: [
+            {'section_id': section_id, 'equipment_id': equipment_id} for section_id in links[index]
+        ],
+        scope_factory=_equipment_scope
+    )
+
+
+# --- Каскадная деактивация и активация ---
+
+def _set_active(db: Session, model: Type[models.Base], ids_query, is_active: bool) -> List[int]:
+    """
+    Одним UPDATE ... WHERE id IN (подзапрос) меняет флаг активности.
+
+    Затрагиваются только записи с противоположным значением флага;
+    возвращаются ID изменённых записей.
+    """
+    return list(db.execute(
+        update(model).where(
+            model.id.in_(ids_query), model.is_active == (not is_active)
+        ).values(is_active=is_active).returning(model.id)
+    ).scalars())
+
+def _cascade_result(
+    action: str, entity_type: str, entity_id: int,
+    factory_ids: List[int], section_ids: List[int], equipment_ids: List[int]
+) -> schemas.CascadeResult:
+    """Формирует отчёт о каскадном изменении активности."""
+    return schemas.CascadeResult(
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        factories=len(factory_ids),
+        sections=len(section_ids),
+        equipment=len(equipment_ids)
+    )
+
+def _commit_cascade(
+    db: Session, factory_ids: List[int], section_ids: List[int], equipment_ids: List[int], stale_keys: set
+) -> None:
+    """
+    Обновляет замыкания и версии, фиксирует каскад и сбрасывает кэш иерархии.
+
+    stale_keys — ключи кэша иерархии затронутого поддерева, собранные до фиксации.
+    """
+    _refresh_closure(
+        db,
+        factory_ids=factory_ids,
+        section_ids=section_ids,
+        equipment_ids=set(equipment_ids) | _ids_of(stale_keys, 'equipment')
+    )
+    changed_tables = [
+        table for table, ids in (
+            ('factories', factory_ids), ('sections', section_ids), ('equipment', equipment_ids)
+        ) if ids
+    ]
+    if changed_tables:
+        _bump_versions(db, *changed_tables)
+    db.commit()
+    _invalidate_hierarchy(stale_keys)
+
+def deactivate_factory_cascade(db: Session, factory_id: int) -> schemas.CascadeResult:
+    """
+    Деактивирует фабрику вместе с её активными участками и оборудованием,
+    у которого не останется активных участков на других фабриках.
+
+    Изменения выполняются тремя UPDATE с подзапросами в одной транзакции.
+    """
+    if not _get_active_entity(db, models.Factory, factory_id):
+        raise NotFoundError(f'Активная фабрика с ID {factory_id} не найдена.')
+    factory_sections = select(models.Section.id).where(
+        models.Section.factory_id == factory_id, models.Section.is_active == True
+    )
+    equipment_ids = _set_active(db, models.Equipment, _orphaned_equipment_ids(factory_sections), False)
+    section_ids = _set_active(db, models.Section, factory_sections, False)
+    factory_ids = _set_active(db, models.Factory, [factory_id], False)
+    stale_keys = _factory_scope(db, [factory_id]) | _equipment_scope(db, equipment_ids)
+    _commit_cascade(db, factory_ids, section_ids, equipment_ids, stale_keys)
+    return _cascade_result('deactivate', 'factory', factory_id, factory_ids, section_ids, equipment_ids)
+
+def activate_factory_cascade(db: Session, factory_id: int) -> schemas.CascadeResult:
+    """
+    Активирует фабрику вместе со всеми её неактивными участками и
+    неактивным оборудованием этих участков.
+    """
+    db_factory = db.query(models.Factory).filter(models.Factory.id == factory_id).first()
+    if not db_factory:
+        raise NotFoundError(f'Фабрика с ID {factory_id} не найдена.')
+    if db_factory.is_active:
+        raise AlreadyActiveError(f'Фабрика с ID {factory_id} уже активна.')
+    assoc = models.section_equipment_association_table
+    factory_sections = select(models.Section.id).where(models.Section.factory_id == factory_id)
+    equipment_ids = _set_active(
+        db, models.Equipment,
+        select(assoc.c.equipment_id).where(assoc.c.section_id.in_(factory_sections)),
+        True
+    )
+    section_ids = _set_active(db, models.Section, factory_sections, True)
+    factory_ids = _set_active(db, models.Factory, [factory_id], True)
+    stale_keys = _factory_scope(db, [factory_id]) | _equipment_scope(db, equipment_ids)
+    _commit_cascade(db, factory_ids, section_ids, equipment_ids, stale_keys)
+    return _cascade_result('activate', 'factory', factory_id, factory_ids, section_ids, equipment_ids)
+
+def deactivate_section_cascade(db: Session, section_id: int) -> schemas.CascadeResult:
+    """
+    Деактивирует участок вместе с оборудованием, у которого не останется
+    других активных участков.
+    """
+    if not _get_active_entity(db, models.Section, section_id):
+        raise NotFoundError(f'Активный участок с ID {section_id} не найден.')
+    stale_keys = _section_scope(db, [section_id])
+    equipment_ids = _set_active(
+        db, models.Equipment, _orphaned_equipment_ids(select(literal(section_id))), False
+    )
+    section_ids = _set_active(db, models.Section, [section_id], False)
+    _commit_cascade(db, [], section_ids, equipment_ids, stale_keys)
+    return _cascade_result('deactivate', 'section', section_id, [], section_ids, equipment_ids)
+
+def activate_section_cascade(db: Session, section_id: int) -> schemas.CascadeResult:
+    """Активирует участок вместе с неактивным оборудованием, привязанным к нему."""
+    db_section = db.query(models.Section).filter(models.Section.id == section_id).first()
+    if not db_section:
+        raise NotFoundError(f'Участок с ID {section_id} не найден.')
+    if db_section.is_active:
+        raise AlreadyActiveError(f'Участок с ID {section_id} уже активен.')
+    assoc = models.section_equipment_association_table
+    equipment_ids = _set_active(
+        db, models.Equipment, select(assoc.c.equipment_id).where(assoc.c.section_id == section_id), True
+    )
+    section_ids = _set_active(db, models.Section, [section_id], True)
+    # Оборудование может быть привязано и к другим активным участкам, их кэш тоже устаревает
+    stale_keys = _section_scope(db, [section_id]) | _equipment_scope(db, equipment_ids)
+    _commit_cascade(db, [], section_ids, equipment_ids, stale_keys)
+    return _cascade_result('activate', 'section', section_id, [], section_ids, equipment_ids)
+
+
+# --- Пакетная активация и деактивация ---
+
+# Функции ключей кэша иерархии, затронутых изменением сущностей, по типу
+_HIERARCHY_SCOPES = {
+    'factory': _factory_scope,
+    'section': _section_scope,
+    'equipment': _equipment_scope,
+}
+
+BULK_TOGGLE_MESSAGES = {
+    'factory': {
+        'not_found': 'Фабрика с ID {id} не найдена.',
+        'already_active': 'Фабрика с ID {id} уже активна.',
+        'already_inactive': 'Фабрика с ID {id} уже неактивна.',
+    },
+    'section': {
+        'not_found': 'Участок с ID {id} не найден.',
+        'already_active': 'Участок с ID {id} уже активен.',
+        'already_inactive': 'Участок с ID {id} уже неактивен.',
+    },
+    'equipment': {
+        'not_found': 'Оборудование с ID {id} не найдено.',
+        'already_active': 'Оборудование с ID {id} уже активно.',
+        'already_inactive': 'Оборудование с ID {id} уже неактивно.',
+    },
+}
+
+
+def _deactivation_conflicts(db: Session, entity_type: str, entity_ids: List[int]) -> Dict[int, str]:
+    """
+    Проверяет правила зависимостей для деактивации набора сущностей.
+
+    Фабрики — одним GROUP BY по активным участкам; участки — одним запросом
+    оборудования, которое останется без активных участков вне набора.
+    """
+    if not entity_ids:
+        return {}
+    if entity_type == 'factory':
+        rows = db.query(models.Section.factory_id, func.count(models.Section.id)).filter(
+            models.Section.factory_id.in_(entity_ids),
+            models.Section.is_active == True
+        ).group_by(models.Section.factory_id)
+        return {
+            factory_id: f'Нельзя деактивировать фабрику ID {factory_id}, есть {count} активных участков.'
+            for factory_id, count in rows
+        }
+    if entity_type == 'section':
+        assoc = models.section_equipment_association_table
+        rows = db.query(assoc.c.section_id, models.Equipment.name).join(
+            models.Equipment, models.Equipment.id == assoc.c.equipment_id
+        ).filter(
+            assoc.c.section_id.in_(entity_ids),
+            models.Equipment.is_active == True,
+            models.Equipment.id.in_(_orphaned_equipment_ids(entity_ids))
+        ).order_by(models.Equipment.id)
+        names_by_section: Dict[int, List[str]] = defaultdict(list)
+        for section_id, name in rows:
+            names_by_section[section_id].append(name)
+        return {
+            section_id: (
+                f'Нельзя деактивировать участок ID {section_id}, следующее активное оборудование '
+                f'({", ".join(names)}) останется без других активных участков.'
+            )
+            for section_id, names in names_by_section.items()
+        }
+    return {}
+
+
+def bulk_set_active(
+    db: Session,
+    entity_type: str,
+    entity_ids: Sequence[int],
+    is_active: bool,
+    mode: str = BULK_ALL_OR_NOTHING
+) -> schemas.BulkToggleResult:
+    """
+    Активирует или деактивирует набор сущностей одним UPDATE.
+
+    Существование, текущее состояние и правила зависимостей проверяются
+    набором запросов для всего списка; изменения фиксируются одной
+    транзакцией. Возвращает результат по каждому ID.
+    """
+    model = HIERARCHY_MODELS[entity_type]
+    messages = BULK_TOGGLE_MESSAGES[entity_type]
+    action = 'activate' if is_active else 'deactivate'
+    requested_ids = list(dict.fromkeys(entity_ids))
+    current_state = {
+        row.id: row.is_active
+        for row in _query_in(db.query(model.id, model.is_active), model.id, requested_ids)
+    }
+    results: Dict[int, schemas.BulkToggleItemResult] = {}
+    candidate_ids = []
+    for entity_id in requested_ids:
+        if entity_id not in current_state:
+            results[entity_id] = schemas.BulkToggleItemResult(
+                status='not_found', detail=messages['not_found'].format(id=entity_id)
+            )
+        elif current_state[entity_id] == is_active:
+            state = 'already_active' if is_active else 'already_inactive'
+            results[entity_id] = schemas.BulkToggleItemResult(
+                status=state, detail=messages[state].format(id=entity_id)
+            )
+        else:
+            candidate_ids.append(entity_id)
+    conflicts = {} if is_active else _deactivation_conflicts(db, entity_type, candidate_ids)
+    for entity_id, detail in conflicts.items():
+        results[entity_id] = schemas.BulkToggleItemResult(status='conflict', detail=detail)
+    valid_ids = [entity_id for entity_id in candidate_ids if entity_id not in conflicts]
+    if len(valid_ids) < len(requested_ids) and mode == BULK_ALL_OR_NOTHING:
+        for entity_id in valid_ids:
+            results[entity_id] = schemas.BulkToggleItemResult(
+                status='skipped', detail='Пакет отклонён из-за ошибок в других элементах.'
+            )
+        valid_ids = []
+    changed_ids = []
+    if valid_ids:
+        stale_keys = _HIERARCHY_SCOPES[entity_type](db, valid_ids)
+        changed_ids = _set_active(db, model, valid_ids, is_active)
+        if entity_type == 'factory':
+            _refresh_closure(db, factory_ids=changed_ids)
+        elif entity_type == 'section':
+            _refresh_closure(db, section_ids=changed_ids, equipment_ids=_ids_of(stale_keys, 'equipment'))
+        else:
+            _refresh_closure(db, equipment_ids=changed_ids)
+        _bump_versions(db, model.__tablename__)
+        db.commit()
+        _invalidate_hierarchy(stale_keys)
+    changed_set = set(changed_ids)
+    for entity_id in valid_ids:
+        if entity_id in changed_set:
+            results[entity_id] = schemas.BulkToggleItemResult(status='activated' if is_active else 'deactivated')
+        else:
+            # Запись успели изменить параллельно между проверкой и UPDATE
+            state = 'already_active' if is_active else 'already_inactive'
+            results[entity_id] = schemas.BulkToggleItemResult(
+                status=state, detail=messages[state].format(id=entity_id)
+            )
+    return schemas.BulkToggleResult(
+        action=action,
+        mode=mode,
+        changed=len(changed_ids),
+        failed=len(requested_ids) - len(changed_ids),
+        results={entity_id: results[entity_id] for entity_id in requested_ids}
+    )
+
+
+# --- Полнотекстовый поиск ---
+
+SEARCH_ENTITY_TYPES = ('factory', 'section', 'equipment')
+# Больше слов в запросе не учитывается
+SEARCH_MAX_TERMS = 16
+
+# Таблица, колонка описания и выражение ранга для каждого типа сущности.
+# Индексы FTS5 (*_fts) и триггеры синхронизации создаются миграцией d3f8b2a6c915;
+# совпадение в наименовании оборудования весит больше, чем в описании.
+_SEARCH_SOURCES = {
+    'factory': ('factories', 'NULL', 'bm25(factories_fts)'),
+    'section': ('sections', 'NULL', 'bm25(sections_fts)'),
+    'equipment': ('equipment', 't.description', 'bm25(equipment_fts, 10.0, 1.0)'),
+}
+
+
+def build_search_match(query: str, prefix: bool = True) -> Optional[str]:
+    """
+    Преобразует пользовательский запрос в выражение MATCH для FTS5.
+
+    Каждое слово берётся в кавычки (служебный синтаксис FTS5 не интерпретируется),
+    при prefix=True ищутся слова, начинающиеся с введённых. Возвращает None,
+    если в запросе нет ни одного слова.
+    """
+    terms = re.findall(r'\w+', query)[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    suffix = '*' if prefix else ''
+    return ' '.join(f'"{term}"{suffix}' for term in terms)
+
+
+def rebuild_search_index(db: Session) -> None:
+    """Перестраивает индексы полнотекстового поиска по содержимому таблиц (без фиксации)."""
+    for table, _, _ in _SEARCH_SOURCES.values():
+        db.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+
+
+def search_entities(
+    db: Session,
+    query: str,
+    entity_types: Optional[Sequence[str]] = None,
+    prefix: bool = True,
+    include_inactive: bool = False,
+    skip: int = 0,
+    limit: int = 20
+) -> List[schemas.SearchResult]:
+    """
+    Ищет фабрики, участки и оборудование по словам запроса.
+
+    Все слова должны встретиться в наименовании (или описании оборудования).
+    BM25 считается по статистике своей таблицы FTS5 и между типами не
+    сравним, поэтому ранг нормируется внутри типа: score — отношение BM25
+    записи к BM25 лучшего совпадения того же типа (1.0 — лучшее). Результаты
+    упорядочены по score, затем по типу и ID.
+    """
+    match = build_search_match(query, prefix=prefix)
+    if match is None or limit <= 0:
+        return []
+    selects = []
+    for entity_type in entity_types or SEARCH_ENTITY_TYPES:
+        table, description, rank = _SEARCH_SOURCES[entity_type]
+        active_filter = '' if include_inactive else ' AND t.is_active = 1'
+        # Каждый тип даёт не больше skip + limit лучших строк: общий сортировщик
+        # не получает все совпадения частых слов
+        selects.append(
+            f"SELECT * FROM (SELECT '{entity_type}' AS entity_type, t.id AS id, t.name AS name, "
+            f"{description} AS description, {rank} AS rank "
+            f"FROM {table}_fts JOIN {table} t ON t.id = {table}_fts.rowid "
+            f"WHERE {table}_fts MATCH :match{active_filter} ORDER BY rank, id LIMIT :window)"
+        )
+    # Лучшее совпадение типа всегда попадает в его окно, поэтому нормировка
+    # по окну совпадает с нормировкой по всем совпадениям типа
+    statement = text(
+        "SELECT entity_type, id, name, description, "
+        "COALESCE(rank / NULLIF(MIN(rank) OVER (PARTITION BY entity_type), 0), 1.0) AS score "
+        "FROM (" + ' UNION ALL '.join(selects) + ") "
+        "ORDER BY score DESC, entity_type, id LIMIT :limit OFFSET :skip"
+    )
+    rows = db.execute(statement, {'match': match, 'limit': limit, 'skip': skip, 'window': skip + limit})
+    return [
+        schemas.SearchResult(
+            entity_type=row.entity_type,
+            id=row.id,
+            name=row.name,
+            description=row.description,
+            score=row.score
+        )
+        for row in rows
+    ]
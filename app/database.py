@@ -1,14 +1,91 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = 'sqlite:///./spravochniki.db'
+from .config import StorageProfile, settings
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={
-        'check_same_thread': False
-    } if SQLALCHEMY_DATABASE_URL.startswith('sqlite') else {}
+SQLALCHEMY_DATABASE_URL = settings.database_url
+ASYNC_SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace(
+    'sqlite://', 'sqlite+aiosqlite://', 1
+)
+
+
+def _apply_pragmas(profile: StorageProfile, read_only: bool, dbapi_connection) -> None:
+    """Применяет PRAGMA профиля хранилища к новому соединению SQLite."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in profile.pragmas(read_only):
+            # Значения проверены схемой StorageProfile (перечисления и целые числа)
+            cursor.execute(f'PRAGMA {name}={value}')
+        if read_only:
+            cursor.execute('PRAGMA query_only=ON')
+    finally:
+        cursor.close()
+
+
+def read_only_url(url: str) -> str:
+    """Преобразует URL файла SQLite в URI, открываемый в режиме mode=ro."""
+    prefix, separator, path = url.partition(':///')
+    if not url.startswith('sqlite') or not separator or path.startswith('file:') or ':memory:' in path:
+        return url
+    return f'{prefix}:///file:{path}?mode=ro&uri=true'
+
+
+def _engine_kwargs(url: str, profile: StorageProfile) -> dict:
+    """Параметры создания движка с учётом профиля хранилища."""
+    if not url.startswith('sqlite'):
+        return {'pool_size': profile.pool_size, 'max_overflow': profile.max_overflow}
+    kwargs = {'connect_args': {'check_same_thread': False}}
+    # Для базы в памяти SQLAlchemy использует собственный пул без параметров размера
+    if ':memory:' not in url and not url.endswith('://'):
+        kwargs.update(pool_size=profile.pool_size, max_overflow=profile.max_overflow)
+    return kwargs
+
+
+def create_db_engine(url: str, profile: StorageProfile, read_only: bool = False) -> Engine:
+    """
+    Создаёт движок БД, применяющий профиль хранилища к каждому соединению.
+
+    При read_only=True соединения открываются с PRAGMA query_only=ON, а PRAGMA
+    записи профиля (journal_mode, synchronous) к ним не применяются.
+    """
+    db_engine = create_engine(url, **_engine_kwargs(url, profile))
+    if url.startswith('sqlite'):
+        event.listen(
+            db_engine, 'connect',
+            lambda dbapi_connection, connection_record: _apply_pragmas(profile, read_only, dbapi_connection)
+        )
+    return db_engine
+
+
+def create_async_db_engine(url: str, profile: StorageProfile, read_only: bool = False) -> AsyncEngine:
+    """Создаёт асинхронный движок БД с тем же профилем хранилища."""
+    db_engine = create_async_engine(url, **_engine_kwargs(url, profile))
+    if url.startswith('sqlite'):
+        event.listen(
+            db_engine.sync_engine, 'connect',
+            lambda dbapi_connection, connection_record: _apply_pragmas(profile, read_only, dbapi_connection)
+        )
+    return db_engine
+
+
+# Пул писателя: записи выполняются последовательно через ограниченное число
+# соединений и не конкурируют с читателями за общий пул.
+WRITE_STORAGE_PROFILE = settings.storage_profile.model_copy(
+    update={'pool_size': settings.write_pool_size, 'max_overflow': 0}
+)
+READ_SQLALCHEMY_DATABASE_URL = (
+    read_only_url(SQLALCHEMY_DATABASE_URL) if settings.sqlite_read_mode_ro else SQLALCHEMY_DATABASE_URL
+)
+ASYNC_READ_SQLALCHEMY_DATABASE_URL = READ_SQLALCHEMY_DATABASE_URL.replace(
+    'sqlite://', 'sqlite+aiosqlite://', 1
+)
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, WRITE_STORAGE_PROFILE)
+read_engine = create_db_engine(
+    READ_SQLALCHEMY_DATABASE_URL, settings.storage_profile, read_only=True
 )
 
 SessionLocal = sessionmaker(
@@ -17,6 +94,29 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine
+)
+
+async_engine = create_async_db_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, WRITE_STORAGE_PROFILE
+)
+async_read_engine = create_async_db_engine(
+    ASYNC_READ_SQLALCHEMY_DATABASE_URL, settings.storage_profile, read_only=True
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False,
+    bind=async_engine
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    autoflush=False,
+    bind=async_read_engine
+)
+
 Base = declarative_base()
 
 
@@ -27,3 +127,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Зависимость FastAPI для получения асинхронной сессии базы данных."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    """Зависимость FastAPI для получения сессии из пула только для чтения."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """Зависимость FastAPI для получения асинхронной сессии только для чтения."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,80 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional, Type
+
+from fastapi import Depends
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import async_crud
+from .database import get_async_db, get_async_read_db, get_db, get_read_db
+
+
+class DbRunner(ABC):
+    """
+    Выполняет функции crud в контексте, соответствующем режиму БД.
+
+    Маршруты вызывают await db.run(crud.fn, ...) и не зависят от режима.
+    Функции crud синхронные в обоих режимах: в режиме sync они выполняются
+    с Session в пуле потоков, в режиме async — через AsyncSession.run_sync
+    (тот же синхронный код над соединением aiosqlite), нативно асинхронного
+    доступа к БД нет.
+    """
+
+    @abstractmethod
+    async def run(
+        self,
+        fn: Callable,
+        *args,
+        response_model: Optional[Type[BaseModel]] = None,
+        **kwargs
+    ) -> Any:
+        """Вызывает fn(session, *args, **kwargs) и сериализует результат в response_model."""
+
+
+class SyncDbRunner(DbRunner):
+    """Выполняет функции crud с обычной Session в пуле потоков."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    async def run(self, fn, *args, response_model=None, **kwargs):
+        return await run_in_threadpool(
+            async_crud.call_and_serialize, self.session, fn, args, kwargs, response_model
+        )
+
+
+class AsyncDbRunner(DbRunner):
+    """
+    Выполняет синхронные функции crud через AsyncSession.run_sync: поток пула
+    не занимается, но сам вызов crud выполняется синхронно в greenlet.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def run(self, fn, *args, response_model=None, **kwargs):
+        return await async_crud.run_sync(
+            self.session, fn, *args, response_model=response_model, **kwargs
+        )
+
+
+async def get_db_runner(db: Session = Depends(get_db)) -> DbRunner:
+    """Зависимость FastAPI: исполнитель функций crud в синхронном режиме."""
+    return SyncDbRunner(db)
+
+
+async def get_async_db_runner(db: AsyncSession = Depends(get_async_db)) -> DbRunner:
+    """Зависимость FastAPI: исполнитель функций crud в асинхронном режиме."""
+    return AsyncDbRunner(db)
+
+
+async def get_read_db_runner(db: Session = Depends(get_read_db)) -> DbRunner:
+    """Зависимость FastAPI: исполнитель crud на соединениях только для чтения."""
+    return SyncDbRunner(db)
+
+
+async def get_async_read_db_runner(db: AsyncSession = Depends(get_async_read_db)) -> DbRunner:
+    """Зависимость FastAPI: асинхронный исполнитель crud только для чтения."""
+    return AsyncDbRunner(db)
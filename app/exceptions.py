@@ -41,3 +41,28 @@ class AlreadyActiveError(ValueError):
     Исключение: попытка активировать уже активную сущность.
     """
     pass
+
+
+class InvalidCursorError(ValueError):
+    """
+    Исключение: курсор пагинации повреждён или имеет неверный формат.
+    """
+    pass
+
+
+class InvalidImportRowError(ValueError):
+    """
+    Исключение: строка импортируемого файла не может быть преобразована
+    в объект справочника.
+    """
+    pass
+
+
+class NotModifiedError(Exception):
+    """
+    Исключение: представление ресурса не изменилось с версии, указанной
+    клиентом в If-None-Match.
+    """
+    def __init__(self, headers: dict) -> None:
+        super().__init__('Ресурс не изменился.')
+        self.headers = headers
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+DEFAULT_BATCH_SIZE = 1000
+
+# Выгружаемые таблицы: набор данных → (таблица, колонки сортировки)
+EXPORT_DATASETS = {
+    'factories': (models.Factory.__table__, ('id',)),
+    'sections': (models.Section.__table__, ('id',)),
+    'equipment': (models.Equipment.__table__, ('id',)),
+    'links': (models.section_equipment_association_table, ('section_id', 'equipment_id')),
+}
+
+EXPORT_MEDIA_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def iter_export(
+    db: Session, dataset: str, file_format: str, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    Потоково выгружает таблицу справочника в CSV или NDJSON.
+
+    Строки читаются Core-запросом через серверный курсор (yield_per) без
+    создания ORM-объектов; каждая пачка сразу сериализуется и отдаётся.
+    Неактивные записи выгружаются вместе с активными.
+    """
+    table, order_columns = EXPORT_DATASETS[dataset]
+    columns = [column.name for column in table.columns]
+    statement = select(table).order_by(*(table.c[name] for name in order_columns))
+    result = db.execute(statement.execution_options(yield_per=batch_size))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if file_format == 'csv' else None
+    if writer is not None:
+        writer.writerow(columns)
+    for partition in result.partitions():
+        for row in partition:
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(dict(row._mapping), ensure_ascii=False))
+                buffer.write('\n')
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
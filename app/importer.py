@@ -0,0 +1,321 @@
+import argparse
+import codecs
+import csv
+import json
+import sys
+import time
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from . import crud, models, schemas
+from .exceptions import InvalidImportRowError
+
+IMPORT_ENTITY_TYPES = ('factory', 'section', 'equipment')
+IMPORT_FORMATS = ('csv', 'ndjson')
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_MAX_ERRORS = 1000
+
+# Разделители ссылок на участки в строке оборудования:
+# "Фабрика 1/Участок А;Фабрика 2/Участок Б" (тем же ";" разделяются списки ID)
+SECTION_REFS_SEPARATOR = ';'
+FACTORY_SECTION_SEPARATOR = '/'
+
+_BULK_CREATORS = {
+    'factory': crud.bulk_create_factories,
+    'section': crud.bulk_create_sections,
+    'equipment': crud.bulk_create_equipment,
+}
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """Определяет формат файла по расширению имени."""
+    if not filename:
+        return None
+    lowered = filename.lower()
+    if lowered.endswith('.csv'):
+        return 'csv'
+    if lowered.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return None
+
+
+def find_invalid_utf8_line(binary: BinaryIO, block_size: int = 1 << 16) -> Optional[int]:
+    """
+    Проверяет, что файл целиком в кодировке UTF-8, читая его блоками.
+
+    Возвращает номер первой строки с некорректными байтами или None. Позиция
+    в файле после проверки не восстанавливается.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    line_number = 1
+    while True:
+        block = binary.read(block_size)
+        try:
+            decoder.decode(block, final=not block)
+        except UnicodeDecodeError as e:
+            # e.object — незавершённый хвост прошлого блока (без переводов строк) и текущий блок
+            return line_number + e.object[:e.start].count(b'\n')
+        if not block:
+            return None
+        line_number += block.count(b'\n')
+
+
+def iter_records(stream: TextIO, file_format: str) -> Iterator[Tuple[int, object]]:
+    """
+    Построчно читает записи из CSV или NDJSON без загрузки файла в память.
+
+    Возвращает пары (номер строки, словарь записи или InvalidImportRowError).
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, InvalidImportRowError(f'Некорректный JSON: {e.msg}.')
+            continue
+        if not isinstance(record, dict):
+            yield line_number, InvalidImportRowError('Строка NDJSON должна содержать JSON-объект.')
+            continue
+        yield line_number, record
+
+
+def _split_list(value) -> List[str]:
+    """Приводит значение поля-списка (строка CSV или массив JSON) к списку строк."""
+    if value is None or value == '':
+        return []
+    if isinstance(value, list):
+        return [item if isinstance(item, str) else str(item) for item in value]
+    return [item.strip() for item in str(value).split(SECTION_REFS_SEPARATOR) if item.strip()]
+
+
+def _parse_int(value, field: str) -> int:
+    """Преобразует значение поля в целое число."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise InvalidImportRowError(f'Поле "{field}" должно быть целым числом, получено "{value}".')
+
+
+def _parse_ids(record: dict, field: str) -> List[int]:
+    """Преобразует поле-список ID (через ";" в CSV или массив в JSON) в список чисел."""
+    return [_parse_int(value, field) for value in _split_list(record.get(field))]
+
+
+class ReferenceResolver:
+    """Словари «наименование → ID», построенные один раз на запуск импорта."""
+
+    def __init__(self, db: Session, entity_type: str) -> None:
+        self.factory_ids: Dict[str, int] = {}
+        self.section_ids: Dict[Tuple[str, str], int] = {}
+        if entity_type == 'section':
+            self.factory_ids = dict(
+                db.query(models.Factory.name, models.Factory.id).filter(
+                    models.Factory.is_active == True
+                )
+            )
+        elif entity_type == 'equipment':
+            rows = db.query(
+                models.Factory.name, models.Section.name, models.Section.id
+            ).join(
+                models.Section, models.Section.factory_id == models.Factory.id
+            ).filter(models.Section.is_active == True)
+            self.section_ids = {
+                (factory_name, section_name): section_id
+                for factory_name, section_name, section_id in rows
+            }
+
+    def factory_id(self, record: dict) -> int:
+        """Определяет ID фабрики участка по полю factory_id или factory."""
+        if record.get('factory_id') not in (None, ''):
+            return _parse_int(record['factory_id'], 'factory_id')
+        factory_name = record.get('factory')
+        if not factory_name:
+            raise InvalidImportRowError('Не указана фабрика участка (поле "factory" или "factory_id").')
+        if factory_name not in self.factory_ids:
+            raise InvalidImportRowError(f'Активная фабрика "{factory_name}" не найдена.')
+        return self.factory_ids[factory_name]
+
+    def _section_id_by_ref(self, ref: str) -> Optional[int]:
+        """
+        Находит участок по ссылке "фабрика/участок".
+
+        "/" может входить и в наименования, поэтому перебираются все позиции
+        разделителя, пока пара наименований не найдётся среди известных.
+        """
+        position = ref.find(FACTORY_SECTION_SEPARATOR)
+        while position != -1:
+            key = (ref[:position].strip(), ref[position + 1:].strip())
+            if key in self.section_ids:
+                return self.section_ids[key]
+            position = ref.find(FACTORY_SECTION_SEPARATOR, position + 1)
+        return None
+
+    def section_ids_for(self, record: dict) -> List[int]:
+        """Определяет ID участков оборудования по полям section_ids и sections."""
+        section_ids = _parse_ids(record, 'section_ids')
+        missing_refs = []
+        for ref in _split_list(record.get('sections')):
+            section_id = self._section_id_by_ref(ref)
+            if section_id is None:
+                missing_refs.append(ref)
+            else:
+                section_ids.append(section_id)
+        if missing_refs:
+            raise InvalidImportRowError(f'Активные участки {missing_refs} не найдены.')
+        return section_ids
+
+
+def _build_item(entity_type: str, record: dict, resolver: ReferenceResolver):
+    """Преобразует запись файла в схему создания сущности."""
+    try:
+        if entity_type == 'factory':
+            return schemas.FactoryCreate(name=record.get('name'))
+        if entity_type == 'section':
+            return schemas.SectionCreate(
+                name=record.get('name'),
+                factory_id=resolver.factory_id(record),
+                equipment_ids=_parse_ids(record, 'equipment_ids')
+            )
+        return schemas.EquipmentCreate(
+            name=record.get('name'),
+            description=record.get('description') or None,
+            section_ids=resolver.section_ids_for(record)
+        )
+    except ValidationError as e:
+        fields = ', '.join(str(error['loc'][0]) for error in e.errors() if error['loc'])
+        raise InvalidImportRowError(f'Некорректные значения полей: {fields}.')
+
+
+def run_import(
+    db: Session,
+    entity_type: str,
+    stream: TextIO,
+    file_format: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_errors: int = DEFAULT_MAX_ERRORS,
+    on_chunk: Optional[Callable[[schemas.ImportReport], None]] = None
+) -> schemas.ImportReport:
+    """
+    Импортирует сущности из потока порциями по chunk_size строк.
+
+    Каждая порция создаётся через crud.bulk_create_* в режиме best_effort
+    отдельной транзакцией, поэтому действуют те же правила проверки, что и
+    при создании через API.
+    """
+    bulk_create = _BULK_CREATORS[entity_type]
+    resolver = ReferenceResolver(db, entity_type)
+    started_at = time.perf_counter()
+    report = schemas.ImportReport(
+        entity_type=entity_type,
+        format=file_format,
+        rows_total=0,
+        created=0,
+        failed=0,
+        elapsed_seconds=0.0,
+        rows_per_second=0.0
+    )
+
+    def add_error(line: int, detail: str) -> None:
+        report.failed += 1
+        if len(report.errors) < max_errors:
+            report.errors.append(schemas.ImportRowError(line=line, detail=detail))
+        else:
+            report.errors_truncated = True
+
+    def update_timing() -> None:
+        elapsed = time.perf_counter() - started_at
+        report.elapsed_seconds = round(elapsed, 3)
+        report.rows_per_second = round(report.rows_total / elapsed, 1) if elapsed > 0 else 0.0
+
+    def flush(chunk: List[Tuple[int, object]]) -> None:
+        result = bulk_create(db, [item for _, item in chunk], mode=crud.BULK_BEST_EFFORT)
+        report.created += result.created
+        for (line, _), item_result in zip(chunk, result.items):
+            if item_result.status == 'error':
+                add_error(line, item_result.detail)
+        update_timing()
+        if on_chunk is not None:
+            on_chunk(report)
+
+    chunk: List[Tuple[int, object]] = []
+    for line, record in iter_records(stream, file_format):
+        report.rows_total += 1
+        try:
+            if isinstance(record, InvalidImportRowError):
+                raise record
+            chunk.append((line, _build_item(entity_type, record, resolver)))
+        except InvalidImportRowError as e:
+            add_error(line, str(e))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    report.errors.sort(key=lambda error: error.line)
+    update_timing()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа CLI: python -m app.importer <тип> <файл>."""
+    parser = argparse.ArgumentParser(
+        prog='python -m app.importer',
+        description='Потоковый импорт справочников из CSV или NDJSON.'
+    )
+    parser.add_argument('entity_type', choices=IMPORT_ENTITY_TYPES, help='Тип импортируемых сущностей')
+    parser.add_argument('path', help='Путь к файлу (или "-" для stdin)')
+    parser.add_argument('--format', choices=IMPORT_FORMATS, help='Формат файла (по умолчанию — по расширению)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Строк в одной транзакции')
+    parser.add_argument('--max-errors', type=int, default=DEFAULT_MAX_ERRORS, help='Сколько ошибок сохранить в отчёте')
+    args = parser.parse_args(argv)
+
+    file_format = args.format or detect_format(args.path)
+    if file_format is None:
+        parser.error('Не удалось определить формат файла, укажите --format.')
+    if not 1 <= args.chunk_size <= crud.BULK_MAX_ITEMS:
+        parser.error(f'--chunk-size должен быть от 1 до {crud.BULK_MAX_ITEMS}.')
+
+    from .database import SessionLocal
+
+    def print_progress(report: schemas.ImportReport) -> None:
+        print(
+            f'{report.rows_total} строк, создано {report.created}, ошибок {report.failed}, '
+            f'{report.rows_per_second} строк/с',
+            file=sys.stderr
+        )
+
+    if args.path != '-':
+        with open(args.path, 'rb') as binary:
+            invalid_line = find_invalid_utf8_line(binary)
+        if invalid_line is not None:
+            parser.error(f'Файл должен быть в кодировке UTF-8: некорректные байты в строке {invalid_line}.')
+    stream = sys.stdin if args.path == '-' else open(args.path, encoding='utf-8-sig', newline='')
+    db = SessionLocal()
+    try:
+        report = run_import(
+            db,
+            args.entity_type,
+            stream,
+            file_format,
+            chunk_size=args.chunk_size,
+            max_errors=args.max_errors,
+            on_chunk=print_progress
+        )
+    finally:
+        db.close()
+        if stream is not sys.stdin:
+            stream.close()
+    print(report.model_dump_json(indent=2))
+    return 0 if report.failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from .config import settings
+from .metrics import HTTP_REQUESTS_IN_PROGRESS, observe_query, observe_request, route_template
+
+# Журнал запросов к API: одна JSON-строка на запрос
+request_logger = logging.getLogger('app.requests')
+
+# Ключ Connection.info со стеком времён начала выполняемых запросов
+_STARTED_AT_KEY = 'query_started_at'
+
+
+class QueryStats:
+    """Число и суммарное время SQL-запросов, выполненных в рамках одного запроса к API."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.elapsed = 0.0
+
+    @property
+    def time_ms(self) -> float:
+        """Суммарное время выполнения запросов в миллисекундах."""
+        return round(self.elapsed * 1000, 3)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    'db_query_stats', default=None
+)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """Увеличивает счётчик запросов активного контекста и запоминает время начала."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+    conn.info.setdefault(_STARTED_AT_KEY, []).append(time.perf_counter())
+
+
+def _finish_query(conn, statement: str) -> None:
+    """Учитывает время завершившегося запроса в метриках и статистике контекста."""
+    started = conn.info.get(_STARTED_AT_KEY)
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    observe_query(statement, elapsed)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.elapsed += elapsed
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _time_query(conn, cursor, statement, parameters, context, executemany):
+    """Учитывает время выполнения запроса."""
+    _finish_query(conn, statement)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _time_failed_query(exception_context):
+    """Учитывает время запроса, завершившегося ошибкой."""
+    if exception_context.connection is not None:
+        _finish_query(exception_context.connection, exception_context.statement or '')
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Считает SQL-запросы и их суммарное время внутри блока."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def log_request(
+    method: str,
+    path: str,
+    route: Optional[str],
+    status_code: int,
+    duration: float,
+    stats: QueryStats
+) -> None:
+    """
+    Пишет в журнал app.requests запись о запросе к API в виде JSON.
+
+    Те же поля передаются в extra под ключом request_stats для обработчиков,
+    которые форматируют записи сами.
+    """
+    record = {
+        'method': method,
+        'path': path,
+        'route': route,
+        'status': status_code,
+        'duration_ms': round(duration * 1000, 3),
+        'db_queries': stats.count,
+        'db_time_ms': stats.time_ms,
+    }
+    request_logger.info(json.dumps(record, ensure_ascii=False), extra={'request_stats': record})
+
+
+class RequestStatsMiddleware:
+    """
+    ASGI-middleware: SQL-запросы, их время и метрики каждого запроса к API.
+
+    Учёт закрывается после последнего сообщения http.response.body, поэтому
+    метрики и журнал app.requests включают запросы, выполненные при
+    формировании тела потокового ответа (/export, /hierarchy/forest).
+    Заголовки X-DB-Queries и X-DB-Time-ms отправляются до тела и содержат
+    только запросы, выполненные до начала ответа.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        started_at = time.perf_counter()
+        method = scope['method']
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        status_code = 500
+
+        with track_queries() as stats:
+            async def send_with_stats(message) -> None:
+                nonlocal status_code
+                if message['type'] == 'http.response.start':
+                    status_code = message['status']
+                    if settings.db_stats_headers:
+                        headers = MutableHeaders(scope=message)
+                        headers['X-DB-Queries'] = str(stats.count)
+                        headers['X-DB-Time-ms'] = f'{stats.time_ms:.3f}'
+                await send(message)
+
+            in_progress.inc()
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                in_progress.dec()
+                duration = time.perf_counter() - started_at
+                route = route_template(scope)
+                observe_request(method, route, status_code, duration, stats.elapsed)
+                if settings.request_log:
+                    log_request(method, scope['path'], route, status_code, duration, stats)
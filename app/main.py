@@ -1,12 +1,16 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from prometheus_client import CONTENT_TYPE_LATEST
 from contextlib import asynccontextmanager
+import logging
 import subprocess
 import os
 
-from app.routers import factories, sections, equipment, hierarchy
+from app.routers import (
+    factories, sections, equipment, hierarchy, imports, export, diagnostics, search
+)
 from app.exceptions import (
     NotFoundError,
     DuplicateError,
@@ -14,7 +18,19 @@ from app.exceptions import (
     DependentActiveChildError,
     AlreadyInactiveError,
     AlreadyActiveError,
+    InvalidCursorError,
+    NotModifiedError,
+)
+from app.config import settings
+from app.database import async_engine, async_read_engine, engine, read_engine
+from app.db_runner import (
+    get_async_db_runner,
+    get_async_read_db_runner,
+    get_db_runner,
+    get_read_db_runner,
 )
+from app.instrumentation import RequestStatsMiddleware, request_logger
+from app.metrics import instrument_pool, render_metrics
 import app.models  # Чтобы Alembic видел модели
 
 ALEMBIC_INI_PATH = os.path.join(
@@ -30,7 +46,11 @@ async def lifespan(app_: FastAPI):
             os.path.dirname(os.path.abspath(__file__))
         )
         proc = subprocess.run(
-            ["alembic", "-c", ALEMBIC_INI_PATH, "upgrade", "head"],
+            [
+                "alembic", "-c", ALEMBIC_INI_PATH,
+                "-x", f"db_url={settings.database_url}",
+                "upgrade", "head"
+            ],
             capture_output=True,
             text=True,
             check=False,
@@ -43,6 +63,8 @@ async def lifespan(app_: FastAPI):
     else:
         print("alembic.ini not found, skipping migrations.")
     yield
+    await async_engine.dispose()
+    await async_read_engine.dispose()
 
 app = FastAPI(title='Справочники API', lifespan=lifespan)
 app.mount('/static', StaticFiles(directory='app/static'), name='static')
@@ -53,6 +75,28 @@ app.include_router(factories.router)
 app.include_router(sections.router)
 app.include_router(equipment.router)
 app.include_router(hierarchy.router)
+app.include_router(imports.router)
+app.include_router(export.router)
+app.include_router(diagnostics.router)
+app.include_router(search.router)
+
+# Выбор синхронного (пул потоков) или асинхронного (AsyncSession) пути к БД
+if settings.db_mode == 'async':
+    app.dependency_overrides[get_db_runner] = get_async_db_runner
+    app.dependency_overrides[get_read_db_runner] = get_async_read_db_runner
+
+if settings.request_log and not request_logger.handlers:
+    request_logger.addHandler(logging.StreamHandler())
+    request_logger.setLevel(logging.INFO)
+
+# Метрики пулов соединений (для async-движков — их синхронные пулы)
+instrument_pool(engine, 'write')
+instrument_pool(read_engine, 'read')
+instrument_pool(async_engine.sync_engine, 'async_write')
+instrument_pool(async_read_engine.sync_engine, 'async_read')
+
+# Учёт SQL-запросов, метрики и журнал запросов к API
+app.add_middleware(RequestStatsMiddleware)
 
 # Обработчики исключений
 @app.exception_handler(NotFoundError)
@@ -105,6 +149,22 @@ async def already_active_error_handler(
         status_code=400, content={'detail': str(exc)}
     )
 
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_error_handler(
+    request: Request, exc: InvalidCursorError
+):
+    """Обработчик для InvalidCursorError."""
+    return JSONResponse(
+        status_code=400, content={'detail': str(exc)}
+    )
+
+@app.exception_handler(NotModifiedError)
+async def not_modified_error_handler(
+    request: Request, exc: NotModifiedError
+):
+    """Обработчик для NotModifiedError: ответ 304 без тела."""
+    return Response(status_code=304, headers=exc.headers)
+
 @app.get('/favicon.ico', include_in_schema=False)
 async def favicon():
     """Возвращает favicon.ico."""
@@ -115,6 +175,11 @@ async def get_ui_form(request: Request):
     """HTML-интерфейс для управления справочниками."""
     return templates.TemplateResponse('index.html', {'request': request})
 
+@app.get('/metrics', tags=['Health'])
+async def metrics():
+    """Метрики приложения в текстовом формате Prometheus (все рабочие процессы)."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get('/ping', tags=['Health'])
 async def ping():
     """Проверка доступности API."""
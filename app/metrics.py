@@ -0,0 +1,123 @@
+import os
+from typing import Optional
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Метрики пишутся в общий каталог, если задан PROMETHEUS_MULTIPROC_DIR
+# (несколько рабочих процессов gunicorn, см. gunicorn.conf.py)
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+# Метка маршрута для запросов, не совпавших ни с одним маршрутом
+UNMATCHED_ROUTE = 'unmatched'
+
+# Границы гистограмм, с: от долей миллисекунды (запрос к SQLite) до секунд
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'Запросы к API', ['method', 'route', 'status']
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Длительность обработки запроса к API',
+    ['method', 'route'], buckets=REQUEST_BUCKETS
+)
+# Без метки маршрута: маршрут известен только после маршрутизации запроса
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'Запросы к API в обработке',
+    ['method'], multiprocess_mode='livesum'
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_seconds', 'Суммарное время SQL-запросов одного запроса к API',
+    ['method', 'route'], buckets=REQUEST_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram(
+    'db_query_duration_seconds', 'Длительность выполнения SQL-запроса',
+    ['operation'], buckets=QUERY_BUCKETS
+)
+DB_POOL_CHECKOUTS = Counter(
+    'db_pool_checkouts_total', 'Выдачи соединений из пула', ['pool']
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Соединения, выданные из пула и не возвращённые',
+    ['pool'], multiprocess_mode='livesum'
+)
+DB_POOL_CONNECTS = Counter(
+    'db_pool_connections_created_total', 'Новые соединения с БД, открытые пулом', ['pool']
+)
+
+# Операции SQL, для остальных используется метка other
+_SQL_OPERATIONS = ('select', 'insert', 'update', 'delete', 'pragma')
+
+
+def route_template(scope) -> str:
+    """
+    Возвращает шаблон маршрута обработанного запроса (например, /factories/{factory_id}).
+
+    Шаблон, а не фактический путь, ограничивает число значений метки route.
+    Роутер записывает найденный маршрут в scope, поэтому вызывается после
+    обработки запроса.
+    """
+    return getattr(scope.get('route'), 'path', UNMATCHED_ROUTE)
+
+
+def query_operation(statement: str) -> str:
+    """Возвращает метку операции SQL по первому слову запроса."""
+    operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ''
+    if operation == 'with':
+        return 'select'
+    return operation if operation in _SQL_OPERATIONS else 'other'
+
+
+def observe_query(statement: str, elapsed: float) -> None:
+    """Учитывает время выполнения SQL-запроса."""
+    DB_QUERY_SECONDS.labels(query_operation(statement)).observe(elapsed)
+
+
+def observe_request(method: str, route: str, status_code: int, duration: float, db_elapsed: float) -> None:
+    """Учитывает завершённый запрос к API: счётчик, длительность и время SQL."""
+    HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+    HTTP_REQUEST_SECONDS.labels(method, route).observe(duration)
+    HTTP_REQUEST_DB_SECONDS.labels(method, route).observe(db_elapsed)
+
+
+def instrument_pool(engine: Engine, pool_name: str) -> None:
+    """Подписывается на события пула соединений движка."""
+    pool = engine.pool
+
+    @event.listens_for(pool, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTS.labels(pool_name).inc()
+
+    @event.listens_for(pool, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(pool_name).inc()
+        DB_POOL_CHECKED_OUT.labels(pool_name).inc()
+
+    @event.listens_for(pool, 'checkin')
+    def _on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.labels(pool_name).dec()
+
+
+def render_metrics(multiproc_dir: Optional[str] = None) -> bytes:
+    """
+    Формирует метрики в текстовом формате Prometheus.
+
+    В многопроцессном режиме значения собираются из файлов всех рабочих
+    процессов, иначе — из реестра текущего процесса.
+    """
+    multiproc_dir = multiproc_dir or os.getenv(MULTIPROC_DIR_ENV)
+    if not multiproc_dir:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=multiproc_dir)
+    return generate_latest(registry)
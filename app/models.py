@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, Integer, String, Text, ForeignKey, Table, Boolean, and_
+    Column, Integer, String, Text, ForeignKey, Table, Boolean, DateTime, Index, and_
 )
 from sqlalchemy.orm import relationship
 
@@ -22,13 +22,19 @@ section_equipment_association_table = Table(
         ForeignKey('equipment.id'),
         primary_key=True,
         doc='Внешний ключ к таблице оборудования'
-    )
+    ),
+    # Участки оборудования (первичный ключ покрывает обратное направление)
+    Index('ix_section_equipment_association_equipment_id', 'equipment_id', 'section_id')
 )
 
 
 class Factory(Base):
     """Модель Фабрики."""
     __tablename__ = 'factories'
+    __table_args__ = (
+        # Списки с фильтром по активности и сортировкой или префиксом наименования
+        Index('ix_factories_is_active_name', 'is_active', 'name'),
+    )
 
     id = Column(Integer, primary_key=True, index=True, doc='Айди фабрики')
     name = Column(String, unique=True, index=True, nullable=False, doc='Наименование фабрики')
@@ -46,6 +52,11 @@ class Factory(Base):
 class Section(Base):
     """Модель Участка."""
     __tablename__ = 'sections'
+    __table_args__ = (
+        # Участки фабрики с фильтром по активности
+        Index('ix_sections_factory_id_is_active', 'factory_id', 'is_active'),
+        Index('ix_sections_is_active_name', 'is_active', 'name'),
+    )
 
     id = Column(Integer, primary_key=True, index=True, doc='Айди участка')
     name = Column(String, index=True, nullable=False, doc='Наименование участка')
@@ -74,6 +85,9 @@ class Section(Base):
 class Equipment(Base):
     """Модель Оборудования."""
     __tablename__ = 'equipment'
+    __table_args__ = (
+        Index('ix_equipment_is_active_name', 'is_active', 'name'),
+    )
 
     id = Column(Integer, primary_key=True, index=True, doc='Айди оборудования')
     name = Column(String, unique=True, index=True, nullable=False, doc='Наименование оборудования')
@@ -91,3 +105,31 @@ class Equipment(Base):
         ),
         doc='Участки, на которых находится оборудование'
     )
+
+
+class ChangeVersion(Base):
+    """Модель версии изменений таблицы (для ETag условных запросов)."""
+    __tablename__ = 'change_versions'
+
+    table_name = Column(String, primary_key=True, doc='Имя таблицы')
+    version = Column(Integer, default=0, nullable=False, doc='Номер версии, растёт при каждом изменении')
+    updated_at = Column(DateTime, nullable=False, doc='Время последнего изменения (UTC)')
+
+
+class HierarchyClosure(Base):
+    """
+    Модель таблицы замыканий иерархии фабрика → участок → оборудование.
+
+    Содержит пары «предок — потомок» только для активных путей: строка есть,
+    если активны обе сущности и все промежуточные участки.
+    """
+    __tablename__ = 'hierarchy_closure'
+    __table_args__ = (
+        Index('ix_hierarchy_closure_descendant', 'descendant_type', 'descendant_id', 'ancestor_type'),
+    )
+
+    ancestor_type = Column(String, primary_key=True, doc='Тип предка')
+    ancestor_id = Column(Integer, primary_key=True, doc='ID предка')
+    descendant_type = Column(String, primary_key=True, doc='Тип потомка')
+    descendant_id = Column(Integer, primary_key=True, doc='ID потомка')
+    depth = Column(Integer, nullable=False, doc='Расстояние от предка до потомка')
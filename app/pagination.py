@@ -0,0 +1,87 @@
+import base64
+import binascii
+import json
+from typing import NamedTuple, Optional
+
+from .exceptions import InvalidCursorError
+
+# Допустимые сортировки списков: поле и направление ("-" — по убыванию).
+# Последним ключом сортировки всегда служит ID, поэтому порядок однозначен.
+LIST_SORTS = ('id', '-id', 'name', '-name')
+
+# Наибольший ID: INTEGER в SQLite — знаковое 64-битное целое, большее значение
+# драйвер не может передать в запрос
+MAX_ID = 2 ** 63 - 1
+
+
+class Keyset(NamedTuple):
+    """Позиция последней записи страницы для keyset-пагинации."""
+    id: int
+    value: object = None
+
+
+def _is_valid_id(value: object) -> bool:
+    """Проверяет ID из курсора: целое число (не bool) в диапазоне INTEGER SQLite."""
+    return type(value) is int and -MAX_ID - 1 <= value <= MAX_ID
+
+
+def sort_field(sort: str) -> str:
+    """Возвращает поле сортировки без признака направления."""
+    return sort.lstrip('-')
+
+
+def encode_cursor(last_id: int, sort: str = 'id', value: object = None) -> str:
+    """
+    Кодирует позицию последней записи страницы в непрозрачный курсор.
+
+    При сортировке по ID курсор содержит только ID, иначе — ещё и значение
+    поля сортировки.
+    """
+    if sort_field(sort) == 'id':
+        raw = f'id:{last_id}'
+    else:
+        raw = f'{sort}:' + json.dumps([value, last_id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str = 'id') -> Keyset:
+    """Декодирует курсор обратно в позицию последней записи страницы."""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError('Некорректный курсор пагинации.')
+    prefix, _, value = raw.partition(':')
+    if sort_field(sort) == 'id':
+        if prefix != 'id' or not (value.isascii() and value.isdigit() and _is_valid_id(int(value))):
+            raise InvalidCursorError('Некорректный курсор пагинации.')
+        return Keyset(int(value))
+    if prefix != sort:
+        raise InvalidCursorError('Курсор пагинации получен для другой сортировки.')
+    try:
+        sort_value, last_id = json.loads(value)
+    except (ValueError, TypeError):
+        raise InvalidCursorError('Некорректный курсор пагинации.')
+    # Поле сортировки (наименование) — строка; иное значение дошло бы до драйвера БД
+    if not _is_valid_id(last_id) or not isinstance(sort_value, str):
+        raise InvalidCursorError('Некорректный курсор пагинации.')
+    return Keyset(last_id, sort_value)
+
+
+def resolve_keyset(after_id: Optional[int], cursor: Optional[str], sort: str = 'id') -> Optional[Keyset]:
+    """Возвращает позицию, после которой начинается страница (из after_id или курсора)."""
+    if cursor is not None:
+        return decode_cursor(cursor, sort)
+    if after_id is None:
+        return None
+    if sort_field(sort) != 'id':
+        raise InvalidCursorError('Параметр after_id допустим только при сортировке по ID, используйте cursor.')
+    return Keyset(after_id)
+
+
+def next_cursor(items: list, limit: int, sort: str = 'id') -> Optional[str]:
+    """Формирует курсор следующей страницы, если текущая заполнена целиком."""
+    if limit <= 0 or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.id, sort, getattr(last, sort_field(sort)))
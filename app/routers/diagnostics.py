@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..cache import cache_coherence, hierarchy_cache
+from ..config import settings
+from ..database import engine, get_read_db
+
+router = APIRouter(
+    prefix='/diagnostics',
+    tags=['diagnostics'],
+)
+
+# PRAGMA, значения которых показываются в диагностике хранилища
+STORAGE_PRAGMAS = (
+    'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout',
+    'query_only'
+)
+
+
+@router.get('/storage', response_model=schemas.StorageDiagnostics)
+def get_storage_diagnostics(db: Session = Depends(get_read_db)):
+    """Возвращает активный профиль хранилища и фактические PRAGMA соединения чтения."""
+    connection = db.connection()
+    effective_pragmas = {}
+    if connection.dialect.name == 'sqlite':
+        effective_pragmas = {
+            name: connection.execute(text(f'PRAGMA {name}')).scalar()
+            for name in STORAGE_PRAGMAS
+        }
+    return schemas.StorageDiagnostics(
+        profile=settings.storage_profile,
+        effective_pragmas=effective_pragmas,
+        pool=connection.engine.pool.status(),
+        write_pool=engine.pool.status()
+    )
+
+
+@router.get('/cache', response_model=schemas.CacheStats)
+def get_cache_diagnostics():
+    """Возвращает размер и счётчики кэша иерархии текущего процесса."""
+    return schemas.CacheStats(
+        **hierarchy_cache.stats(), coherence_flushes=cache_coherence.flushes
+    )
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal, Optional
 
 from fastapi import (
     APIRouter,
@@ -6,19 +6,22 @@ from fastapi import (
     Depends,
     HTTPException,
     Query,
+    Response,
     status
 )
-from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..conditional import conditional_get
+from ..db_runner import DbRunner, get_db_runner, get_read_db_runner
 from ..exceptions import (
     AlreadyActiveError,
     AlreadyInactiveError,
     DuplicateError,
+    InvalidCursorError,
     NotFoundError,
     RelatedEntityNotFoundError
 )
+from ..pagination import MAX_ID, next_cursor, resolve_keyset
 
 router = APIRouter(
     prefix='/equipment',
@@ -31,13 +34,17 @@ router = APIRouter(
     response_model=schemas.Equipment,
     status_code=status.HTTP_201_CREATED
 )
-def create_equipment_endpoint(
+async def create_equipment_endpoint(
     equipment_data: schemas.EquipmentCreate = Body(...),
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_db_runner)
 ):
     """Создаёт новое оборудование."""
     try:
-        return crud.create_equipment(db=db, equipment_data=equipment_data)
+        return await db.run(
+            crud.create_equipment,
+            equipment_data=equipment_data,
+            response_model=schemas.Equipment
+        )
     except DuplicateError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
@@ -48,34 +55,148 @@ def create_equipment_endpoint(
         )
 
 
-@router.get('/', response_model=List[schemas.Equipment])
-def read_equipment_list(
+@router.post(
+    '/bulk',
+    response_model=schemas.BulkCreateResult,
+    status_code=status.HTTP_201_CREATED,
+    summary='Пакетное создание оборудования'
+)
+async def bulk_create_equipment_endpoint(
+    response: Response,
+    equipment_data: List[schemas.EquipmentCreate] = Body(..., max_length=crud.BULK_MAX_ITEMS),
+    mode: Literal['all_or_nothing', 'best_effort'] = Query(
+        crud.BULK_ALL_OR_NOTHING,
+        description='all_or_nothing — всё или ничего, best_effort — создать валидные элементы'
+    ),
+    db: DbRunner = Depends(get_db_runner)
+):
+    """Создаёт пакет оборудования одной транзакцией с результатом по каждому элементу."""
+    result = await db.run(
+        crud.bulk_create_equipment,
+        equipment_data,
+        mode=mode
+    )
+    if result.failed and not result.created:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return result
+
+
+@router.post(
+    '/bulk/deactivate',
+    response_model=schemas.BulkToggleResult,
+    summary='Пакетная деактивация оборудования'
+)
+async def bulk_deactivate_equipment_endpoint(
+    response: Response,
+    equipment_ids: List[schemas.EntityId] = Body(..., max_length=crud.BULK_MAX_ITEMS),
+    mode: Literal['all_or_nothing', 'best_effort'] = Query(
+        crud.BULK_ALL_OR_NOTHING,
+        description='all_or_nothing — всё или ничего, best_effort — изменить допустимые ID'
+    ),
+    db: DbRunner = Depends(get_db_runner)
+):
+    """Деактивирует набор оборудования одним UPDATE с результатом по каждому ID."""
+    result = await db.run(crud.bulk_set_active, 'equipment', equipment_ids, False, mode=mode)
+    if result.failed and not result.changed:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return result
+
+
+@router.post(
+    '/bulk/activate',
+    response_model=schemas.BulkToggleResult,
+    summary='Пакетная активация оборудования'
+)
+async def bulk_activate_equipment_endpoint(
+    response: Response,
+    equipment_ids: List[schemas.EntityId] = Body(..., max_length=crud.BULK_MAX_ITEMS),
+    mode: Literal['all_or_nothing', 'best_effort'] = Query(
+        crud.BULK_ALL_OR_NOTHING,
+        description='all_or_nothing — всё или ничего, best_effort — изменить допустимые ID'
+    ),
+    db: DbRunner = Depends(get_db_runner)
+):
+    """Активирует набор оборудования одним UPDATE с результатом по каждому ID."""
+    result = await db.run(crud.bulk_set_active, 'equipment', equipment_ids, True, mode=mode)
+    if result.failed and not result.changed:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return result
+
+
+@router.get(
+    '/',
+    response_model=List[schemas.Equipment],
+    dependencies=[Depends(conditional_get('equipment', 'sections', 'section_equipment_association'))]
+)
+async def read_equipment_list(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     include_inactive: bool = Query(
         False, description='Включить неактивное оборудование'
     ),
-    db: Session = Depends(get_db)
+    is_active: Optional[bool] = Query(
+        None, description='Фильтр по активности (важнее include_inactive)'
+    ),
+    name_prefix: Optional[str] = Query(
+        None, min_length=1, description='Наименование начинается с указанной строки (с учётом регистра)'
+    ),
+    section_id: Optional[int] = Query(None, description='Только оборудование, привязанное к участку'),
+    factory_id: Optional[int] = Query(None, description='Только оборудование, привязанное к участкам фабрики'),
+    sort: Literal['id', '-id', 'name', '-name'] = Query(
+        'id', description='Поле сортировки, "-" — по убыванию'
+    ),
+    after_id: Optional[int] = Query(
+        None, le=MAX_ID, description='Keyset-пагинация: вернуть записи после указанного ID (только при сортировке по ID)'
+    ),
+    cursor: Optional[str] = Query(
+        None, description='Непрозрачный курсор из заголовка X-Next-Cursor'
+    ),
+    db: DbRunner = Depends(get_read_db_runner)
 ):
     """
     Получает список оборудования (по умолчанию только активные).
     """
-    return crud.get_equipment_list(
-        db, skip=skip, limit=limit, only_active=not include_inactive
+    try:
+        keyset = resolve_keyset(after_id, cursor, sort)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
+    items = await db.run(
+        crud.get_equipment_list,
+        skip=skip,
+        limit=limit,
+        only_active=not include_inactive,
+        after_id=keyset.id if keyset else None,
+        after_value=keyset.value if keyset else None,
+        sort=sort,
+        name_prefix=name_prefix,
+        is_active=is_active,
+        section_id=section_id,
+        factory_id=factory_id,
+        response_model=schemas.Equipment
     )
+    cursor_value = next_cursor(items, limit, sort)
+    if cursor_value is not None:
+        response.headers['X-Next-Cursor'] = cursor_value
+    return items
 
 
 @router.get('/{equipment_id}', response_model=schemas.EquipmentFull)
-def read_equipment_item(
+async def read_equipment_item(
     equipment_id: int,
     include_inactive: bool = Query(
         False, description='Получить оборудование даже если оно неактивно'
     ),
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_read_db_runner)
 ):
     """Получает оборудование по его ID."""
-    equipment = crud.get_equipment(
-        db, equipment_id=equipment_id, only_active=not include_inactive
+    equipment = await db.run(
+        crud.get_equipment,
+        equipment_id=equipment_id,
+        only_active=not include_inactive,
+        response_model=schemas.EquipmentFull
     )
     if equipment is None:
         raise HTTPException(
@@ -86,17 +207,18 @@ def read_equipment_item(
 
 
 @router.put('/{equipment_id}', response_model=schemas.EquipmentFull)
-def update_equipment_endpoint(
+async def update_equipment_endpoint(
     equipment_id: int,
     equipment_update: schemas.EquipmentUpdate = Body(...),
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_db_runner)
 ):
     """Обновляет активное оборудование."""
     try:
-        return crud.update_equipment(
-            db=db,
+        return await db.run(
+            crud.update_equipment,
             equipment_id=equipment_id,
-            equipment_data=equipment_update
+            equipment_data=equipment_update,
+            response_model=schemas.EquipmentFull
         )
     except NotFoundError as e:
         raise HTTPException(
@@ -117,13 +239,17 @@ def update_equipment_endpoint(
     response_model=schemas.Equipment,
     summary='Деактивировать оборудование'
 )
-def soft_delete_equipment_endpoint(
+async def soft_delete_equipment_endpoint(
     equipment_id: int,
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_db_runner)
 ):
     """Мягко удаляет (деактивирует) оборудование."""
     try:
-        return crud.soft_delete_equipment(db=db, equipment_id=equipment_id)
+        return await db.run(
+            crud.soft_delete_equipment,
+            equipment_id=equipment_id,
+            response_model=schemas.Equipment
+        )
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(e)
@@ -139,13 +265,17 @@ def soft_delete_equipment_endpoint(
     response_model=schemas.Equipment,
     summary='Активировать оборудование'
 )
-def activate_equipment_endpoint(
+async def activate_equipment_endpoint(
     equipment_id: int,
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_db_runner)
 ):
     """Активирует ранее деактивированное оборудование."""
     try:
-        return crud.activate_equipment(db=db, equipment_id=equipment_id)
+        return await db.run(
+            crud.activate_equipment,
+            equipment_id=equipment_id,
+            response_model=schemas.Equipment
+        )
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(e)
@@ -0,0 +1,41 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Path, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from .. import exporter
+from ..database import get_read_db
+
+router = APIRouter(
+    prefix='/export',
+    tags=['export'],
+)
+
+
+@router.get(
+    '/{dataset}',
+    response_class=StreamingResponse,
+    summary='Потоковая выгрузка справочника'
+)
+def export_dataset(
+    dataset: Literal['factories', 'sections', 'equipment', 'links'] = Path(
+        ..., description='Выгружаемая таблица (links — связи участок–оборудование)'
+    ),
+    file_format: Literal['csv', 'ndjson'] = Query(
+        'ndjson', alias='format', description='Формат выгрузки'
+    ),
+    batch_size: int = Query(
+        exporter.DEFAULT_BATCH_SIZE, ge=1, le=10000,
+        description='Размер пачки строк, читаемой из БД'
+    ),
+    db: Session = Depends(get_read_db)
+):
+    """Выгружает все записи таблицы, включая неактивные, без пагинации."""
+    return StreamingResponse(
+        exporter.iter_export(db, dataset, file_format, batch_size=batch_size),
+        media_type=exporter.EXPORT_MEDIA_TYPES[file_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{dataset}.{file_format}"'
+        }
+    )
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal, Optional, Union
 
 from fastapi import (
     APIRouter,
@@ -6,19 +6,22 @@ from fastapi import (
     Depends,
     HTTPException,
     Query,
+    Response,
     status
 )
-from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..conditional import conditional_get
+from ..db_runner import DbRunner, get_db_runner, get_read_db_runner
 from ..exceptions import (
     AlreadyActiveError,
     AlreadyInactiveError,
     DependentActiveChildError,
     DuplicateError,
+    InvalidCursorError,
     NotFoundError
 )
+from ..pagination import MAX_ID, next_cursor, resolve_keyset
 
 router = APIRouter(
     prefix='/factories',
@@ -31,45 +34,159 @@ router = APIRouter(
     response_model=schemas.Factory,
     status_code=status.HTTP_201_CREATED
 )
-def create_factory_endpoint(
+async def create_factory_endpoint(
     factory_data: schemas.FactoryCreate = Body(...),
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_db_runner)
 ):
     """Создаёт новую фабрику."""
     try:
-        return crud.create_factory(db=db, factory_data=factory_data)
+        return await db.run(
+            crud.create_factory,
+            factory_data=factory_data,
+            response_model=schemas.Factory
+        )
     except DuplicateError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
         )
 
 
-@router.get('/', response_model=List[schemas.Factory])
-def read_factories(
+@router.post(
+    '/bulk',
+    response_model=schemas.BulkCreateResult,
+    status_code=status.HTTP_201_CREATED,
+    summary='Пакетное создание фабрик'
+)
+async def bulk_create_factories_endpoint(
+    response: Response,
+    factories_data: List[schemas.FactoryCreate] = Body(..., max_length=crud.BULK_MAX_ITEMS),
+    mode: Literal['all_or_nothing', 'best_effort'] = Query(
+        crud.BULK_ALL_OR_NOTHING,
+        description='all_or_nothing — всё или ничего, best_effort — создать валидные элементы'
+    ),
+    db: DbRunner = Depends(get_db_runner)
+):
+    """Создаёт пакет фабрик одной транзакцией с результатом по каждому элементу."""
+    result = await db.run(
+        crud.bulk_create_factories,
+        factories_data,
+        mode=mode
+    )
+    if result.failed and not result.created:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return result
+
+
+@router.post(
+    '/bulk/deactivate',
+    response_model=schemas.BulkToggleResult,
+    summary='Пакетная деактивация фабрик'
+)
+async def bulk_deactivate_factories_endpoint(
+    response: Response,
+    factory_ids: List[schemas.EntityId] = Body(..., max_length=crud.BULK_MAX_ITEMS),
+    mode: Literal['all_or_nothing', 'best_effort'] = Query(
+        crud.BULK_ALL_OR_NOTHING,
+        description='all_or_nothing — всё или ничего, best_effort — изменить допустимые ID'
+    ),
+    db: DbRunner = Depends(get_db_runner)
+):
+    """Деактивирует набор фабрик одним UPDATE с результатом по каждому ID."""
+    result = await db.run(crud.bulk_set_active, 'factory', factory_ids, False, mode=mode)
+    if result.failed and not result.changed:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return result
+
+
+@router.post(
+    '/bulk/activate',
+    response_model=schemas.BulkToggleResult,
+    summary='Пакетная активация фабрик'
+)
+async def bulk_activate_factories_endpoint(
+    response: Response,
+    factory_ids: List[schemas.EntityId] = Body(..., max_length=crud.BULK_MAX_ITEMS),
+    mode: Literal['all_or_nothing', 'best_effort'] = Query(
+        crud.BULK_ALL_OR_NOTHING,
+        description='all_or_nothing — всё или ничего, best_effort — изменить допустимые ID'
+    ),
+    db: DbRunner = Depends(get_db_runner)
+):
+    """Активирует набор фабрик одним UPDATE с результатом по каждому ID."""
+    result = await db.run(crud.bulk_set_active, 'factory', factory_ids, True, mode=mode)
+    if result.failed and not result.changed:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return result
+
+
+@router.get(
+    '/',
+    response_model=List[schemas.Factory],
+    dependencies=[Depends(conditional_get('factories', 'sections'))]
+)
+async def read_factories(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     include_inactive: bool = Query(
         False, description='Включить неактивные фабрики'
     ),
-    db: Session = Depends(get_db)
+    is_active: Optional[bool] = Query(
+        None, description='Фильтр по активности (важнее include_inactive)'
+    ),
+    name_prefix: Optional[str] = Query(
+        None, min_length=1, description='Наименование начинается с указанной строки (с учётом регистра)'
+    ),
+    sort: Literal['id', '-id', 'name', '-name'] = Query(
+        'id', description='Поле сортировки, "-" — по убыванию'
+    ),
+    after_id: Optional[int] = Query(
+        None, le=MAX_ID, description='Keyset-пагинация: вернуть записи после указанного ID (только при сортировке по ID)'
+    ),
+    cursor: Optional[str] = Query(
+        None, description='Непрозрачный курсор из заголовка X-Next-Cursor'
+    ),
+    db: DbRunner = Depends(get_read_db_runner)
 ):
     """Получает список фабрик (по умолчанию только активные)."""
-    return crud.get_factories(
-        db, skip=skip, limit=limit, only_active=not include_inactive
+    try:
+        keyset = resolve_keyset(after_id, cursor, sort)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
+    items = await db.run(
+        crud.get_factories,
+        skip=skip,
+        limit=limit,
+        only_active=not include_inactive,
+        after_id=keyset.id if keyset else None,
+        after_value=keyset.value if keyset else None,
+        sort=sort,
+        name_prefix=name_prefix,
+        is_active=is_active,
+        response_model=schemas.Factory
     )
+    cursor_value = next_cursor(items, limit, sort)
+    if cursor_value is not None:
+        response.headers['X-Next-Cursor'] = cursor_value
+    return items
 
 
 @router.get('/{factory_id}', response_model=schemas.FactoryFull)
-def read_factory(
+async def read_factory(
     factory_id: int,
     include_inactive: bool = Query(
         False, description='Получить фабрику даже если она неактивна'
     ),
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_read_db_runner)
 ):
     """Получает фабрику по её ID."""
-    factory = crud.get_factory(
-        db, factory_id=factory_id, only_active=not include_inactive
+    factory = await db.run(
+        crud.get_factory,
+        factory_id=factory_id,
+        only_active=not include_inactive,
+        response_model=schemas.FactoryFull
     )
     if factory is None:
         raise HTTPException(
@@ -80,17 +197,18 @@ def read_factory(
 
 
 @router.put('/{factory_id}', response_model=schemas.Factory)
-def update_factory_endpoint(
+async def update_factory_endpoint(
     factory_id: int,
     factory_update: schemas.FactoryUpdate = Body(...),
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_db_runner)
 ):
     """Обновляет активную фабрику."""
     try:
-        return crud.update_factory(
-            db=db,
+        return await db.run(
+            crud.update_factory,
             factory_id=factory_id,
-            factory_data=factory_update
+            factory_data=factory_update,
+            response_model=schemas.Factory
         )
     except NotFoundError as e:
         raise HTTPException(
@@ -104,16 +222,29 @@ def update_factory_endpoint(
 
 @router.delete(
     '/{factory_id}',
-    response_model=schemas.Factory,
+    response_model=Union[schemas.Factory, schemas.CascadeResult],
     summary='Деактивировать фабрику'
 )
-def soft_delete_factory_endpoint(
+async def soft_delete_factory_endpoint(
     factory_id: int,
-    db: Session = Depends(get_db)
+    cascade: bool = Query(
+        False, description='Деактивировать вместе с участками и оборудованием, оставшимся без участков'
+    ),
+    db: DbRunner = Depends(get_db_runner)
 ):
-    """Мягко удаляет (деактивирует) фабрику."""
+    """Мягко удаляет (деактивирует) фабрику, при cascade=true — вместе с поддеревом."""
     try:
-        return crud.soft_delete_factory(db=db, factory_id=factory_id)
+        if cascade:
+            return await db.run(
+                crud.deactivate_factory_cascade,
+                factory_id=factory_id,
+                response_model=schemas.CascadeResult
+            )
+        return await db.run(
+            crud.soft_delete_factory,
+            factory_id=factory_id,
+            response_model=schemas.Factory
+        )
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(e)
@@ -130,16 +261,29 @@ def soft_delete_factory_endpoint(
 
 @router.put(
     '/{factory_id}/activate',
-    response_model=schemas.Factory,
+    response_model=Union[schemas.Factory, schemas.CascadeResult],
     summary='Активировать фабрику'
 )
-def activate_factory_endpoint(
+async def activate_factory_endpoint(
     factory_id: int,
-    db: Session = Depends(get_db)
+    cascade: bool = Query(
+        False, description='Активировать вместе с участками фабрики и их оборудованием'
+    ),
+    db: DbRunner = Depends(get_db_runner)
 ):
-    """Активирует ранее деактивированную фабрику."""
+    """Активирует ранее деактивированную фабрику, при cascade=true — вместе с поддеревом."""
     try:
-        return crud.activate_factory(db=db, factory_id=factory_id)
+        if cascade:
+            return await db.run(
+                crud.activate_factory_cascade,
+                factory_id=factory_id,
+                response_model=schemas.CascadeResult
+            )
+        return await db.run(
+            crud.activate_factory,
+            factory_id=factory_id,
+            response_model=schemas.Factory
+        )
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(e)
@@ -1,10 +1,13 @@
 from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..conditional import conditional_get
+from ..database import get_read_db
+from ..db_runner import DbRunner, get_read_db_runner
 
 router = APIRouter(
     prefix='/hierarchy',
@@ -12,51 +15,48 @@ router = APIRouter(
 )
 
 
-@router.get('/', response_model=schemas.HierarchyResponse)
-def get_entity_hierarchy(
+@router.get(
+    '/',
+    response_model=schemas.HierarchyResponse,
+    dependencies=[Depends(conditional_get(*crud.VERSIONED_TABLES))]
+)
+async def get_entity_hierarchy(
     entity_type: Literal['factory', 'section', 'equipment'] = Query(
         ..., description='Тип сущности'
     ),
     entity_id: int = Query(..., description='ID сущности'),
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_read_db_runner)
 ):
     """Получает иерархию для указанной сущности."""
-    parents = []
-    children = []
-    entity_name = ''
-    entity = None
-
-    if entity_type == 'factory':
-        entity = crud.get_factory(db, entity_id)
-        if entity:
-            entity_name = entity.name
-            children = crud.get_children_for_factory(db, entity_id)
-
-    elif entity_type == 'section':
-        entity = crud.get_section(db, entity_id)
-        if entity:
-            entity_name = entity.name
-            parents = crud.get_parents_for_section(db, entity_id)
-            children = crud.get_children_for_section(db, entity_id)
-
-    elif entity_type == 'equipment':
-        entity = crud.get_equipment(db, entity_id)
-        if entity:
-            entity_name = entity.name
-            parents = crud.get_parents_for_equipment(db, entity_id)
-
-    if not entity:
+    hierarchy = await db.run(crud.get_entity_hierarchy, entity_type, entity_id)
+    if hierarchy is None:
         raise HTTPException(
             status_code=404,
             detail=(
                 f'{entity_type.capitalize()} с ID {entity_id} не найден(а)'
             ),
         )
+    return hierarchy
+
+
+@router.get(
+    '/forest',
+    response_class=StreamingResponse,
+    summary='Полное дерево всех активных фабрик (NDJSON)'
+)
+def stream_factory_forest(
+    batch_size: int = Query(
+        100, ge=1, le=1000, description='Размер пачки фабрик при чтении из БД'
+    ),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Потоково отдаёт дерево фабрика → участок → оборудование в формате NDJSON.
+
+    Каждая строка ответа — поддерево одной активной фабрики.
+    """
+    def generate():
+        for factory in crud.iter_factory_forest(db, batch_size=batch_size):
+            yield factory.model_dump_json() + '\n'
 
-    return schemas.HierarchyResponse(
-        entity_type=entity_type,
-        entity_id=entity_id,
-        entity_name=entity_name,
-        parents=parents,
-        children=children
-    )
+    return StreamingResponse(generate(), media_type='application/x-ndjson')
@@ -0,0 +1,66 @@
+import io
+from typing import Literal, Optional
+
+from fastapi import (
+    APIRouter, Depends, File, HTTPException, Path, Query, UploadFile, status
+)
+from sqlalchemy.orm import Session
+
+from .. import crud, importer, schemas
+from ..database import get_db
+
+router = APIRouter(
+    prefix='/import',
+    tags=['import'],
+)
+
+
+@router.post(
+    '/{entity_type}',
+    response_model=schemas.ImportReport,
+    summary='Потоковый импорт справочника из CSV или NDJSON'
+)
+def import_entities(
+    entity_type: Literal['factory', 'section', 'equipment'] = Path(
+        ..., description='Тип импортируемых сущностей'
+    ),
+    file: UploadFile = File(..., description='Файл CSV или NDJSON'),
+    file_format: Optional[Literal['csv', 'ndjson']] = Query(
+        None, alias='format', description='Формат файла (по умолчанию — по расширению)'
+    ),
+    chunk_size: int = Query(
+        importer.DEFAULT_CHUNK_SIZE, ge=1, le=crud.BULK_MAX_ITEMS,
+        description='Количество строк в одной транзакции'
+    ),
+    db: Session = Depends(get_db)
+):
+    """
+    Импортирует сущности из загруженного файла порциями.
+
+    Файл читается построчно, строки с ошибками попадают в отчёт и не
+    прерывают импорт остальных.
+    """
+    file_format = file_format or importer.detect_format(file.filename)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Не удалось определить формат файла, укажите параметр format.'
+        )
+    # Порции фиксируются по мере чтения, поэтому кодировка проверяется до первой
+    invalid_line = importer.find_invalid_utf8_line(file.file)
+    if invalid_line is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f'Файл должен быть в кодировке UTF-8: некорректные байты в строке {invalid_line}. '
+                'Ничего не импортировано.'
+            )
+        )
+    file.file.seek(0)
+    stream = io.TextIOWrapper(file.file, encoding='utf-8-sig', newline='')
+    try:
+        return importer.run_import(
+            db, entity_type, stream, file_format, chunk_size=chunk_size
+        )
+    finally:
+        stream.detach()
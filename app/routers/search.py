@@ -0,0 +1,40 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from .. import crud, schemas
+from ..conditional import conditional_get
+from ..db_runner import DbRunner, get_read_db_runner
+
+router = APIRouter(
+    prefix='/search',
+    tags=['search'],
+)
+
+
+@router.get(
+    '/',
+    response_model=List[schemas.SearchResult],
+    dependencies=[Depends(conditional_get('factories', 'sections', 'equipment'))]
+)
+async def search_entities(
+    q: str = Query(..., min_length=1, max_length=200, description='Поисковый запрос'),
+    entity_type: Optional[List[Literal['factory', 'section', 'equipment']]] = Query(
+        None, description='Искать только среди указанных типов сущностей'
+    ),
+    prefix: bool = Query(True, description='Искать слова, начинающиеся с введённых'),
+    include_inactive: bool = Query(False, description='Включить неактивные сущности'),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: DbRunner = Depends(get_read_db_runner)
+):
+    """Полнотекстовый поиск по фабрикам, участкам и оборудованию с ранжированием BM25."""
+    return await db.run(
+        crud.search_entities,
+        q,
+        entity_types=entity_type,
+        prefix=prefix,
+        include_inactive=include_inactive,
+        skip=skip,
+        limit=limit
+    )
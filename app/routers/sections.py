@@ -1,16 +1,17 @@
-from typing import List
+from typing import List, Literal, Optional, Union
 
 from fastapi import (
-    APIRouter, Body, Depends, HTTPException, Query, status
+    APIRouter, Body, Depends, HTTPException, Query, Response, status
 )
-from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..conditional import conditional_get
+from ..db_runner import DbRunner, get_db_runner, get_read_db_runner
 from ..exceptions import (
     AlreadyActiveError, AlreadyInactiveError, DependentActiveChildError,
-    DuplicateError, NotFoundError, RelatedEntityNotFoundError
+    DuplicateError, InvalidCursorError, NotFoundError, RelatedEntityNotFoundError
 )
+from ..pagination import MAX_ID, next_cursor, resolve_keyset
 
 router = APIRouter(
     prefix='/sections',
@@ -23,13 +24,17 @@ router = APIRouter(
     response_model=schemas.Section,
     status_code=status.HTTP_201_CREATED
 )
-def create_section_endpoint(
+async def create_section_endpoint(
     section_data: schemas.SectionCreate = Body(...),
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_db_runner)
 ):
     """Создаёт новый участок."""
     try:
-        return crud.create_section(db=db, section_data=section_data)
+        return await db.run(
+            crud.create_section,
+            section_data=section_data,
+            response_model=schemas.Section
+        )
     except DuplicateError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
@@ -40,32 +45,146 @@ def create_section_endpoint(
         )
 
 
-@router.get('/', response_model=List[schemas.Section])
-def read_sections(
+@router.post(
+    '/bulk',
+    response_model=schemas.BulkCreateResult,
+    status_code=status.HTTP_201_CREATED,
+    summary='Пакетное создание участков'
+)
+async def bulk_create_sections_endpoint(
+    response: Response,
+    sections_data: List[schemas.SectionCreate] = Body(..., max_length=crud.BULK_MAX_ITEMS),
+    mode: Literal['all_or_nothing', 'best_effort'] = Query(
+        crud.BULK_ALL_OR_NOTHING,
+        description='all_or_nothing — всё или ничего, best_effort — создать валидные элементы'
+    ),
+    db: DbRunner = Depends(get_db_runner)
+):
+    """Создаёт пакет участков одной транзакцией с результатом по каждому элементу."""
+    result = await db.run(
+        crud.bulk_create_sections,
+        sections_data,
+        mode=mode
+    )
+    if result.failed and not result.created:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return result
+
+
+@router.post(
+    '/bulk/deactivate',
+    response_model=schemas.BulkToggleResult,
+    summary='Пакетная деактивация участков'
+)
+async def bulk_deactivate_sections_endpoint(
+    response: Response,
+    section_ids: List[schemas.EntityId] = Body(..., max_length=crud.BULK_MAX_ITEMS),
+    mode: Literal['all_or_nothing', 'best_effort'] = Query(
+        crud.BULK_ALL_OR_NOTHING,
+        description='all_or_nothing — всё или ничего, best_effort — изменить допустимые ID'
+    ),
+    db: DbRunner = Depends(get_db_runner)
+):
+    """Деактивирует набор участков одним UPDATE с результатом по каждому ID."""
+    result = await db.run(crud.bulk_set_active, 'section', section_ids, False, mode=mode)
+    if result.failed and not result.changed:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return result
+
+
+@router.post(
+    '/bulk/activate',
+    response_model=schemas.BulkToggleResult,
+    summary='Пакетная активация участков'
+)
+async def bulk_activate_sections_endpoint(
+    response: Response,
+    section_ids: List[schemas.EntityId] = Body(..., max_length=crud.BULK_MAX_ITEMS),
+    mode: Literal['all_or_nothing', 'best_effort'] = Query(
+        crud.BULK_ALL_OR_NOTHING,
+        description='all_or_nothing — всё или ничего, best_effort — изменить допустимые ID'
+    ),
+    db: DbRunner = Depends(get_db_runner)
+):
+    """Активирует набор участков одним UPDATE с результатом по каждому ID."""
+    result = await db.run(crud.bulk_set_active, 'section', section_ids, True, mode=mode)
+    if result.failed and not result.changed:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return result
+
+
+@router.get(
+    '/',
+    response_model=List[schemas.Section],
+    dependencies=[Depends(conditional_get('sections', 'equipment', 'section_equipment_association'))]
+)
+async def read_sections(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     include_inactive: bool = Query(
         False, description='Включить неактивные участки'
     ),
-    db: Session = Depends(get_db)
+    is_active: Optional[bool] = Query(
+        None, description='Фильтр по активности (важнее include_inactive)'
+    ),
+    name_prefix: Optional[str] = Query(
+        None, min_length=1, description='Наименование начинается с указанной строки (с учётом регистра)'
+    ),
+    factory_id: Optional[int] = Query(None, description='Только участки указанной фабрики'),
+    equipment_id: Optional[int] = Query(None, description='Только участки, к которым привязано оборудование'),
+    sort: Literal['id', '-id', 'name', '-name'] = Query(
+        'id', description='Поле сортировки, "-" — по убыванию'
+    ),
+    after_id: Optional[int] = Query(
+        None, le=MAX_ID, description='Keyset-пагинация: вернуть записи после указанного ID (только при сортировке по ID)'
+    ),
+    cursor: Optional[str] = Query(
+        None, description='Непрозрачный курсор из заголовка X-Next-Cursor'
+    ),
+    db: DbRunner = Depends(get_read_db_runner)
 ):
     """Получает список участков (по умолчанию только активные)."""
-    return crud.get_sections(
-        db, skip=skip, limit=limit, only_active=not include_inactive
+    try:
+        keyset = resolve_keyset(after_id, cursor, sort)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
+    items = await db.run(
+        crud.get_sections,
+        skip=skip,
+        limit=limit,
+        only_active=not include_inactive,
+        after_id=keyset.id if keyset else None,
+        after_value=keyset.value if keyset else None,
+        sort=sort,
+        name_prefix=name_prefix,
+        is_active=is_active,
+        factory_id=factory_id,
+        equipment_id=equipment_id,
+        response_model=schemas.Section
     )
+    cursor_value = next_cursor(items, limit, sort)
+    if cursor_value is not None:
+        response.headers['X-Next-Cursor'] = cursor_value
+    return items
 
 
 @router.get('/{section_id}', response_model=schemas.SectionFull)
-def read_section(
+async def read_section(
     section_id: int,
     include_inactive: bool = Query(
         False, description='Получить участок даже если он неактивен'
     ),
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_read_db_runner)
 ):
     """Получает участок по его ID."""
-    section = crud.get_section(
-        db, section_id=section_id, only_active=not include_inactive
+    section = await db.run(
+        crud.get_section,
+        section_id=section_id,
+        only_active=not include_inactive,
+        response_model=schemas.SectionFull
     )
     if section is None:
         raise HTTPException(
@@ -76,15 +195,18 @@ def read_section(
 
 
 @router.put('/{section_id}', response_model=schemas.SectionFull)
-def update_section_endpoint(
+async def update_section_endpoint(
     section_id: int,
     section_update: schemas.SectionUpdate = Body(...),
-    db: Session = Depends(get_db)
+    db: DbRunner = Depends(get_db_runner)
 ):
     """Обновляет активный участок."""
     try:
-        return crud.update_section(
-            db=db, section_id=section_id, section_data=section_update
+        return await db.run(
+            crud.update_section,
+            section_id=section_id,
+            section_data=section_update,
+            response_model=schemas.SectionFull
         )
     except NotFoundError as e:
         raise HTTPException(
@@ -102,16 +224,29 @@ def update_section_endpoint(
 
 @router.delete(
     '/{section_id}',
-    response_model=schemas.Section,
+    response_model=Union[schemas.Section, schemas.CascadeResult],
     summary='Деактивировать участок'
 )
-def soft_delete_section_endpoint(
+async def soft_delete_section_endpoint(
     section_id: int,
-    db: Session = Depends(get_db)
+    cascade: bool = Query(
+        False, description='Деактивировать вместе с оборудованием, оставшимся без активных участков'
+    ),
+    db: DbRunner = Depends(get_db_runner)
 ):
-    """Мягко удаляет (деактивирует) участок."""
+    """Мягко удаляет (деактивирует) участок, при cascade=true — вместе с зависимым оборудованием."""
     try:
-        return crud.soft_delete_section(db=db, section_id=section_id)
+        if cascade:
+            return await db.run(
+                crud.deactivate_section_cascade,
+                section_id=section_id,
+                response_model=schemas.CascadeResult
+            )
+        return await db.run(
+            crud.soft_delete_section,
+            section_id=section_id,
+            response_model=schemas.Section
+        )
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(e)
@@ -128,16 +263,29 @@ def soft_delete_section_endpoint(
 
 @router.put(
     '/{section_id}/activate',
-    response_model=schemas.Section,
+    response_model=Union[schemas.Section, schemas.CascadeResult],
     summary='Активировать участок'
 )
-def activate_section_endpoint(
+async def activate_section_endpoint(
     section_id: int,
-    db: Session = Depends(get_db)
+    cascade: bool = Query(
+        False, description='Активировать вместе с оборудованием участка'
+    ),
+    db: DbRunner = Depends(get_db_runner)
 ):
-    """Активирует ранее деактивированный участок."""
+    """Активирует ранее деактивированный участок, при cascade=true — вместе с оборудованием."""
     try:
-        return crud.activate_section(db=db, section_id=section_id)
+        if cascade:
+            return await db.run(
+                crud.activate_section_cascade,
+                section_id=section_id,
+                response_model=schemas.CascadeResult
+            )
+        return await db.run(
+            crud.activate_section,
+            section_id=section_id,
+            response_model=schemas.Section
+        )
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(e)
@@ -1,5 +1,14 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Annotated, Dict, List, Literal, Optional, Union
+from pydantic import BaseModel, Field, ConfigDict, StringConstraints
+
+from .config import StorageProfile
+from .pagination import MAX_ID
+
+# Ссылка на сущность по ID: положительное целое в диапазоне INTEGER SQLite
+EntityId = Annotated[int, Field(ge=1, le=MAX_ID)]
+
+# Наименование создаваемой или изменяемой сущности: без крайних пробелов и непустое
+EntityName = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
 
 
 class FactoryBase(BaseModel):
@@ -23,12 +32,14 @@ class EquipmentBase(BaseModel):
 
 class FactoryCreate(FactoryBase):
     id: Optional[int] = Field(None, exclude=True)
+    name: EntityName = Field(..., description='Наименование фабрики')
 
 
 class SectionCreate(SectionBase):
     id: Optional[int] = Field(None, exclude=True)
-    factory_id: int = Field(..., description='ID фабрики участка')
-    equipment_ids: Optional[List[int]] = Field(
+    name: EntityName = Field(..., description='Наименование участка')
+    factory_id: EntityId = Field(..., description='ID фабрики участка')
+    equipment_ids: Optional[List[EntityId]] = Field(
         default_factory=list,
         description='Список ID оборудования для привязки'
     )
@@ -36,29 +47,30 @@ class SectionCreate(SectionBase):
 
 class EquipmentCreate(EquipmentBase):
     id: Optional[int] = Field(None, exclude=True)
-    section_ids: Optional[List[int]] = Field(
+    name: EntityName = Field(..., description='Наименование оборудования')
+    section_ids: Optional[List[EntityId]] = Field(
         default_factory=list,
         description='Список ID участков для привязки'
     )
 
 
 class FactoryUpdate(BaseModel):
-    name: Optional[str] = Field(None, description='Новое наименование фабрики')
+    name: Optional[EntityName] = Field(None, description='Новое наименование фабрики')
 
 
 class SectionUpdate(BaseModel):
-    name: Optional[str] = Field(None, description='Новое наименование участка')
-    factory_id: Optional[int] = Field(None, description='Новый ID фабрики')
-    equipment_ids: Optional[List[int]] = Field(
+    name: Optional[EntityName] = Field(None, description='Новое наименование участка')
+    factory_id: Optional[EntityId] = Field(None, description='Новый ID фабрики')
+    equipment_ids: Optional[List[EntityId]] = Field(
         None,
         description='Новый список ID оборудования'
     )
 
 
 class EquipmentUpdate(BaseModel):
-    name: Optional[str] = Field(None, description='Новое наименование оборудования')
+    name: Optional[EntityName] = Field(None, description='Новое наименование оборудования')
     description: Optional[str] = Field(None, description='Новое описание')
-    section_ids: Optional[List[int]] = Field(
+    section_ids: Optional[List[EntityId]] = Field(
         None,
         description='Новый список ID участков'
     )
@@ -137,4 +149,107 @@ class HierarchyResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BulkItemResult(BaseModel):
+    index: int = Field(..., description='Позиция элемента во входном массиве')
+    status: Literal['created', 'error', 'skipped'] = Field(
+        ..., description='Результат обработки элемента'
+    )
+    id: Optional[int] = Field(None, description='ID созданного объекта')
+    detail: Optional[str] = Field(None, description='Описание ошибки')
+
+
+class BulkCreateResult(BaseModel):
+    mode: Literal['all_or_nothing', 'best_effort'] = Field(
+        ..., description='Режим пакетной обработки'
+    )
+    created: int = Field(..., description='Количество созданных объектов')
+    failed: int = Field(..., description='Количество элементов с ошибками')
+    items: List[BulkItemResult] = Field(
+        default_factory=list,
+        description='Результаты по каждому элементу'
+    )
+
+
+class ImportRowError(BaseModel):
+    line: int = Field(..., description='Номер строки входного файла')
+    detail: str = Field(..., description='Описание ошибки')
+
+
+class ImportReport(BaseModel):
+    entity_type: Literal['factory', 'section', 'equipment'] = Field(
+        ..., description='Тип импортируемых сущностей'
+    )
+    format: Literal['csv', 'ndjson'] = Field(..., description='Формат файла')
+    rows_total: int = Field(..., description='Количество обработанных строк')
+    created: int = Field(..., description='Количество созданных объектов')
+    failed: int = Field(..., description='Количество строк с ошибками')
+    errors: List[ImportRowError] = Field(
+        default_factory=list,
+        description='Ошибки по строкам (не более max_errors первых)'
+    )
+    errors_truncated: bool = Field(
+        False, description='Список ошибок усечён'
+    )
+    elapsed_seconds: float = Field(..., description='Длительность импорта, с')
+    rows_per_second: float = Field(..., description='Пропускная способность, строк/с')
+
+
+class StorageDiagnostics(BaseModel):
+    profile: StorageProfile = Field(..., description='Настроенный профиль хранилища')
+    effective_pragmas: Dict[str, Union[int, str, None]] = Field(
+        default_factory=dict,
+        description='Фактические значения PRAGMA текущего соединения'
+    )
+    pool: str = Field(..., description='Состояние пула соединений чтения')
+    write_pool: str = Field(..., description='Состояние пула соединений писателя')
+
+
+class BulkToggleItemResult(BaseModel):
+    status: Literal[
+        'activated', 'deactivated', 'not_found', 'already_active', 'already_inactive', 'conflict', 'skipped'
+    ] = Field(..., description='Результат для ID')
+    detail: Optional[str] = Field(None, description='Описание ошибки')
+
+
+class BulkToggleResult(BaseModel):
+    action: Literal['activate', 'deactivate'] = Field(..., description='Выполненное действие')
+    mode: Literal['all_or_nothing', 'best_effort'] = Field(..., description='Режим обработки пакета')
+    changed: int = Field(..., description='Количество изменённых сущностей')
+    failed: int = Field(..., description='Количество неизменённых ID')
+    results: Dict[int, BulkToggleItemResult] = Field(
+        default_factory=dict, description='Результат по каждому ID (в порядке запроса)'
+    )
+
+
+class CascadeResult(BaseModel):
+    action: Literal['deactivate', 'activate'] = Field(..., description='Выполненное действие')
+    entity_type: Literal['factory', 'section'] = Field(..., description='Тип корневой сущности')
+    entity_id: int = Field(..., description='ID корневой сущности')
+    factories: int = Field(..., description='Изменено фабрик')
+    sections: int = Field(..., description='Изменено участков')
+    equipment: int = Field(..., description='Изменено единиц оборудования')
+
+
+class CacheStats(BaseModel):
+    size: int = Field(..., description='Текущее число записей')
+    maxsize: int = Field(..., description='Максимальное число записей (0 — кэш отключён)')
+    hits: int = Field(..., description='Попадания')
+    misses: int = Field(..., description='Промахи')
+    evictions: int = Field(..., description='Вытеснения по LRU')
+    invalidations: int = Field(..., description='Записи, сброшенные при изменениях')
+    coherence_flushes: int = Field(
+        0, description='Полные очистки из-за изменений в других процессах'
+    )
+
+
+class SearchResult(BaseModel):
+    entity_type: Literal['factory', 'section', 'equipment'] = Field(..., description='Тип сущности')
+    id: int = Field(..., description='ID сущности')
+    name: str = Field(..., description='Наименование')
+    description: Optional[str] = Field(None, description='Описание (только для оборудования)')
+    score: float = Field(
+        ..., description='Релевантность BM25 относительно лучшего совпадения того же типа (1.0 — лучшее)'
+    )
+
+
 HierarchyChild.model_rebuild()
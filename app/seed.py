@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from alembic import command
+from alembic.config import Config
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from . import crud, models
+from .cache import hierarchy_cache
+from .config import settings
+from .database import create_db_engine
+
+ALEMBIC_INI_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alembic.ini'
+)
+
+DEFAULT_BATCH_SIZE = 50000
+
+# Словари для наименований: генерация воспроизводима при одном и том же seed
+FACTORY_NAMES = (
+    'Северный', 'Южный', 'Уральский', 'Волжский', 'Сибирский', 'Балтийский',
+    'Приокский', 'Камский', 'Донской', 'Невский', 'Алтайский', 'Заречный',
+)
+SECTION_KINDS = (
+    'Заготовительный участок', 'Механообработка', 'Сварочный участок', 'Окрасочная линия',
+    'Сборочный участок', 'Термообработка', 'Склад готовой продукции', 'Участок упаковки',
+    'Линия розлива', 'Ремонтный участок', 'Участок контроля качества', 'Литейный участок',
+)
+EQUIPMENT_TYPES = (
+    'Насос', 'Пресс', 'Токарный станок', 'Фрезерный станок', 'Конвейер', 'Компрессор',
+    'Сварочный аппарат', 'Печь', 'Манипулятор', 'Дозатор', 'Миксер', 'Охладитель',
+    'Гидравлический пресс', 'Вакуумный насос', 'Датчик давления', 'Датчик температуры',
+)
+EQUIPMENT_PURPOSES = (
+    'основная линия', 'резервный', 'вспомогательный', 'для опытных партий',
+    'после капитального ремонта', 'на консервации', 'повышенной точности',
+)
+
+
+class SeedConfig(BaseModel):
+    """Размер и параметры генерируемого набора данных."""
+    factories: int = Field(50, ge=1, description='Количество фабрик')
+    sections: int = Field(20000, ge=0, description='Количество участков (распределяются по фабрикам)')
+    equipment: int = Field(500000, ge=0, description='Количество единиц оборудования')
+    links_per_equipment: float = Field(
+        1.5, ge=0, description='Среднее число участков, к которым привязано оборудование'
+    )
+    inactive_ratio: float = Field(
+        0.0, ge=0, le=1, description='Доля неактивного оборудования'
+    )
+    seed: int = Field(42, description='Зерно генератора случайных чисел')
+    batch_size: int = Field(DEFAULT_BATCH_SIZE, ge=1, description='Строк в одном executemany')
+
+
+def _next_id(conn: Connection, model) -> int:
+    """Возвращает первый свободный ID таблицы (генерация дополняет существующие данные)."""
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _insert_batches(conn: Connection, table, rows: Iterable[dict], batch_size: int) -> int:
+    """Вставляет строки порциями через executemany и возвращает их число."""
+    rows = iter(rows)
+    total = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return total
+        conn.execute(insert(table), batch)
+        total += len(batch)
+
+
+def _drop_search_triggers(conn: Connection) -> List[str]:
+    """
+    Удаляет триггеры синхронизации поиска и возвращает их DDL для восстановления.
+
+    Построчное обновление FTS5 при массовой вставке в несколько раз медленнее
+    однократного перестроения индекса; удаление и восстановление выполняются в
+    одной транзакции с генерацией, поэтому другие соединения триггеры не теряют.
+    """
+    rows = conn.execute(text(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%\\_fts\\_%' ESCAPE '\\'"
+    )).all()
+    for row in rows:
+        conn.execute(text(f'DROP TRIGGER {row.name}'))
+    return [row.sql for row in rows]
+
+
+def _links_for(rng: random.Random, sections_by_factory: List[List[int]], count: int) -> List[int]:
+    """Выбирает участки для оборудования: все — на одной случайной фабрике."""
+    candidates = rng.choice(sections_by_factory)
+    return rng.sample(candidates, min(count, len(candidates)))
+
+
+def seed_database(db: Session, config: SeedConfig) -> Dict[str, object]:
+    """
+    Генерирует фабрики, участки, оборудование и их связи одной транзакцией.
+
+    Строки вставляются через Core executemany порциями по batch_size; затем
+    перестраиваются индексы поиска и таблица замыканий иерархии и
+    увеличиваются версии таблиц. Возвращает число созданных строк и скорость.
+    """
+    started_at = time.perf_counter()
+    rng = random.Random(config.seed)
+    conn = db.connection()
+    saved_triggers = _drop_search_triggers(conn)
+
+    first_factory = _next_id(conn, models.Factory)
+    factory_ids = list(range(first_factory, first_factory + config.factories))
+    factories = _insert_batches(conn, models.Factory.__table__, (
+        {'id': factory_id, 'name': f'{rng.choice(FACTORY_NAMES)} завод №{factory_id}', 'is_active': True}
+        for factory_id in factory_ids
+    ), config.batch_size)
+
+    first_section = _next_id(conn, models.Section)
+    sections_by_factory: List[List[int]] = [[] for _ in factory_ids]
+
+    def section_rows() -> Iterator[dict]:
+        for section_id in range(first_section, first_section + config.sections):
+            factory_index = rng.randrange(len(factory_ids))
+            sections_by_factory[factory_index].append(section_id)
+            yield {
+                'id': section_id,
+                'name': f'{rng.choice(SECTION_KINDS)} №{section_id}',
+                'factory_id': factory_ids[factory_index],
+                'is_active': True,
+            }
+
+    sections = _insert_batches(conn, models.Section.__table__, section_rows(), config.batch_size)
+    sections_by_factory = [ids for ids in sections_by_factory if ids]
+
+    first_equipment = _next_id(conn, models.Equipment)
+    equipment_ids = range(first_equipment, first_equipment + config.equipment)
+
+    def equipment_rows() -> Iterator[dict]:
+        for equipment_id in equipment_ids:
+            kind = rng.choice(EQUIPMENT_TYPES)
+            yield {
+                'id': equipment_id,
+                'name': f'{kind} {rng.choice("АБВГДКМНПТ")}{rng.randint(10, 999)}-{equipment_id}',
+                'description': (
+                    f'{kind}, {rng.choice(EQUIPMENT_PURPOSES)}' if rng.random() < 0.7 else None
+                ),
+                'is_active': rng.random() >= config.inactive_ratio,
+            }
+
+    equipment = _insert_batches(conn, models.Equipment.__table__, equipment_rows(), config.batch_size)
+
+    whole_links = int(config.links_per_equipment)
+    extra_link_chance = config.links_per_equipment - whole_links
+
+    def link_rows() -> Iterator[dict]:
+        if not sections_by_factory:
+            return
+        for equipment_id in equipment_ids:
+            count = whole_links + (rng.random() < extra_link_chance)
+            for section_id in _links_for(rng, sections_by_factory, count):
+                yield {'section_id': section_id, 'equipment_id': equipment_id}
+
+    links = _insert_batches(
+        conn, models.section_equipment_association_table, link_rows(), config.batch_size
+    )
+
+    crud.rebuild_search_index(db)
+    for ddl in saved_triggers:
+        conn.execute(text(ddl))
+    closure_rows = crud.rebuild_hierarchy_closure(db)
+    crud.touch_change_versions(db)
+    db.commit()
+    hierarchy_cache.clear()
+
+    elapsed = time.perf_counter() - started_at
+    rows_total = factories + sections + equipment + links
+    return {
+        'factories': factories,
+        'sections': sections,
+        'equipment': equipment,
+        'links': links,
+        'closure_rows': closure_rows,
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(rows_total / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def upgrade_schema(database_url: str) -> None:
+    """Применяет миграции Alembic к базе данных (индексы поиска, замыкания, версии)."""
+    alembic_cfg = Config(ALEMBIC_INI_PATH)
+    alembic_cfg.set_main_option('sqlalchemy.url', database_url)
+    command.upgrade(alembic_cfg, 'head')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа CLI: python -m app.seed."""
+    defaults = SeedConfig()
+    parser = argparse.ArgumentParser(
+        prog='python -m app.seed',
+        description='Генерация воспроизводимого набора справочников заданного размера.'
+    )
+    parser.add_argument('--factories', type=int, default=defaults.factories, help='Количество фабрик')
+    parser.add_argument('--sections', type=int, default=defaults.sections, help='Количество участков')
+    parser.add_argument('--equipment', type=int, default=defaults.equipment, help='Количество оборудования')
+    parser.add_argument(
+        '--links-per-equipment', type=float, default=defaults.links_per_equipment,
+        help='Среднее число участков на единицу оборудования'
+    )
+    parser.add_argument(
+        '--inactive-ratio', type=float, default=defaults.inactive_ratio, help='Доля неактивного оборудования'
+    )
+    parser.add_argument('--seed', type=int, default=defaults.seed, help='Зерно генератора')
+    parser.add_argument('--batch-size', type=int, default=defaults.batch_size, help='Строк в одном executemany')
+    parser.add_argument('--database-url', help='URL базы данных (по умолчанию — из настроек приложения)')
+    args = parser.parse_args(argv)
+
+    try:
+        config = SeedConfig(
+            factories=args.factories,
+            sections=args.sections,
+            equipment=args.equipment,
+            links_per_equipment=args.links_per_equipment,
+            inactive_ratio=args.inactive_ratio,
+            seed=args.seed,
+            batch_size=args.batch_size
+        )
+    except ValidationError as e:
+        parser.error(str(e))
+    database_url = args.database_url or settings.database_url
+    upgrade_schema(database_url)
+    engine = create_db_engine(database_url, settings.storage_profile)
+    try:
+        with Session(engine) as db:
+            report = seed_database(db, config)
+    finally:
+        engine.dispose()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
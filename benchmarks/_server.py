@@ -0,0 +1,81 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import httpx
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    """Возвращает свободный TCP-порт на localhost."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def run_server(
+    env: Optional[Dict[str, str]] = None,
+    database_path: Optional[str] = None,
+    workers: int = 1,
+    startup_timeout: float = 30.0
+) -> Iterator[str]:
+    """
+    Запускает приложение в отдельном процессе uvicorn и возвращает базовый URL.
+
+    Если database_path не указан, используется временная база данных,
+    которая удаляется после остановки сервера.
+    """
+    tmp_dir = None
+    if database_path is None:
+        tmp_dir = tempfile.TemporaryDirectory(prefix='bench_db_')
+        database_path = os.path.join(tmp_dir.name, 'bench.db')
+    port = _free_port()
+    process_env = dict(os.environ)
+    process_env['SQLALCHEMY_DATABASE_URL'] = f'sqlite:///{database_path}'
+    process_env.update(env or {})
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'uvicorn', 'app.main:app',
+            '--host', '127.0.0.1', '--port', str(port),
+            '--workers', str(workers), '--log-level', 'warning',
+        ],
+        cwd=PROJECT_ROOT,
+        env=process_env,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                if httpx.get(f'{base_url}/ping', timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError('Сервер не запустился.')
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+def percentile(values, fraction: float) -> float:
+    """Возвращает перцентиль (0..1) отсортированной копии значений."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
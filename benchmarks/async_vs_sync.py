@@ -0,0 +1,110 @@
+"""
+Сравнение потолка конкурентности синхронного и асинхронного пути к БД.
+
+Запуск:
+    python -m benchmarks.async_vs_sync --requests 2000 --concurrency 10 50 200
+
+Для каждого режима (DB_MODE=sync / async) поднимается отдельный сервер на
+временной базе, наполняется данными и нагружается запросами списка и
+иерархии с заданным уровнем конкурентности.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from ._server import percentile, run_server
+
+
+def _seed(base_url: str, factories: int, sections: int, equipment: int) -> int:
+    """Наполняет базу через пакетные эндпоинты и возвращает ID первой фабрики."""
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        created = client.post(
+            '/factories/bulk', json=[{'name': f'Фабрика {i}'} for i in range(factories)]
+        ).json()
+        factory_ids = [item['id'] for item in created['items']]
+        created = client.post('/sections/bulk', json=[
+            {'name': f'Участок {i}', 'factory_id': factory_ids[i % factories]}
+            for i in range(sections)
+        ]).json()
+        section_ids = [item['id'] for item in created['items']]
+        client.post('/equipment/bulk', json=[
+            {'name': f'Оборудование {i}', 'section_ids': [section_ids[i % sections]]}
+            for i in range(equipment)
+        ])
+        return factory_ids[0]
+
+
+async def _drive(base_url: str, paths, total: int, concurrency: int) -> dict:
+    """Отправляет total запросов с заданной конкурентностью и собирает метрики."""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def one(i: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'rps': round(total / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'errors': errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='Запросов на каждый уровень конкурентности')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50, 100, 200, 400])
+    parser.add_argument('--factories', type=int, default=20)
+    parser.add_argument('--sections', type=int, default=200)
+    parser.add_argument('--equipment', type=int, default=2000)
+    parser.add_argument('--json', dest='json_path', help='Сохранить результаты в JSON-файл')
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ('sync', 'async'):
+        with run_server(env={'DB_MODE': mode}) as base_url:
+            factory_id = _seed(base_url, args.factories, args.sections, args.equipment)
+            paths = [
+                '/factories/?limit=20',
+                '/sections/?limit=50',
+                '/equipment/?limit=100',
+                f'/hierarchy/?entity_type=factory&entity_id={factory_id}',
+            ]
+            results[mode] = [
+                asyncio.run(_drive(base_url, paths, args.requests, concurrency))
+                for concurrency in args.concurrency
+            ]
+
+    print(f'{"режим":<6} {"конк.":>6} {"rps":>9} {"p50, мс":>9} {"p99, мс":>9} {"ошибки":>7}')
+    for mode, rows in results.items():
+        for row in rows:
+            print(
+                f'{mode:<6} {row["concurrency"]:>6} {row["rps"]:>9} '
+                f'{row["p50_ms"]:>9} {row["p99_ms"]:>9} {row["errors"]:>7}'
+            )
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""
+Масштабирование функций crud с ростом объёма справочников.
+
+Запуск:
+    python -m benchmarks.crud_scaling --sizes 1000 10000 100000 --json crud_scaling.json
+
+Для каждого размера (число единиц оборудования) создаётся временная база,
+наполняется генератором app.seed (участков в 25 раз меньше, фабрика на каждые
+10 000 единиц оборудования) и собирается статистика планировщика (ANALYZE),
+после чего каждая функция crud вызывается повторно. Для вызова измеряются
+задержка и число SQL-запросов; подготовка данных для записи (например, участок
+с широким набором оборудования перед soft_delete_section) в замеры не входит.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.config import build_storage_profile
+from app.database import create_db_engine
+from app.instrumentation import track_queries
+from app.seed import SeedConfig, seed_database, upgrade_schema
+
+from ._server import percentile
+
+
+class Case(NamedTuple):
+    """Измеряемый вызов: setup готовит аргумент (вне замера), run выполняет вызов."""
+    name: str
+    run: Callable
+    setup: Optional[Callable] = None
+    write: bool = False
+
+
+class Context:
+    """Данные базы, из которых случаи выбирают аргументы вызовов."""
+
+    def __init__(self, db, config: SeedConfig, rng: random.Random, links: int, fanout: int) -> None:
+        self.config = config
+        self.rng = rng
+        self.links = links
+        self.fanout = fanout
+        self.counter = 0
+        self.sections_by_factory = {}
+        for section_id, factory_id in db.query(models.Section.id, models.Section.factory_id):
+            self.sections_by_factory.setdefault(factory_id, []).append(section_id)
+        self.factory_ids = sorted(self.sections_by_factory)
+        self.section_ids = [sid for ids in self.sections_by_factory.values() for sid in ids]
+        self.equipment_max_id = config.equipment
+        # Участки, деактивированные soft_delete_section, активируются следующим случаем
+        self.deactivated_sections: List[int] = []
+
+    def unique_name(self, prefix: str) -> str:
+        self.counter += 1
+        return f'{prefix} bench-{self.counter}'
+
+    def factory(self) -> int:
+        return self.rng.choice(self.factory_ids)
+
+    def section(self) -> int:
+        return self.rng.choice(self.section_ids)
+
+    def equipment(self) -> int:
+        return self.rng.randint(1, self.equipment_max_id)
+
+
+def _create_args(db, ctx: Context) -> schemas.EquipmentCreate:
+    """Оборудование, привязанное к ctx.links участкам одной фабрики."""
+    sections = ctx.sections_by_factory[ctx.factory()]
+    return schemas.EquipmentCreate(
+        name=ctx.unique_name('Оборудование'),
+        section_ids=ctx.rng.sample(sections, min(ctx.links, len(sections)))
+    )
+
+
+def _fanout_section(db, ctx: Context) -> int:
+    """
+    Создаёт участок с ctx.fanout единицами оборудования, у каждой из которых
+    есть ещё один активный участок (иначе деактивация участка запрещена).
+    """
+    factory_id = ctx.factory()
+    section = crud.create_section(db, schemas.SectionCreate(
+        name=ctx.unique_name('Участок'), factory_id=factory_id
+    ))
+    other_sections = ctx.sections_by_factory[factory_id]
+    crud.bulk_create_equipment(db, [
+        schemas.EquipmentCreate(
+            name=ctx.unique_name('Оборудование участка'),
+            section_ids=[section.id, ctx.rng.choice(other_sections)]
+        )
+        for _ in range(ctx.fanout)
+    ])
+    ctx.deactivated_sections.append(section.id)
+    return section.id
+
+
+def _deactivated_section(db, ctx: Context) -> int:
+    """Участок, деактивированный случаем soft_delete_section (StopIteration, если их нет)."""
+    if not ctx.deactivated_sections:
+        raise StopIteration
+    return ctx.deactivated_sections.pop()
+
+
+def _deactivated_equipment(db, ctx: Context) -> int:
+    """Деактивирует случайное активное оборудование для последующей активации."""
+    while True:
+        equipment = crud.get_equipment(db, ctx.equipment())
+        if equipment is not None:
+            crud.soft_delete_equipment(db, equipment.id)
+            return equipment.id
+
+
+CASES = (
+    Case('get_factory', lambda db, arg: crud.get_factory(db, arg), lambda db, ctx: ctx.factory()),
+    Case('get_section', lambda db, arg: crud.get_section(db, arg), lambda db, ctx: ctx.section()),
+    Case('get_equipment', lambda db, arg: crud.get_equipment(db, arg), lambda db, ctx: ctx.equipment()),
+    Case('get_factories', lambda db, arg: crud.get_factories(db, limit=50)),
+    Case('get_sections', lambda db, arg: crud.get_sections(db, limit=50, after_id=arg), lambda db, ctx: ctx.section()),
+    Case(
+        'get_equipment_list',
+        lambda db, arg: crud.get_equipment_list(db, limit=50, after_id=arg),
+        lambda db, ctx: ctx.equipment()
+    ),
+    Case(
+        'get_equipment_list[name,prefix]',
+        lambda db, arg: crud.get_equipment_list(db, limit=50, sort='name', name_prefix=arg),
+        lambda db, ctx: ctx.rng.choice(('Насос', 'Пресс', 'Печь', 'Датчик'))
+    ),
+    Case(
+        'get_equipment_list[factory_id]',
+        lambda db, arg: crud.get_equipment_list(db, limit=50, factory_id=arg),
+        lambda db, ctx: ctx.factory()
+    ),
+    Case('get_children_for_factory', lambda db, arg: crud.get_children_for_factory(db, arg), lambda db, ctx: ctx.factory()),
+    Case('get_children_for_section', lambda db, arg: crud.get_children_for_section(db, arg), lambda db, ctx: ctx.section()),
+    Case('get_parents_for_section', lambda db, arg: crud.get_parents_for_section(db, arg), lambda db, ctx: ctx.section()),
+    Case(
+        'get_parents_for_equipment',
+        lambda db, arg: crud.get_parents_for_equipment(db, arg),
+        lambda db, ctx: ctx.equipment()
+    ),
+    Case(
+        'build_entity_hierarchy[equipment]',
+        lambda db, arg: crud.build_entity_hierarchy(db, 'equipment', arg),
+        lambda db, ctx: ctx.equipment()
+    ),
+    Case(
+        'search_entities',
+        lambda db, arg: crud.search_entities(db, arg, limit=20),
+        lambda db, ctx: ctx.rng.choice(('насос', 'пресс вакуумный', 'датч', 'сварочный участок'))
+    ),
+    Case('create_equipment[links]', lambda db, arg: crud.create_equipment(db, arg), _create_args, write=True),
+    Case(
+        'soft_delete_section[fanout]',
+        lambda db, arg: crud.soft_delete_section(db, arg),
+        _fanout_section,
+        write=True
+    ),
+    Case('activate_section[fanout]', lambda db, arg: crud.activate_section(db, arg), _deactivated_section, write=True),
+    Case(
+        'activate_equipment',
+        lambda db, arg: crud.activate_equipment(db, arg),
+        _deactivated_equipment,
+        write=True
+    ),
+)
+
+
+def _measure(db, ctx: Context, case: Case, repeat: int, max_seconds: float) -> dict:
+    """
+    Вызывает случай до repeat раз (пока не истекут max_seconds или не
+    закончатся подготовленные аргументы) и возвращает пропускную способность,
+    перцентили и число запросов на вызов.
+    """
+    timings = []
+    queries = []
+    deadline = time.monotonic() + max_seconds
+    for _ in range(repeat):
+        try:
+            arg = case.setup(db, ctx) if case.setup else None
+        except StopIteration:
+            break
+        with track_queries() as stats:
+            started_at = time.perf_counter()
+            case.run(db, arg)
+            timings.append(time.perf_counter() - started_at)
+        queries.append(stats.count)
+        if not case.write:
+            db.rollback()
+        if time.monotonic() > deadline:
+            break
+    if not timings:
+        return {'calls': 0, 'ops_per_sec': 0.0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'queries_per_call': 0.0}
+    total = sum(timings)
+    return {
+        'calls': len(timings),
+        'ops_per_sec': round(len(timings) / total, 1) if total else 0.0,
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'queries_per_call': round(sum(queries) / len(queries), 2),
+    }
+
+
+def run_size(
+    equipment: int,
+    repeat: int,
+    write_repeat: int,
+    max_seconds: float,
+    links: int,
+    fanout: int,
+    seed: int,
+    cases: List[Case]
+) -> List[dict]:
+    """Наполняет временную базу заданного размера и измеряет все случаи."""
+    config = SeedConfig(
+        factories=max(2, equipment // 10000),
+        sections=max(2, equipment // 25),
+        equipment=equipment,
+        seed=seed
+    )
+    with tempfile.TemporaryDirectory(prefix='bench_crud_') as tmp_dir:
+        url = f'sqlite:///{os.path.join(tmp_dir, "bench.db")}'
+        upgrade_schema(url)
+        engine = create_db_engine(url, build_storage_profile('wal'))
+        SessionLocal = sessionmaker(autoflush=False, bind=engine)
+        results = []
+        with SessionLocal() as db:
+            seed_database(db, config)
+            # Статистика для планировщика: без неё связи выбираются через индекс
+            # активности участков, а не через индекс связей по оборудованию
+            db.execute(text('ANALYZE'))
+            db.commit()
+            ctx = Context(db, config, random.Random(seed), links, fanout)
+            db.rollback()
+            for case in cases:
+                metrics = _measure(db, ctx, case, write_repeat if case.write else repeat, max_seconds)
+                results.append({
+                    'equipment': config.equipment,
+                    'sections': config.sections,
+                    'factories': config.factories,
+                    'case': case.name,
+                    **metrics,
+                })
+        engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Размеры базы (единиц оборудования)'
+    )
+    parser.add_argument('--repeat', type=int, default=200, help='Вызовов каждой функции чтения')
+    parser.add_argument('--write-repeat', type=int, default=50, help='Вызовов каждой функции записи')
+    parser.add_argument('--max-seconds', type=float, default=5.0, help='Предельное время на один случай, с')
+    parser.add_argument('--links', type=int, default=20, help='Участков у создаваемого оборудования')
+    parser.add_argument('--fanout', type=int, default=500, help='Оборудования у деактивируемого участка')
+    parser.add_argument('--case', action='append', help='Измерять только указанные случаи (можно повторять)')
+    parser.add_argument('--seed', type=int, default=42, help='Зерно генератора данных')
+    parser.add_argument('--json', dest='json_path', help='Сохранить результаты в JSON-файл')
+    args = parser.parse_args()
+
+    # activate_section активирует участки, деактивированные soft_delete_section
+    selected = set(args.case or [])
+    if 'activate_section[fanout]' in selected:
+        selected.add('soft_delete_section[fanout]')
+    cases = [case for case in CASES if not selected or case.name in selected]
+    results = []
+    print(f'{"размер":>8} {"функция":<36} {"вызовов":>8} {"оп/с":>10} {"p50, мс":>9} {"p99, мс":>9} {"SQL/вызов":>10}')
+    for size in args.sizes:
+        for row in run_size(
+            size, args.repeat, args.write_repeat, args.max_seconds, args.links, args.fanout, args.seed, cases
+        ):
+            results.append(row)
+            print(
+                f'{row["equipment"]:>8} {row["case"]:<36} {row["calls"]:>8} {row["ops_per_sec"]:>10} '
+                f'{row["p50_ms"]:>9} {row["p99_ms"]:>9} {row["queries_per_call"]:>10}'
+            )
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'sizes': args.sizes, 'results': results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+"""
+Нагрузочное тестирование API по сценарию со смесью запросов.
+
+Запуск:
+    python -m benchmarks.load_test benchmarks/scenarios/shop_floor_read_heavy.json
+    python -m benchmarks.load_test benchmarks/scenarios/erp_sync_write_heavy.json \\
+        --concurrency 40 --duration 60 --workers 4 --json erp.json
+
+Сценарий (JSON) задаёт объём данных (dataset, параметры app.seed), число
+одновременных клиентов, длительность и взвешенную смесь запросов. Перед
+нагрузкой база заполняется генератором app.seed (со сбором статистики
+планировщика ANALYZE), приложение запускается локально через uvicorn. С
+--base-url нагружается уже запущенный сервер с имеющимися данными (dataset не
+используется).
+
+В путях и телах запросов подставляются {factory_id}, {section_id} (случайные
+из активных участков, прочитанных с сервера перед нагрузкой), {equipment_id}
+(от 1 до наибольшего ID оборудования), {section_ids} (список из links участков
+одной фабрики), {search_term} и {unique} (уникальная строка для наименований).
+Строка, целиком состоящая из подстановки, заменяется значением с его типом.
+
+Для каждого запроса смеси выводятся число запросов, пропускная способность,
+p50/p95/p99 задержки и доля ошибок (статус 4xx/5xx или сбой соединения).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import create_db_engine
+from app.seed import SeedConfig, seed_database, upgrade_schema
+
+from ._server import percentile, run_server
+
+# Поисковые слова: встречаются в наименованиях генератора app.seed
+SEARCH_TERMS = ('насос', 'пресс', 'станок', 'датчик давления', 'компрессор', 'печь')
+
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+class Endpoint(NamedTuple):
+    """Запрос смеси сценария."""
+    name: str
+    weight: float
+    method: str
+    path: str
+    body: object = None
+
+
+class Scenario(NamedTuple):
+    """Сценарий нагрузки."""
+    name: str
+    dataset: SeedConfig
+    concurrency: int
+    duration: float
+    warmup: float
+    links: int
+    mix: List[Endpoint]
+
+
+def load_scenario(path: str) -> Scenario:
+    """Читает и проверяет файл сценария."""
+    with open(path, encoding='utf-8') as f:
+        raw = json.load(f)
+    mix = [
+        Endpoint(
+            name=item.get('name') or f'{item["method"]} {item["path"]}',
+            weight=float(item.get('weight', 1)),
+            method=item['method'].upper(),
+            path=item['path'],
+            body=item.get('json'),
+        )
+        for item in raw['mix']
+    ]
+    if not mix or any(endpoint.weight <= 0 for endpoint in mix):
+        raise ValueError(f'Сценарий {path}: смесь запросов пуста или содержит неположительный вес.')
+    return Scenario(
+        name=raw.get('name', os.path.basename(path)),
+        dataset=SeedConfig(**raw.get('dataset', {})),
+        concurrency=int(raw.get('concurrency', 20)),
+        duration=float(raw.get('duration', 30)),
+        warmup=float(raw.get('warmup', 0)),
+        links=int(raw.get('links', 1)),
+        mix=mix,
+    )
+
+
+class Placeholders:
+    """Значения подстановок: случайные ID из имеющихся на сервере записей."""
+
+    def __init__(
+        self, sections_by_factory: Dict[int, List[int]], max_equipment_id: int, links: int, rng: random.Random
+    ) -> None:
+        self.sections_by_factory = sections_by_factory
+        self.factory_ids = sorted(sections_by_factory)
+        self.section_ids = [section_id for ids in sections_by_factory.values() for section_id in ids]
+        self.max_equipment_id = max_equipment_id
+        self.links = links
+        self.rng = rng
+        self.run_id = uuid.uuid4().hex[:8]
+        self.counter = 0
+
+    def value(self, key: str):
+        """Возвращает значение подстановки key."""
+        if key == 'factory_id':
+            return self.rng.choice(self.factory_ids)
+        if key == 'section_id':
+            return self.rng.choice(self.section_ids)
+        if key == 'equipment_id':
+            return self.rng.randint(1, self.max_equipment_id)
+        if key == 'section_ids':
+            sections = self.sections_by_factory[self.rng.choice(self.factory_ids)]
+            return self.rng.sample(sections, min(self.links, len(sections)))
+        if key == 'search_term':
+            return self.rng.choice(SEARCH_TERMS)
+        if key == 'unique':
+            self.counter += 1
+            return f'{self.run_id}-{self.counter}'
+        raise KeyError(f'Неизвестная подстановка {{{key}}}.')
+
+    def render(self, template):
+        """Подставляет значения в строку, список или словарь шаблона."""
+        if isinstance(template, dict):
+            return {key: self.render(value) for key, value in template.items()}
+        if isinstance(template, list):
+            return [self.render(value) for value in template]
+        if not isinstance(template, str):
+            return template
+        whole = _PLACEHOLDER.fullmatch(template)
+        if whole:
+            return self.value(whole.group(1))
+        return _PLACEHOLDER.sub(lambda match: str(self.value(match.group(1))), template)
+
+
+async def discover(base_url: str, links: int, rng: random.Random) -> Placeholders:
+    """
+    Читает с сервера активные участки (потоковой выгрузкой) и наибольший ID
+    оборудования, из которых выбираются ID запросов.
+    """
+    sections_by_factory: Dict[int, List[int]] = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        async with client.stream('GET', '/export/sections', params={'format': 'ndjson'}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    section = json.loads(line)
+                    if section['is_active']:
+                        sections_by_factory.setdefault(section['factory_id'], []).append(section['id'])
+        response = await client.get('/equipment/', params={'sort': '-id', 'limit': 1})
+        response.raise_for_status()
+        latest = response.json()
+    if not sections_by_factory or not latest:
+        raise RuntimeError('На сервере нет активных участков или оборудования для нагрузки.')
+    return Placeholders(sections_by_factory, latest[0]['id'], links, rng)
+
+
+class EndpointStats:
+    """Задержки и статусы ответов одного запроса смеси."""
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+    def add(self, latency: float, status: str, failed: bool) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.errors += failed
+
+    def report(self, elapsed: float) -> dict:
+        requests = len(self.latencies)
+        return {
+            'requests': requests,
+            'rps': round(requests / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(percentile(self.latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(self.latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(self.latencies, 0.99) * 1000, 2),
+            'errors': self.errors,
+            'error_rate': round(self.errors / requests, 4) if requests else 0.0,
+            'statuses': dict(sorted(self.statuses.items())),
+        }
+
+
+async def drive(base_url: str, scenario: Scenario, placeholders: Placeholders) -> dict:
+    """
+    Нагружает сервер scenario.concurrency клиентами в замкнутом цикле: каждый
+    отправляет следующий запрос сразу после ответа на предыдущий. Запросы
+    прогрева (первые scenario.warmup секунд) не учитываются.
+    """
+    stats = {endpoint.name: EndpointStats() for endpoint in scenario.mix}
+    total = EndpointStats()
+    weights = [endpoint.weight for endpoint in scenario.mix]
+    limits = httpx.Limits(max_connections=scenario.concurrency, max_keepalive_connections=scenario.concurrency)
+    started_at = time.perf_counter()
+    measure_from = started_at + scenario.warmup
+    deadline = measure_from + scenario.duration
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                endpoint = placeholders.rng.choices(scenario.mix, weights)[0]
+                path = placeholders.render(endpoint.path)
+                body = placeholders.render(endpoint.body) if endpoint.body is not None else None
+                request_started = time.perf_counter()
+                try:
+                    response = await client.request(endpoint.method, path, json=body)
+                    status, failed = str(response.status_code), response.status_code >= 400
+                except httpx.HTTPError as e:
+                    status, failed = type(e).__name__, True
+                if request_started >= measure_from:
+                    latency = time.perf_counter() - request_started
+                    stats[endpoint.name].add(latency, status, failed)
+                    total.add(latency, status, failed)
+
+        await asyncio.gather(*(worker() for _ in range(scenario.concurrency)))
+    elapsed = time.perf_counter() - measure_from
+
+    return {
+        'scenario': scenario.name,
+        'concurrency': scenario.concurrency,
+        'duration_seconds': round(elapsed, 2),
+        'endpoints': [
+            {'name': endpoint.name, 'method': endpoint.method, 'path': endpoint.path, **stats[endpoint.name].report(elapsed)}
+            for endpoint in scenario.mix
+        ],
+        'total': total.report(elapsed),
+    }
+
+
+@contextmanager
+def local_server(scenario: Scenario, workers: int, env: Dict[str, str]) -> Iterator[str]:
+    """Заполняет временную базу по scenario.dataset и запускает на ней приложение."""
+    with tempfile.TemporaryDirectory(prefix='bench_load_') as tmp_dir:
+        database_path = os.path.join(tmp_dir, 'load.db')
+        url = f'sqlite:///{database_path}'
+        upgrade_schema(url)
+        engine = create_db_engine(url, settings.storage_profile)
+        try:
+            with Session(engine) as db:
+                seed_database(db, scenario.dataset)
+                # Статистика планировщика, как в benchmarks.crud_scaling
+                db.execute(text('ANALYZE'))
+                db.commit()
+        finally:
+            engine.dispose()
+        with run_server(env=env, database_path=database_path, workers=workers) as base_url:
+            yield base_url
+
+
+def _print_report(report: dict) -> None:
+    print(f'Сценарий: {report["scenario"]}, клиентов: {report["concurrency"]}, {report["duration_seconds"]} с')
+    print(
+        f'{"запрос":<32} {"запросов":>9} {"rps":>8} {"p50, мс":>9} {"p95, мс":>9} '
+        f'{"p99, мс":>9} {"ошибки":>8}'
+    )
+    for row in report['endpoints'] + [{'name': 'всего', **report['total']}]:
+        print(
+            f'{row["name"]:<32} {row["requests"]:>9} {row["rps"]:>8} {row["p50_ms"]:>9} '
+            f'{row["p95_ms"]:>9} {row["p99_ms"]:>9} {row["error_rate"] * 100:>7.2f}%'
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scenario', help='Файл сценария (JSON)')
+    parser.add_argument('--concurrency', type=int, help='Одновременных клиентов (вместо значения сценария)')
+    parser.add_argument('--duration', type=float, help='Длительность замера, с (вместо значения сценария)')
+    parser.add_argument('--workers', type=int, default=1, help='Рабочих процессов uvicorn')
+    parser.add_argument('--db-mode', choices=('sync', 'async'), help='Режим доступа к БД (DB_MODE)')
+    parser.add_argument('--base-url', help='Нагружать уже запущенный сервер вместо локального')
+    parser.add_argument('--seed', type=int, default=1, help='Зерно выбора запросов и ID')
+    parser.add_argument('--json', dest='json_path', help='Сохранить результаты в JSON-файл')
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    scenario = scenario._replace(
+        concurrency=args.concurrency or scenario.concurrency,
+        duration=args.duration or scenario.duration
+    )
+    env = {'DB_MODE': args.db_mode} if args.db_mode else {}
+
+    async def run(base_url: str) -> dict:
+        placeholders = await discover(base_url, scenario.links, random.Random(args.seed))
+        return await drive(base_url, scenario, placeholders)
+
+    if args.base_url:
+        report = asyncio.run(run(args.base_url))
+    else:
+        with local_server(scenario, args.workers, env) as base_url:
+            report = asyncio.run(run(base_url))
+    report['workers'] = None if args.base_url else args.workers
+    _print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Задержка полнотекстового поиска (FTS5) на большом справочнике.
+
+Запуск:
+    python -m benchmarks.search_latency --equipment 200000 --repeat 50
+
+Создаёт временную базу через миграции Alembic (индексы FTS5 и триггеры),
+наполняет её оборудованием пакетными INSERT и сравнивает crud.search_entities
+с поиском подстроки через LIKE '%...%' по тем же колонкам.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import insert, or_, text
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.config import build_storage_profile
+from app.database import create_db_engine
+
+from ._server import PROJECT_ROOT
+
+# Частые слова наименований и описаний оборудования
+WORDS = (
+    'насос', 'пресс', 'станок', 'конвейер', 'датчик', 'клапан', 'компрессор', 'фильтр',
+    'редуктор', 'двигатель', 'манипулятор', 'сушилка', 'миксер', 'дозатор', 'генератор',
+    'охладитель', 'гидравлический', 'токарный', 'фрезерный', 'вакуумный', 'резервный',
+    'линия', 'упаковка', 'сварка', 'окраска', 'сборка', 'контроль', 'давление', 'температура',
+)
+SYLLABLES = ('ка', 'ро', 'ми', 'те', 'ла', 'ну', 'вер', 'ско', 'пра', 'дин', 'мот', 'гра')
+# Размер словаря: частые слова плюс синтетические, частоты по закону Ципфа
+VOCABULARY_SIZE = 3000
+
+# Поисковые запросы: короткий префикс, слово, два слова, редкое сочетание
+QUERIES = ('на', 'пре', 'компрессор', 'насос вакуумный', 'фрез двиг сварка', 'мотдин')
+
+
+def _vocabulary(rng: random.Random) -> tuple:
+    """Возвращает словарь и веса слов, убывающие по закону Ципфа."""
+    words = list(WORDS)
+    while len(words) < VOCABULARY_SIZE:
+        word = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in words:
+            words.append(word)
+    return words, [1 / rank for rank in range(1, len(words) + 1)]
+
+
+def _prepare(url: str, factories: int, sections_per_factory: int, equipment: int, seed: int) -> None:
+    """Создаёт схему миграциями и наполняет справочники случайными данными."""
+    alembic_cfg = Config(os.path.join(PROJECT_ROOT, 'alembic.ini'))
+    alembic_cfg.set_main_option('sqlalchemy.url', url)
+    command.upgrade(alembic_cfg, 'head')
+
+    rng = random.Random(seed)
+    words, weights = _vocabulary(rng)
+
+    def phrase(length: int) -> str:
+        return ' '.join(rng.choices(words, weights, k=length))
+
+    engine = create_db_engine(url, build_storage_profile('wal'))
+    with engine.begin() as conn:
+        conn.execute(insert(models.Factory), [
+            {'id': i, 'name': f'Фабрика {i}', 'is_active': True} for i in range(1, factories + 1)
+        ])
+        conn.execute(insert(models.Section), [
+            {
+                'id': i,
+                'name': f'Участок {phrase(1)} {i}',
+                'factory_id': 1 + (i - 1) // sections_per_factory,
+                'is_active': True,
+            }
+            for i in range(1, factories * sections_per_factory + 1)
+        ])
+        conn.execute(insert(models.Equipment), [
+            {
+                'id': i,
+                'name': f'{phrase(2).capitalize()} {i}',
+                'description': phrase(8),
+                'is_active': rng.random() > 0.05,
+            }
+            for i in range(1, equipment + 1)
+        ])
+    engine.dispose()
+
+
+def _like_search(db, query: str, limit: int) -> list:
+    """Базовый вариант: все слова запроса как подстроки наименования или описания."""
+    statement = db.query(models.Equipment).filter(models.Equipment.is_active == True)
+    for term in query.split():
+        pattern = f'%{term}%'
+        statement = statement.filter(or_(
+            models.Equipment.name.like(pattern), models.Equipment.description.like(pattern)
+        ))
+    return statement.order_by(models.Equipment.id).limit(limit).all()
+
+
+def _count_matches(db, query: str) -> int:
+    """Число единиц оборудования, совпавших с запросом (их всех нужно ранжировать)."""
+    return db.execute(
+        text('SELECT count(*) FROM equipment_fts WHERE equipment_fts MATCH :match'),
+        {'match': crud.build_search_match(query)}
+    ).scalar()
+
+
+def _measure(fn, repeat: int) -> dict:
+    """Выполняет fn repeat раз и возвращает перцентили задержки в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    timings.sort()
+    return {
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 2),
+    }
+
+
+def run(equipment: int, repeat: int, limit: int, seed: int) -> list:
+    """Наполняет временную базу и измеряет задержку каждого запроса."""
+    with tempfile.TemporaryDirectory(prefix='bench_search_') as tmp_dir:
+        url = f'sqlite:///{os.path.join(tmp_dir, "bench.db")}'
+        _prepare(url, factories=50, sections_per_factory=20, equipment=equipment, seed=seed)
+        engine = create_db_engine(url, build_storage_profile('wal'), read_only=True)
+        SessionLocal = sessionmaker(autoflush=False, bind=engine)
+        results = []
+        with SessionLocal() as db:
+            for query in QUERIES:
+                matches = _count_matches(db, query)
+                fts = _measure(lambda: crud.search_entities(db, query, limit=limit), repeat)
+                like = _measure(lambda: _like_search(db, query, limit), repeat)
+                results.append({
+                    'query': query,
+                    'matches': matches,
+                    'fts_p50_ms': fts['p50_ms'],
+                    'fts_p95_ms': fts['p95_ms'],
+                    'like_p50_ms': like['p50_ms'],
+                    'like_p95_ms': like['p95_ms'],
+                })
+        engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--equipment', type=int, default=200000, help='Единиц оборудования в базе')
+    parser.add_argument('--repeat', type=int, default=50, help='Повторов каждого запроса')
+    parser.add_argument('--limit', type=int, default=20, help='Размер страницы результатов')
+    parser.add_argument('--seed', type=int, default=1, help='Зерно генератора данных')
+    parser.add_argument('--json', dest='json_path', help='Сохранить результаты в JSON-файл')
+    args = parser.parse_args()
+
+    results = run(args.equipment, args.repeat, args.limit, args.seed)
+    print(f'{"запрос":<20} {"совпало":>8} {"FTS p50":>9} {"FTS p95":>9} {"LIKE p50":>9} {"LIKE p95":>9}')
+    for row in results:
+        print(
+            f'{row["query"]:<20} {row["matches"]:>8} {row["fts_p50_ms"]:>9} {row["fts_p95_ms"]:>9} '
+            f'{row["like_p50_ms"]:>9} {row["like_p95_ms"]:>9}'
+        )
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Пропускная способность чтения и записи SQLite для разных профилей хранилища.
+
+Запуск:
+    python -m benchmarks.storage_profiles --readers 4 --writers 2 --duration 5
+
+Для каждого профиля создаётся временная база, после чего несколько процессов
+(как воркеры gunicorn) одновременно читают списки и иерархию и создают
+оборудование через функции crud.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.config import STORAGE_PROFILES, build_storage_profile
+from app.database import Base, create_db_engine
+
+
+def _session_factory(url: str, profile_name: str):
+    """Создаёт фабрику сессий с указанным профилем хранилища."""
+    engine = create_db_engine(url, build_storage_profile(profile_name))
+    return engine, sessionmaker(autoflush=False, bind=engine)
+
+
+def _prepare(url: str, profile_name: str, sections: int) -> None:
+    """Создаёт схему и базовые данные для нагрузки."""
+    engine, SessionLocal = _session_factory(url, profile_name)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        factory = crud.create_factory(db, schemas.FactoryCreate(name='Фабрика'))
+        crud.bulk_create_sections(db, [
+            schemas.SectionCreate(name=f'Участок {i}', factory_id=factory.id)
+            for i in range(sections)
+        ])
+    engine.dispose()
+
+
+def _worker(kind: str, worker_id: int, url: str, profile_name: str, duration: float, queue) -> None:
+    """Выполняет операции чтения или записи в течение duration секунд."""
+    engine, SessionLocal = _session_factory(url, profile_name)
+    ops = errors = 0
+    deadline = time.monotonic() + duration
+    with SessionLocal() as db:
+        while time.monotonic() < deadline:
+            try:
+                if kind == 'write':
+                    crud.create_equipment(db, schemas.EquipmentCreate(
+                        name=f'Обор. {worker_id}-{ops}', section_ids=[1 + ops % 10]
+                    ))
+                else:
+                    crud.get_equipment_list(db, limit=50)
+                    crud.get_entity_hierarchy(db, 'factory', 1)
+                    db.rollback()
+                ops += 1
+            except OperationalError:
+                db.rollback()
+                errors += 1
+    engine.dispose()
+    queue.put((kind, ops, errors))
+
+
+def run_profile(profile_name: str, readers: int, writers: int, duration: float) -> dict:
+    """Запускает нагрузку для одного профиля и возвращает метрики."""
+    with tempfile.TemporaryDirectory(prefix='bench_storage_') as tmp_dir:
+        url = f'sqlite:///{os.path.join(tmp_dir, "bench.db")}'
+        _prepare(url, profile_name, sections=10)
+        queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_worker, args=(kind, i, url, profile_name, duration, queue))
+            for i, kind in enumerate(['read'] * readers + ['write'] * writers)
+        ]
+        for process in processes:
+            process.start()
+        results = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+    totals = {'read': [0, 0], 'write': [0, 0]}
+    for kind, ops, errors in results:
+        totals[kind][0] += ops
+        totals[kind][1] += errors
+    return {
+        'profile': profile_name,
+        'reads_per_sec': round(totals['read'][0] / duration, 1),
+        'writes_per_sec': round(totals['write'][0] / duration, 1),
+        'locked_errors': totals['read'][1] + totals['write'][1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=list(STORAGE_PROFILES), choices=list(STORAGE_PROFILES))
+    parser.add_argument('--readers', type=int, default=4, help='Процессов-читателей')
+    parser.add_argument('--writers', type=int, default=2, help='Процессов-писателей')
+    parser.add_argument('--duration', type=float, default=5.0, help='Длительность нагрузки, с')
+    parser.add_argument('--json', dest='json_path', help='Сохранить результаты в JSON-файл')
+    args = parser.parse_args()
+
+    results = [run_profile(name, args.readers, args.writers, args.duration) for name in args.profiles]
+    print(f'{"профиль":<10} {"чтений/с":>10} {"записей/с":>10} {"блокировки":>11}')
+    for row in results:
+        print(
+            f'{row["profile"]:<10} {row["reads_per_sec"]:>10} '
+            f'{row["writes_per_sec"]:>10} {row["locked_errors"]:>11}'
+        )
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
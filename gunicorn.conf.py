@@ -0,0 +1,27 @@
+"""
+Настройки gunicorn: общий каталог метрик Prometheus для рабочих процессов.
+
+Файл подхватывается gunicorn автоматически из рабочего каталога.
+"""
+import os
+import shutil
+import tempfile
+
+# Каталог должен быть задан до первого импорта prometheus_client в любом процессе
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'spravochniki-metrics')
+)
+
+from prometheus_client import multiprocess  # noqa: E402
+
+
+def on_starting(server):
+    """Очищает метрики предыдущего запуска до старта рабочих процессов."""
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Исключает завершившийся процесс из gauge-метрик (запросы и соединения в работе)."""
+    multiprocess.mark_process_dead(worker.pid)
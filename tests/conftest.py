@@ -1,8 +1,10 @@
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from app.database import get_db, Base
+from sqlalchemy.pool import NullPool, StaticPool
+from app.database import get_db, get_read_db, Base
+from app.db_runner import AsyncDbRunner, get_db_runner, get_read_db_runner
 from app.main import app as fastapi_app
 import app.models  # для регистрации моделей в Base.metadata
 
@@ -36,6 +38,7 @@ def override_get_db():
         db.close()
 
 fastapi_app.dependency_overrides[get_db] = override_get_db
+fastapi_app.dependency_overrides[get_read_db] = override_get_db
 
 @pytest.fixture(scope="session", autouse=True)
 def apply_migrations():
@@ -83,3 +86,30 @@ def client(apply_migrations):
     from fastapi.testclient import TestClient
     with TestClient(fastapi_app) as c:
         yield c
+
+
+@pytest.fixture
+def async_db_mode(apply_migrations):
+    """
+    Фикстура переключает маршруты на асинхронный путь к БД (AsyncSession
+    поверх aiosqlite) для тестовой базы данных.
+    """
+    async_engine_test = create_async_engine(
+        SQLALCHEMY_DATABASE_URL_TEST.replace(
+            "sqlite://", "sqlite+aiosqlite://", 1
+        ),
+        poolclass=NullPool,
+    )
+    AsyncTestingSessionLocal = async_sessionmaker(
+        autoflush=False, bind=async_engine_test
+    )
+
+    async def override_get_db_runner():
+        async with AsyncTestingSessionLocal() as db:
+            yield AsyncDbRunner(db)
+
+    fastapi_app.dependency_overrides[get_db_runner] = override_get_db_runner
+    fastapi_app.dependency_overrides[get_read_db_runner] = override_get_db_runner
+    yield
+    del fastapi_app.dependency_overrides[get_db_runner]
+    del fastapi_app.dependency_overrides[get_read_db_runner]
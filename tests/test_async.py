@@ -0,0 +1,63 @@
+import pytest
+from fastapi.testclient import TestClient
+from fastapi import status
+
+from app.db_runner import DbRunner
+
+
+def test_crud_through_async_session(client: TestClient, async_db_mode):
+    """Тест основных операций через асинхронный путь к БД."""
+    f_res = client.post("/factories/", json={"name": "Асинхронная фабрика"})
+    assert f_res.status_code == status.HTTP_201_CREATED
+    f_id = f_res.json()["id"]
+    s_res = client.post(
+        "/sections/", json={"name": "Асинхронный участок", "factory_id": f_id}
+    )
+    assert s_res.status_code == status.HTTP_201_CREATED
+    s_id = s_res.json()["id"]
+    e_res = client.post(
+        "/equipment/",
+        json={"name": "Асинхронное обор.", "section_ids": [s_id]}
+    )
+    assert e_res.status_code == status.HTTP_201_CREATED
+    assert e_res.json()["sections"][0]["id"] == s_id
+
+    section = client.get(f"/sections/{s_id}").json()
+    assert section["factory"]["id"] == f_id
+    assert section["equipment"][0]["name"] == "Асинхронное обор."
+
+    hierarchy = client.get(f"/hierarchy/?entity_type=factory&entity_id={f_id}")
+    assert hierarchy.status_code == status.HTTP_200_OK
+    assert hierarchy.json()["children"][0]["children"][0]["id"] == e_res.json()["id"]
+    not_modified = client.get(
+        f"/hierarchy/?entity_type=factory&entity_id={f_id}",
+        headers={"If-None-Match": hierarchy.headers["ETag"]}
+    )
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_async_errors_are_mapped(client: TestClient, async_db_mode):
+    """Тест обработки ошибок crud на асинхронном пути к БД."""
+    client.post("/factories/", json={"name": "Асинхронный дубликат"})
+    response = client.post("/factories/", json={"name": "Асинхронный дубликат"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert client.delete("/equipment/99999").status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_async_db_stats_headers(client: TestClient, async_db_mode, monkeypatch):
+    """Тест: на асинхронном пути учитываются число и время SQL-запросов."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "db_stats_headers", True)
+    response = client.get("/factories/?limit=5")
+    assert response.status_code == status.HTTP_200_OK
+    assert int(response.headers["X-DB-Queries"]) >= 2
+    assert float(response.headers["X-DB-Time-ms"]) > 0
+
+
+def test_incomplete_db_runner_cannot_be_created():
+    """Тест: исполнитель без метода run не создаётся."""
+    class IncompleteRunner(DbRunner):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteRunner()
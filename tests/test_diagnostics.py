@@ -0,0 +1,148 @@
+import pytest
+from fastapi.testclient import TestClient
+from fastapi import status
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.config import build_storage_profile
+from app.database import create_db_engine, read_only_url
+
+
+def test_storage_diagnostics(client: TestClient):
+    """Тест диагностики профиля хранилища."""
+    response = client.get("/diagnostics/storage")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["profile"]["name"]
+    assert "journal_mode" in data["effective_pragmas"]
+    assert "busy_timeout" in data["effective_pragmas"]
+    assert data["pool"]
+
+
+def test_build_storage_profile_overrides():
+    """Тест сборки профиля хранилища с переопределениями."""
+    profile = build_storage_profile("wal", {"busy_timeout": 250, "pool_size": 2})
+    assert profile.journal_mode == "WAL"
+    assert profile.busy_timeout == 250
+    assert profile.pool_size == 2
+    assert ("busy_timeout", 250) in profile.pragmas()
+    assert build_storage_profile("default").pragmas() == []
+
+
+def test_read_only_engine_rejects_writes():
+    """Тест запрета записи через соединения пула только для чтения."""
+    read_engine = create_db_engine(
+        "sqlite:///./test_spravochniki.db", build_storage_profile("default"), read_only=True
+    )
+    try:
+        with read_engine.connect() as connection:
+            assert connection.execute(text("PRAGMA query_only")).scalar() == 1
+            assert connection.execute(text("SELECT count(*) FROM factories")).scalar() >= 0
+            with pytest.raises(OperationalError):
+                connection.execute(text("INSERT INTO factories (name, is_active) VALUES ('ro', 1)"))
+    finally:
+        read_engine.dispose()
+    assert read_only_url("sqlite:///./db.sqlite") == "sqlite:///file:./db.sqlite?mode=ro&uri=true"
+    assert read_only_url("sqlite://") == "sqlite://"
+
+
+def test_read_only_engine_skips_write_pragmas(tmp_path):
+    """Тест: к соединениям только для чтения не применяются PRAGMA записи профиля."""
+    url = f"sqlite:///{tmp_path / 'ro.db'}"
+    write_engine = create_db_engine(url, build_storage_profile("default"))
+    with write_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+    write_engine.dispose()
+
+    read_engine = create_db_engine(read_only_url(url), build_storage_profile("wal"), read_only=True)
+    try:
+        with read_engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert connection.execute(text("PRAGMA query_only")).scalar() == 1
+    finally:
+        read_engine.dispose()
+    assert [name for name, _ in build_storage_profile("wal").pragmas(read_only=True)] == [
+        "cache_size", "temp_store", "busy_timeout"
+    ]
+
+
+def test_db_stats_headers_and_request_log(client: TestClient, monkeypatch, caplog):
+    """Тест заголовков статистики SQL-запросов и JSON-журнала запросов."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "db_stats_headers", True)
+    monkeypatch.setattr(settings, "request_log", True)
+    factory_id = client.post("/factories/", json={"name": "Фабрика для журнала"}).json()["id"]
+
+    with caplog.at_level("INFO", logger="app.requests"):
+        response = client.get(f"/factories/{factory_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert int(response.headers["X-DB-Queries"]) >= 1
+    assert float(response.headers["X-DB-Time-ms"]) > 0
+
+    record = caplog.records[-1].request_stats
+    assert record["route"] == "/factories/{factory_id}"
+    assert record["path"] == f"/factories/{factory_id}"
+    assert record["status"] == 200
+    assert record["db_queries"] == int(response.headers["X-DB-Queries"])
+    assert record["db_time_ms"] <= record["duration_ms"]
+
+
+def test_streaming_response_queries_are_logged(client: TestClient, monkeypatch, caplog):
+    """Тест: запросы, выполненные при формировании потокового ответа, попадают в журнал."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "db_stats_headers", True)
+    monkeypatch.setattr(settings, "request_log", True)
+    client.post("/factories/", json={"name": "Фабрика для потокового журнала"})
+
+    with caplog.at_level("INFO", logger="app.requests"):
+        response = client.get("/export/factories", params={"batch_size": 1})
+    assert response.status_code == status.HTTP_200_OK
+
+    record = caplog.records[-1].request_stats
+    assert record["route"] == "/export/{dataset}"
+    # Тело читается пачками по одной строке уже после отправки заголовков
+    assert record["db_queries"] > int(response.headers["X-DB-Queries"])
+    assert record["db_queries"] >= 1
+
+
+def test_metrics_endpoint(client: TestClient):
+    """Тест метрик Prometheus: запросы по шаблону маршрута, время SQL и пул соединений."""
+    factory_id = client.post("/factories/", json={"name": "Фабрика для метрик"}).json()["id"]
+    client.get(f"/factories/{factory_id}")
+
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/factories/{factory_id}",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{le="0.001",method="GET",route="/factories/{factory_id}"}' in body
+    assert 'http_requests_in_progress{method="GET"} 1.0' in body
+    assert 'db_query_duration_seconds_count{operation="select"}' in body
+    assert "http_request_db_seconds_sum" in body
+    assert "db_pool_checkouts_total" in body
+
+    client.get("/no-such-path")
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in body
+
+
+def test_metrics_aggregate_across_processes(tmp_path):
+    """Тест: в многопроцессном режиме значения рабочих процессов суммируются."""
+    import os
+    import subprocess
+    import sys
+    from app.metrics import render_metrics
+
+    script = (
+        "from app.metrics import HTTP_REQUESTS, HTTP_REQUEST_SECONDS\n"
+        "HTTP_REQUESTS.labels('GET', '/factories/', '200').inc()\n"
+        "HTTP_REQUEST_SECONDS.labels('GET', '/factories/').observe(0.02)\n"
+    )
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", script], env=env, check=True)
+
+    body = render_metrics(str(tmp_path)).decode()
+    assert 'http_requests_total{method="GET",route="/factories/",status="200"} 2.0' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/factories/"} 2.0' in body
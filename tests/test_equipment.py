@@ -1,3 +1,5 @@
+import base64
+
 from fastapi.testclient import TestClient
 from fastapi import status
 
@@ -35,3 +37,245 @@ def test_create_equipment(client: TestClient):
     full_data = get_response.json()
     assert len(full_data["sections"]) == 1
     assert full_data["sections"][0]["id"] == section_id
+
+
+def test_read_equipment_keyset_pagination(client: TestClient):
+    """Тест keyset-пагинации списка оборудования через курсор."""
+    created_ids = []
+    for i in range(5):
+        res = client.post(
+            "/equipment/", json={"name": f"Оборудование для курсора {i}"}
+        )
+        assert res.status_code == status.HTTP_201_CREATED
+        created_ids.append(res.json()["id"])
+
+    first_page = client.get(
+        f"/equipment/?after_id={created_ids[0] - 1}&limit=2"
+    )
+    assert first_page.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in first_page.json()] == created_ids[:2]
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = client.get(f"/equipment/?cursor={cursor}&limit=2")
+    assert second_page.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in second_page.json()] == created_ids[2:4]
+
+
+def test_read_equipment_invalid_cursor(client: TestClient):
+    """Тест передачи некорректного курсора пагинации."""
+    response = client.get("/equipment/?cursor=not-a-cursor")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "курсор" in response.json()["detail"]
+
+
+def test_read_equipment_forged_name_cursor(client: TestClient):
+    """Тест: курсор сортировки по имени с нестроковым значением поля отклоняется."""
+    for raw in ('name:[{"a": 1}, 1]', 'name:[null, 1]', 'name:[1.5, 1]'):
+        cursor = base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+        response = client.get("/equipment/", params={"sort": "name", "cursor": cursor})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "курсор" in response.json()["detail"]
+
+
+def test_read_equipment_out_of_range_keyset(client: TestClient):
+    """Тест: ID вне диапазона INTEGER SQLite и логические значения в курсоре отклоняются."""
+    def encode(raw: str) -> str:
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    too_large = str(2 ** 63)
+    assert client.get("/equipment/", params={"after_id": too_large}).status_code == 422
+    for params in (
+        {"cursor": encode(f"id:{too_large}")},
+        {"cursor": encode("id:²")},
+        {"sort": "name", "cursor": encode(f'name:["А", {too_large}]')},
+        {"sort": "name", "cursor": encode('name:["А", true]')},
+    ):
+        response = client.get("/equipment/", params=params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    largest = client.get("/equipment/", params={"cursor": encode(f"id:{2 ** 63 - 1}")})
+    assert largest.status_code == status.HTTP_200_OK
+    assert largest.json() == []
+
+
+def test_read_equipment_list_query_count_is_constant(client: TestClient, monkeypatch):
+    """Тест: число SQL-запросов списка не зависит от размера страницы."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "db_stats_headers", True)
+
+    factory_id = client.post(
+        "/factories/", json={"name": "Фабрика для подсчёта запросов"}
+    ).json()["id"]
+    section_id = client.post(
+        "/sections/",
+        json={"name": "Участок для подсчёта запросов", "factory_id": factory_id}
+    ).json()["id"]
+    first_id = None
+    for i in range(10):
+        res = client.post(
+            "/equipment/",
+            json={"name": f"Обор. для подсчёта запросов {i}", "section_ids": [section_id]}
+        )
+        first_id = first_id or res.json()["id"]
+
+    small_page = client.get(f"/equipment/?after_id={first_id - 1}&limit=2")
+    large_page = client.get(f"/equipment/?after_id={first_id - 1}&limit=10")
+    assert len(large_page.json()) == 10
+    assert all(len(item["sections"]) == 1 for item in large_page.json())
+    assert small_page.headers["X-DB-Queries"] == large_page.headers["X-DB-Queries"]
+
+
+def test_create_equipment_linked_sections_query_count(client: TestClient, monkeypatch):
+    """Тест: проверка привязанных участков не зависит от их количества."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "db_stats_headers", True)
+
+    factory_id = client.post(
+        "/factories/", json={"name": "Фабрика для пакетной проверки ID"}
+    ).json()["id"]
+    section_ids = [
+        client.post(
+            "/sections/",
+            json={"name": f"Участок пакетной проверки {i}", "factory_id": factory_id}
+        ).json()["id"]
+        for i in range(6)
+    ]
+
+    one_link = client.post(
+        "/equipment/",
+        json={"name": "Обор. с одним участком", "section_ids": section_ids[:1]}
+    )
+    many_links = client.post(
+        "/equipment/",
+        json={"name": "Обор. с шестью участками", "section_ids": section_ids}
+    )
+    assert many_links.status_code == status.HTTP_201_CREATED
+    assert len(many_links.json()["sections"]) == 6
+    assert one_link.headers["X-DB-Queries"] == many_links.headers["X-DB-Queries"]
+
+
+def test_create_equipment_reports_missing_sections(client: TestClient):
+    """Тест: в ошибке перечислены все отсутствующие участки."""
+    response = client.post(
+        "/equipment/",
+        json={"name": "Обор. с неверными участками", "section_ids": [99801, 99802]}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "[99801, 99802]" in response.json()["detail"]
+
+
+def test_bulk_create_equipment_with_sections(client: TestClient):
+    """Тест пакетного создания оборудования с привязкой к участкам."""
+    factory_id = client.post(
+        "/factories/", json={"name": "Фабрика для пакета оборудования"}
+    ).json()["id"]
+    section_id = client.post(
+        "/sections/",
+        json={"name": "Участок для пакета оборудования", "factory_id": factory_id}
+    ).json()["id"]
+
+    response = client.post(
+        "/equipment/bulk?mode=best_effort",
+        json=[
+            {"name": "Пакетное обор. 1", "section_ids": [section_id]},
+            {"name": "Пакетное обор. 2", "section_ids": [section_id, 99701]},
+            {"name": "Пакетное обор. 3", "description": "Без участков"},
+        ]
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()
+    assert data["created"] == 2
+    assert data["items"][1]["status"] == "error"
+    assert "[99701]" in data["items"][1]["detail"]
+
+    section = client.get(f"/sections/{section_id}").json()
+    assert [eq["id"] for eq in section["equipment"]] == [data["items"][0]["id"]]
+
+
+def test_bulk_deactivate_and_activate_equipment(client: TestClient, monkeypatch):
+    """Тест пакетной деактивации и активации оборудования с результатом по каждому ID."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "db_stats_headers", True)
+
+    factory_id = client.post("/factories/", json={"name": "Фабрика пакетного переключения"}).json()["id"]
+    section_id = client.post(
+        "/sections/", json={"name": "Участок пакетного переключения", "factory_id": factory_id}
+    ).json()["id"]
+    created = client.post("/equipment/bulk", json=[
+        {"name": f"Обор. переключения {i}", "section_ids": [section_id]} for i in range(32)
+    ]).json()
+    ids = [item["id"] for item in created["items"]]
+
+    response = client.post("/equipment/bulk/deactivate", json=[ids[0], 999999])
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    data = response.json()
+    assert data["changed"] == 0
+    assert data["results"][str(ids[0])]["status"] == "skipped"
+    assert data["results"]["999999"]["status"] == "not_found"
+    for mode in ("all_or_nothing", "best_effort"):
+        for action in ("deactivate", "activate"):
+            response = client.post(f"/equipment/bulk/{action}?mode={mode}", json=[ids[0], 2 ** 63])
+            assert response.status_code == 422
+
+    small = client.post("/equipment/bulk/deactivate?mode=best_effort", json=ids[:2] + [999999])
+    assert small.json()["changed"] == 2
+    large = client.post("/equipment/bulk/deactivate", json=ids[2:])
+    assert large.json()["changed"] == 30
+    assert small.headers["X-DB-Queries"] == large.headers["X-DB-Queries"]
+    assert client.get(f"/hierarchy/?entity_type=section&entity_id={section_id}").json()["children"] == []
+
+    again = client.post("/equipment/bulk/deactivate", json=ids[:1])
+    assert again.status_code == status.HTTP_400_BAD_REQUEST
+    assert again.json()["results"][str(ids[0])]["status"] == "already_inactive"
+
+    response = client.post("/equipment/bulk/activate", json=ids)
+    assert response.json()["changed"] == 32
+    assert {item["status"] for item in response.json()["results"].values()} == {"activated"}
+
+
+def test_read_equipment_list_filters(client: TestClient):
+    """Тест фильтров списка оборудования по участку, фабрике, префиксу и активности."""
+    factory_id = client.post("/factories/", json={"name": "Фабрика Фильтр Обор."}).json()["id"]
+    section_a = client.post(
+        "/sections/", json={"name": "Участок Фильтр А", "factory_id": factory_id}
+    ).json()["id"]
+    section_b = client.post(
+        "/sections/", json={"name": "Участок Фильтр Б", "factory_id": factory_id}
+    ).json()["id"]
+    in_a = client.post(
+        "/equipment/", json={"name": "ФильтрОбор 1", "section_ids": [section_a]}
+    ).json()["id"]
+    in_b = client.post(
+        "/equipment/", json={"name": "ФильтрОбор 2", "section_ids": [section_b]}
+    ).json()["id"]
+    inactive = client.post("/equipment/", json={"name": "ФильтрОбор 3"}).json()["id"]
+    client.delete(f"/equipment/{inactive}")
+
+    by_section = client.get("/equipment/", params={"section_id": section_a})
+    assert [item["id"] for item in by_section.json()] == [in_a]
+    by_factory = client.get("/equipment/", params={"factory_id": factory_id})
+    assert [item["id"] for item in by_factory.json()] == [in_a, in_b]
+    by_prefix = client.get("/equipment/", params={"name_prefix": "ФильтрОбор"})
+    assert [item["id"] for item in by_prefix.json()] == [in_a, in_b]
+    only_inactive = client.get("/equipment/", params={"name_prefix": "ФильтрОбор", "is_active": False})
+    assert [item["id"] for item in only_inactive.json()] == [inactive]
+
+
+def test_read_equipment_sorted_by_name_with_cursor(client: TestClient):
+    """Тест keyset-пагинации при сортировке по наименованию по убыванию."""
+    names = ["СортОбор В", "СортОбор А", "СортОбор Г", "СортОбор Б"]
+    for name in names:
+        client.post("/equipment/", json={"name": name})
+
+    params = {"name_prefix": "СортОбор", "sort": "-name", "limit": 3}
+    first_page = client.get("/equipment/", params=params)
+    assert [item["name"] for item in first_page.json()] == ["СортОбор Г", "СортОбор В", "СортОбор Б"]
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = client.get("/equipment/", params={**params, "cursor": cursor})
+    assert [item["name"] for item in second_page.json()] == ["СортОбор А"]
+
+    # Курсор действителен только для той сортировки, с которой он получен
+    mismatch = client.get("/equipment/", params={"cursor": cursor})
+    assert mismatch.status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/equipment/?sort=name&after_id=1").status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/equipment/?sort=description").status_code == 422
@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+from fastapi import status
+
+
+def test_export_equipment_ndjson_includes_inactive(client: TestClient):
+    """Тест выгрузки оборудования в NDJSON вместе с неактивными записями."""
+    eq_id = client.post(
+        "/equipment/", json={"name": "Обор. для выгрузки"}
+    ).json()["id"]
+    client.delete(f"/equipment/{eq_id}")
+
+    response = client.get("/export/equipment?batch_size=3")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    ids = [row["id"] for row in rows]
+    assert ids == sorted(ids)
+    exported = next(row for row in rows if row["id"] == eq_id)
+    assert exported["name"] == "Обор. для выгрузки"
+    assert exported["is_active"] is False
+
+
+def test_export_links_csv(client: TestClient):
+    """Тест выгрузки связей участок–оборудование в CSV."""
+    f_id = client.post("/factories/", json={"name": "Фабрика для выгрузки"}).json()["id"]
+    s_id = client.post(
+        "/sections/", json={"name": "Участок для выгрузки", "factory_id": f_id}
+    ).json()["id"]
+    e_id = client.post(
+        "/equipment/", json={"name": "Обор. связи для выгрузки", "section_ids": [s_id]}
+    ).json()["id"]
+
+    response = client.get("/export/links?format=csv")
+    assert response.status_code == status.HTTP_200_OK
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert {"section_id": str(s_id), "equipment_id": str(e_id)} in rows
@@ -1,6 +1,8 @@
 from fastapi.testclient import TestClient
 from fastapi import status
 
+from app.config import settings
+
 
 def test_create_factory(client: TestClient):
     """Тест создания фабрики."""
@@ -20,6 +22,19 @@ def test_create_duplicate_factory(client: TestClient):
     assert "уже существует" in response.json()["detail"]
 
 
+def test_factory_name_must_not_be_blank(client: TestClient):
+    """Тест: пустое наименование отклоняется, крайние пробелы отбрасываются."""
+    for name in ("", "   "):
+        response = client.post("/factories/", json={"name": name})
+        assert response.status_code == 422
+    created = client.post("/factories/", json={"name": "  Фабрика с пробелами  "}).json()
+    assert created["name"] == "Фабрика с пробелами"
+    response = client.put(f"/factories/{created['id']}", json={"name": " "})
+    assert response.status_code == 422
+    assert client.post("/sections/", json={"name": " ", "factory_id": created["id"]}).status_code == 422
+    assert client.post("/equipment/", json={"name": "\t"}).status_code == 422
+
+
 def test_read_factories_empty(client: TestClient):
     """Тест проверки отсутствия активных фабрик после деактивации."""
     response_before = client.get("/factories/")
@@ -182,3 +197,125 @@ def test_soft_delete_factory_with_active_sections(client: TestClient):
     delete_response = client.delete(f"/factories/{factory_id}")
     assert delete_response.status_code == status.HTTP_409_CONFLICT
     assert "активных участков" in delete_response.json()["detail"]
+
+
+def test_bulk_create_factories_all_or_nothing(client: TestClient):
+    """Тест пакетного создания фабрик в режиме «всё или ничего»."""
+    client.post("/factories/", json={"name": "Существующая фабрика пакета"})
+    response = client.post(
+        "/factories/bulk",
+        json=[
+            {"name": "Пакетная фабрика 1"},
+            {"name": "Существующая фабрика пакета"},
+        ]
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    data = response.json()
+    assert data["created"] == 0
+    assert [item["status"] for item in data["items"]] == ["skipped", "error"]
+    assert "уже существует" in data["items"][1]["detail"]
+
+    names = [f["name"] for f in client.get("/factories/?limit=1000").json()]
+    assert "Пакетная фабрика 1" not in names
+
+
+def test_bulk_create_factories_best_effort(client: TestClient):
+    """Тест пакетного создания фабрик в режиме best_effort."""
+    response = client.post(
+        "/factories/bulk?mode=best_effort",
+        json=[
+            {"name": "Пакетная фабрика А"},
+            {"name": "Пакетная фабрика А"},
+            {"name": "Пакетная фабрика Б"},
+        ]
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    assert [item["status"] for item in data["items"]] == ["created", "error", "created"]
+    created_id = data["items"][2]["id"]
+    assert client.get(f"/factories/{created_id}").json()["name"] == "Пакетная фабрика Б"
+
+
+def test_read_factories_conditional_get(client: TestClient, monkeypatch):
+    """Тест ETag списка фабрик: 304 без запросов к сущностям, новый тег после изменения."""
+    monkeypatch.setattr(settings, "db_stats_headers", True)
+    first = client.get("/factories/?limit=5")
+    etag = first.headers["ETag"]
+    assert first.status_code == status.HTTP_200_OK
+    assert first.headers["Last-Modified"]
+
+    cached = client.get("/factories/?limit=5", headers={"If-None-Match": etag})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+    assert cached.headers["X-DB-Queries"] == "1"
+
+    other_page = client.get("/factories/?limit=6", headers={"If-None-Match": etag})
+    assert other_page.status_code == status.HTTP_200_OK
+
+    client.post("/factories/", json={"name": "Фабрика ETag"})
+    changed = client.get("/factories/?limit=5", headers={"If-None-Match": etag})
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.headers["ETag"] != etag
+
+
+def test_read_factories_sorted_by_name_prefix(client: TestClient):
+    """Тест сортировки фабрик по наименованию с фильтром по его началу."""
+    for name in ("Префикс-Фабрика Б", "Префикс-Фабрика А", "Префикс-Фабрика В"):
+        client.post("/factories/", json={"name": name})
+    response = client.get("/factories/", params={"name_prefix": "Префикс-Фабрика", "sort": "name"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["name"] for item in response.json()] == [
+        "Префикс-Фабрика А", "Префикс-Фабрика Б", "Префикс-Фабрика В"
+    ]
+
+
+def test_factory_cascade_deactivate_and_activate(client: TestClient, monkeypatch):
+    """Тест каскадной деактивации и активации поддерева фабрики."""
+    monkeypatch.setattr(settings, "db_stats_headers", True)
+
+    def make_factory(name, sections_count, shared_section_id):
+        factory_id = client.post("/factories/", json={"name": name}).json()["id"]
+        section_ids = [
+            client.post(
+                "/sections/", json={"name": f"{name} участок {i}", "factory_id": factory_id}
+            ).json()["id"]
+            for i in range(sections_count)
+        ]
+        client.post("/equipment/bulk", json=[
+            {"name": f"{name} обор. {i}", "section_ids": [section_id]}
+            for i, section_id in enumerate(section_ids)
+        ])
+        shared = client.post(
+            "/equipment/",
+            json={"name": f"{name} общее обор.", "section_ids": [section_ids[0], shared_section_id]}
+        ).json()["id"]
+        return factory_id, shared
+
+    other_factory_id = client.post("/factories/", json={"name": "Фабрика Каскад Другая"}).json()["id"]
+    other_section_id = client.post(
+        "/sections/", json={"name": "Участок другой фабрики", "factory_id": other_factory_id}
+    ).json()["id"]
+    small_id, _ = make_factory("Фабрика Каскад Малая", 1, other_section_id)
+    factory_id, shared_id = make_factory("Фабрика Каскад", 5, other_section_id)
+
+    small = client.delete(f"/factories/{small_id}?cascade=true")
+    response = client.delete(f"/factories/{factory_id}?cascade=true")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "action": "deactivate", "entity_type": "factory", "entity_id": factory_id,
+        "factories": 1, "sections": 5, "equipment": 5
+    }
+    assert small.headers["X-DB-Queries"] == response.headers["X-DB-Queries"]
+    assert client.get(f"/factories/{factory_id}").status_code == status.HTTP_404_NOT_FOUND
+    parents = client.get(f"/hierarchy/?entity_type=equipment&entity_id={shared_id}").json()["parents"]
+    assert [(p["type"], p["id"]) for p in parents] == [("section", other_section_id), ("factory", other_factory_id)]
+
+    response = client.put(f"/factories/{factory_id}/activate?cascade=true")
+    assert response.status_code == status.HTTP_200_OK
+    assert (response.json()["sections"], response.json()["equipment"]) == (5, 5)
+    children = client.get(f"/hierarchy/?entity_type=factory&entity_id={factory_id}").json()["children"]
+    assert len(children) == 5
+    assert all(len(section["children"]) >= 1 for section in children)
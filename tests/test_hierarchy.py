@@ -1,6 +1,11 @@
 from fastapi.testclient import TestClient
 from fastapi import status
 
+from sqlalchemy import create_engine, text
+
+from app import crud
+from app.cache import LRUCache, VersionCoherence
+
 
 def test_get_hierarchy_for_factory(client: TestClient):
     """Тест получения иерархии для фабрики."""
@@ -84,4 +89,223 @@ def test_get_hierarchy_for_equipment(client: TestClient):
     assert data["parents"][0]["id"] == s_id
     assert data["parents"][1]["type"] == "factory"
     assert data["parents"][1]["id"] == f_id
-    assert len(data["children"]) == 0
\ No newline at end of file
+    assert len(data["children"]) == 0
+
+def test_hierarchy_query_count_independent_of_tree_size(client: TestClient, monkeypatch):
+    """Тест: число запросов иерархии фабрики не зависит от размера дерева."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "db_stats_headers", True)
+
+    small_id = client.post("/factories/", json={"name": "Малая фабрика иерархии"}).json()["id"]
+    s_id = client.post(
+        "/sections/", json={"name": "Малый участок", "factory_id": small_id}
+    ).json()["id"]
+    client.post("/equipment/", json={"name": "Малое обор. иерархии", "section_ids": [s_id]})
+
+    large_id = client.post("/factories/", json={"name": "Большая фабрика иерархии"}).json()["id"]
+    for i in range(5):
+        s_id = client.post(
+            "/sections/", json={"name": f"Большой участок {i}", "factory_id": large_id}
+        ).json()["id"]
+        for j in range(3):
+            client.post(
+                "/equipment/",
+                json={"name": f"Большое обор. иерархии {i}-{j}", "section_ids": [s_id]}
+            )
+
+    small = client.get(f"/hierarchy/?entity_type=factory&entity_id={small_id}")
+    large = client.get(f"/hierarchy/?entity_type=factory&entity_id={large_id}")
+    assert large.status_code == status.HTTP_200_OK
+    assert len(large.json()["children"]) == 5
+    assert all(len(s["children"]) == 3 for s in large.json()["children"])
+    assert small.headers["X-DB-Queries"] == large.headers["X-DB-Queries"]
+
+
+def test_get_hierarchy_not_found(client: TestClient):
+    """Тест получения иерархии несуществующей сущности."""
+    response = client.get("/hierarchy/?entity_type=section&entity_id=99999")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_stream_factory_forest(client: TestClient):
+    """Тест потоковой выгрузки дерева всех фабрик в NDJSON."""
+    import json
+
+    f_id = client.post("/factories/", json={"name": "Фабрика для NDJSON"}).json()["id"]
+    s_id = client.post(
+        "/sections/", json={"name": "Участок для NDJSON", "factory_id": f_id}
+    ).json()["id"]
+    e_id = client.post(
+        "/equipment/", json={"name": "Обор. для NDJSON", "section_ids": [s_id]}
+    ).json()["id"]
+
+    response = client.get("/hierarchy/forest?batch_size=2")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    factories = [json.loads(line) for line in response.text.splitlines()]
+    ids = [f["id"] for f in factories]
+    assert ids == sorted(ids)
+    factory = next(f for f in factories if f["id"] == f_id)
+    assert factory["type"] == "factory"
+    assert factory["children"][0]["id"] == s_id
+    assert factory["children"][0]["children"][0]["id"] == e_id
+
+
+def test_hierarchy_cache_hit_and_invalidation(client: TestClient):
+    """Тест кэша иерархии: повторный запрос из кэша, сброс после изменения."""
+    f_id = client.post("/factories/", json={"name": "Фабрика Кэш"}).json()["id"]
+    s_id = client.post(
+        "/sections/", json={"name": "Участок Кэш", "factory_id": f_id, "equipment_ids": []}
+    ).json()["id"]
+    e_id = client.post(
+        "/equipment/", json={"name": "Обор. Кэш", "section_ids": [s_id]}
+    ).json()["id"]
+
+    url = f"/hierarchy/?entity_type=equipment&entity_id={e_id}"
+    first = client.get(url)
+    before = client.get("/diagnostics/cache").json()
+    second = client.get(url)
+    after = client.get("/diagnostics/cache").json()
+    assert second.json() == first.json()
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+    # Переименование фабрики сбрасывает записи всего её поддерева
+    client.put(f"/factories/{f_id}", json={"name": "Фабрика Кэш Новая"})
+    parents = client.get(url).json()["parents"]
+    assert {"type": "factory", "id": f_id, "name": "Фабрика Кэш Новая"} in parents
+
+    # Отвязка оборудования от участка меняет детей участка
+    client.get(f"/hierarchy/?entity_type=section&entity_id={s_id}")
+    s2_id = client.post(
+        "/sections/", json={"name": "Участок Кэш 2", "factory_id": f_id, "equipment_ids": []}
+    ).json()["id"]
+    client.put(f"/equipment/{e_id}", json={"section_ids": [s2_id]})
+    section_data = client.get(f"/hierarchy/?entity_type=section&entity_id={s_id}").json()
+    assert section_data["children"] == []
+    assert client.get(url).json()["parents"][0]["id"] == s2_id
+
+
+def test_lru_cache_eviction_and_generation():
+    """Тест вытеснения LRU и отказа сохранять значение устаревшего поколения."""
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.put("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.stats()["evictions"] == 1
+
+    generation = cache.generation()
+    cache.invalidate(["a"])
+    assert cache.put("d", 4, generation=generation) is False
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_hierarchy_conditional_get(client: TestClient):
+    """Тест ETag иерархии: 304 до изменения связанных таблиц, 200 после."""
+    f_id = client.post("/factories/", json={"name": "Фабрика ETag Иерархия"}).json()["id"]
+    url = f"/hierarchy/?entity_type=factory&entity_id={f_id}"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == status.HTTP_304_NOT_MODIFIED
+    client.post("/sections/", json={"name": "Участок ETag", "factory_id": f_id, "equipment_ids": []})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["children"]) == 1
+
+
+def test_hierarchy_cache_sees_writes_of_other_processes(client: TestClient):
+    """Тест сброса кэша иерархии после записи другим процессом (через change_versions)."""
+    f_id = client.post("/factories/", json={"name": "Фабрика Другой Процесс"}).json()["id"]
+    url = f"/hierarchy/?entity_type=factory&entity_id={f_id}"
+    assert client.get(url).json()["entity_name"] == "Фабрика Другой Процесс"
+
+    other_process_engine = create_engine("sqlite:///./test_spravochniki.db")
+    try:
+        with other_process_engine.begin() as connection:
+            connection.execute(
+                text("UPDATE factories SET name = 'Фабрика Переименована Извне' WHERE id = :id"),
+                {"id": f_id}
+            )
+            connection.execute(
+                text("UPDATE change_versions SET version = version + 1 WHERE table_name = 'factories'")
+            )
+    finally:
+        other_process_engine.dispose()
+
+    assert client.get(url).json()["entity_name"] == "Фабрика Переименована Извне"
+
+
+def test_version_coherence_distinguishes_local_writes():
+    """Тест согласованности: свои записи не очищают кэш, чужие — очищают."""
+    cache = LRUCache(maxsize=10)
+    coherence = VersionCoherence([cache])
+    assert coherence.check({"factories": 1}) is True
+    cache.put("a", 1)
+
+    coherence.note_local_write({"factories": 2})
+    assert coherence.check({"factories": 2}) is False
+    assert cache.get("a") == (True, 1)
+
+    assert coherence.check({"factories": 4}) is True
+    assert cache.get("a") == (False, None)
+
+
+def _closure_snapshot():
+    """Возвращает строки таблицы замыканий и строки, вычисленные заново по данным."""
+    engine = create_engine("sqlite:///./test_spravochniki.db")
+    try:
+        with engine.connect() as connection:
+            stored = set(connection.execute(text(
+                "SELECT ancestor_type, ancestor_id, descendant_type, descendant_id, depth "
+                "FROM hierarchy_closure"
+            )))
+            expected = set()
+            for query in crud._closure_selects():
+                expected.update(tuple(row) for row in connection.execute(query))
+    finally:
+        engine.dispose()
+    return stored, expected
+
+
+def test_closure_table_follows_writes(client: TestClient):
+    """Тест согласованности таблицы замыканий после изменений структуры."""
+    f1 = client.post("/factories/", json={"name": "Фабрика Замыкания 1"}).json()["id"]
+    f2 = client.post("/factories/", json={"name": "Фабрика Замыкания 2"}).json()["id"]
+    s1 = client.post("/sections/", json={"name": "Участок З1", "factory_id": f1}).json()["id"]
+    s2 = client.post("/sections/", json={"name": "Участок З2", "factory_id": f1}).json()["id"]
+    e1 = client.post("/equipment/", json={"name": "Обор. З1", "section_ids": [s1, s2]}).json()["id"]
+    e2 = client.post("/equipment/", json={"name": "Обор. З2", "section_ids": [s2]}).json()["id"]
+    client.post("/sections/bulk", json=[{"name": "Участок З3", "factory_id": f2, "equipment_ids": [e1]}])
+
+    client.put(f"/sections/{s2}", json={"factory_id": f2, "equipment_ids": [e2]})
+    client.delete(f"/equipment/{e2}")
+    client.delete(f"/sections/{s1}")
+    client.put(f"/sections/{s1}/activate")
+    client.put(f"/equipment/{e2}/activate")
+
+    stored, expected = _closure_snapshot()
+    assert stored == expected
+    assert ("factory", f2, "equipment", e1, 2) in stored
+    assert ("section", s2, "equipment", e1, 1) not in stored
+
+    parents = client.get(f"/hierarchy/?entity_type=equipment&entity_id={e2}").json()["parents"]
+    assert [(p["type"], p["id"]) for p in parents] == [("section", s2), ("factory", f2)]
+
+
+def test_closure_table_follows_cascades(client: TestClient):
+    """Тест согласованности таблицы замыканий после каскадных изменений."""
+    f_id = client.post("/factories/", json={"name": "Фабрика Замыкания Каскад"}).json()["id"]
+    s_id = client.post("/sections/", json={"name": "Участок ЗК", "factory_id": f_id}).json()["id"]
+    client.post("/equipment/", json={"name": "Обор. ЗК", "section_ids": [s_id]})
+
+    client.delete(f"/factories/{f_id}?cascade=true")
+    stored, expected = _closure_snapshot()
+    assert stored == expected
+    assert not any(row[:2] == ("factory", f_id) for row in stored)
+
+    client.put(f"/factories/{f_id}/activate?cascade=true")
+    stored, expected = _closure_snapshot()
+    assert stored == expected
+    assert ("factory", f_id, "section", s_id, 1) in stored
@@ -0,0 +1,176 @@
+import io
+import json
+
+from fastapi.testclient import TestClient
+from fastapi import status
+
+from app import importer
+
+
+def test_import_sections_and_equipment_csv(client: TestClient):
+    """Тест импорта участков и оборудования из CSV со ссылками по наименованиям."""
+    client.post("/factories/", json={"name": "Фабрика для импорта"})
+
+    sections_csv = (
+        "name,factory\n"
+        "Импортный участок 1,Фабрика для импорта\n"
+        "Импортный участок 2,Фабрика для импорта\n"
+        "Импортный участок 3,Нет такой фабрики\n"
+    )
+    response = client.post(
+        "/import/section?chunk_size=2",
+        files={"file": ("sections.csv", sections_csv.encode(), "text/csv")}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["rows_total"] == 3
+    assert report["created"] == 2
+    assert report["errors"] == [
+        {"line": 4, "detail": 'Активная фабрика "Нет такой фабрики" не найдена.'}
+    ]
+
+    equipment_csv = (
+        "name,description,sections\n"
+        "Импортное обор. 1,Станок,Фабрика для импорта/Импортный участок 1\n"
+        "Импортное обор. 2,,Фабрика для импорта/Импортный участок 1;"
+        "Фабрика для импорта/Импортный участок 2\n"
+    )
+    response = client.post(
+        "/import/equipment",
+        files={"file": ("equipment.csv", equipment_csv.encode(), "text/csv")}
+    )
+    assert response.json()["created"] == 2
+
+    hierarchy = client.get(
+        "/hierarchy/?entity_type=equipment&entity_id="
+        + str(client.get("/equipment/?limit=1000").json()[-1]["id"])
+    ).json()
+    assert [p["name"] for p in hierarchy["parents"] if p["type"] == "section"] == [
+        "Импортный участок 1", "Импортный участок 2"
+    ]
+
+
+def test_import_factories_ndjson_reports_row_errors(client: TestClient):
+    """Тест импорта фабрик из NDJSON с ошибками в отдельных строках."""
+    lines = [
+        json.dumps({"name": "Импортная фабрика А"}),
+        "{not json",
+        json.dumps({"name": "Импортная фабрика А"}),
+        json.dumps({"title": "Без наименования"}),
+    ]
+    response = client.post(
+        "/import/factory",
+        files={"file": ("factories.ndjson", "\n".join(lines).encode(), "application/x-ndjson")}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["created"] == 1
+    assert report["failed"] == 3
+    assert [error["line"] for error in report["errors"]] == [2, 3, 4]
+
+
+def test_import_equipment_section_refs_with_slash_in_names(client: TestClient):
+    """Тест: ссылки на участки находятся, даже если наименования содержат "/"."""
+    f_id = client.post("/factories/", json={"name": "Фабрика А/Б импорта"}).json()["id"]
+    s_id = client.post("/sections/", json={"name": "Цех 1/2", "factory_id": f_id}).json()["id"]
+    equipment_csv = (
+        "name,sections\n"
+        "Обор. со слэшем,Фабрика А/Б импорта/Цех 1/2\n"
+        "Обор. без участка,Фабрика А/Б импорта/Цех 3\n"
+    )
+    response = client.post(
+        "/import/equipment",
+        files={"file": ("equipment.csv", equipment_csv.encode(), "text/csv")}
+    )
+    report = response.json()
+    assert report["created"] == 1
+    assert report["errors"] == [
+        {"line": 3, "detail": "Активные участки ['Фабрика А/Б импорта/Цех 3'] не найдены."}
+    ]
+    section = client.get(f"/sections/{s_id}").json()
+    assert [eq["name"] for eq in section["equipment"]] == ["Обор. со слэшем"]
+
+
+def test_import_sections_with_equipment_ids(client: TestClient):
+    """Тест импорта участков с привязкой оборудования по ID."""
+    f_id = client.post("/factories/", json={"name": "Фабрика импорта связей"}).json()["id"]
+    e_ids = [
+        client.post("/equipment/", json={"name": f"Обор. импорта связей {i}"}).json()["id"]
+        for i in range(2)
+    ]
+    sections_csv = (
+        "name,factory_id,equipment_ids\n"
+        f"Участок со связями,{f_id},{e_ids[0]};{e_ids[1]}\n"
+        f"Участок с ошибкой,{f_id},abc\n"
+    )
+    response = client.post(
+        "/import/section",
+        files={"file": ("sections.csv", sections_csv.encode(), "text/csv")}
+    )
+    report = response.json()
+    assert report["created"] == 1
+    assert report["errors"] == [
+        {"line": 3, "detail": 'Поле "equipment_ids" должно быть целым числом, получено "abc".'}
+    ]
+    response = client.post(
+        "/import/section",
+        files={"file": ("sections.csv", f"name,factory_id\nУчасток с большим ID,{2 ** 63}\n".encode(), "text/csv")}
+    )
+    assert response.json()["errors"] == [
+        {"line": 2, "detail": "Некорректные значения полей: factory_id."}
+    ]
+    section = client.get("/sections/", params={"factory_id": f_id}).json()[0]
+    assert sorted(eq["id"] for eq in section["equipment"]) == e_ids
+
+
+def test_import_rejects_blank_names(client: TestClient):
+    """Тест: строки с пустым или состоящим из пробелов наименованием не импортируются."""
+    equipment_csv = (
+        "name,description,sections\n"
+        ",Без имени,\n"
+        "   ,Пробелы,\n"
+        "Импортное обор. с именем,,\n"
+    )
+    response = client.post(
+        "/import/equipment",
+        files={"file": ("equipment.csv", equipment_csv.encode(), "text/csv")}
+    )
+    report = response.json()
+    assert report["created"] == 1
+    assert report["errors"] == [
+        {"line": 2, "detail": "Некорректные значения полей: name."},
+        {"line": 3, "detail": "Некорректные значения полей: name."},
+    ]
+
+
+def test_import_unknown_format(client: TestClient):
+    """Тест импорта файла неизвестного формата."""
+    response = client.post(
+        "/import/factory",
+        files={"file": ("factories.xlsx", b"data", "application/octet-stream")}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_import_rejects_non_utf8_before_first_chunk(client: TestClient):
+    """Тест: файл с некорректными байтами отклоняется целиком, даже после первой порции."""
+    factories_ndjson = (
+        '{"name": "Фабрика до ошибки кодировки"}\n'.encode()
+        + '{"name": "Фабрика в cp1251"}\n'.encode('cp1251')
+    )
+    response = client.post(
+        "/import/factory",
+        params={"chunk_size": 1},
+        files={"file": ("factories.ndjson", factories_ndjson, "application/x-ndjson")}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "в строке 2" in response.json()["detail"]
+    names = [f["name"] for f in client.get("/factories/", params={"limit": 1000}).json()]
+    assert "Фабрика до ошибки кодировки" not in names
+
+
+def test_find_invalid_utf8_line_across_blocks():
+    """Тест: номер строки определяется и для символа, разрезанного границей блока."""
+    data = "строка\n".encode() * 3 + b"\xff\n"
+    assert importer.find_invalid_utf8_line(io.BytesIO(data), block_size=3) == 4
+    assert importer.find_invalid_utf8_line(io.BytesIO("ж\nж".encode()), block_size=1) is None
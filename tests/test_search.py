@@ -0,0 +1,104 @@
+from fastapi.testclient import TestClient
+from fastapi import status
+
+from app import crud
+
+
+def _found(response) -> set:
+    return {(item["entity_type"], item["id"]) for item in response.json()}
+
+
+def test_search_prefix_across_entity_types(client: TestClient):
+    """Тест поиска по началу слова среди фабрик, участков и оборудования."""
+    f_id = client.post("/factories/", json={"name": "Фабрика Квазарпоиск"}).json()["id"]
+    s_id = client.post(
+        "/sections/", json={"name": "Участок Квазарпоиск", "factory_id": f_id}
+    ).json()["id"]
+    e_id = client.post(
+        "/equipment/", json={"name": "Пресс Квазарпоиск", "section_ids": [s_id]}
+    ).json()["id"]
+
+    response = client.get("/search/", params={"q": "квазар"})
+    assert response.status_code == status.HTTP_200_OK
+    assert _found(response) == {("factory", f_id), ("section", s_id), ("equipment", e_id)}
+
+    response = client.get("/search/", params={"q": "квазар", "entity_type": ["section", "equipment"]})
+    assert _found(response) == {("section", s_id), ("equipment", e_id)}
+
+    response = client.get("/search/", params={"q": "квазар", "prefix": False})
+    assert response.json() == []
+
+
+def test_search_ranks_name_above_description(client: TestClient):
+    """Тест: совпадение в наименовании оборудования релевантнее совпадения в описании."""
+    in_description = client.post(
+        "/equipment/",
+        json={"name": "Станок Рангтест Б", "description": "Резервный гидронасос линии"}
+    ).json()["id"]
+    in_name = client.post(
+        "/equipment/", json={"name": "Гидронасос Рангтест А"}
+    ).json()["id"]
+
+    response = client.get("/search/", params={"q": "рангтест гидронас"})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [item["id"] for item in data] == [in_name, in_description]
+    assert data[0]["score"] == 1.0
+    assert 0 < data[1]["score"] < 1.0
+    assert data[1]["description"] == "Резервный гидронасос линии"
+
+
+def test_search_score_is_normalised_per_entity_type(client: TestClient):
+    """Тест: лучшее совпадение каждого типа получает score 1.0 и идёт первым."""
+    f_id = client.post("/factories/", json={"name": "Фабрика Нормтест"}).json()["id"]
+    s_id = client.post(
+        "/sections/", json={"name": "Участок Нормтест", "factory_id": f_id}
+    ).json()["id"]
+    best_id = client.post(
+        "/equipment/", json={"name": "Нормтест", "section_ids": [s_id]}
+    ).json()["id"]
+    client.post(
+        "/equipment/",
+        json={"name": "Пресс", "description": "Линия нормтест резервная длинное описание", "section_ids": [s_id]}
+    )
+
+    data = client.get("/search/", params={"q": "нормтест"}).json()
+    assert {(item["entity_type"], item["id"]) for item in data[:3]} == {
+        ("factory", f_id), ("section", s_id), ("equipment", best_id)
+    }
+    assert [item["score"] for item in data[:3]] == [1.0, 1.0, 1.0]
+    assert 0 < data[3]["score"] < 1.0
+
+
+def test_search_index_follows_writes(client: TestClient):
+    """Тест синхронизации индекса с переименованием и деактивацией."""
+    e_id = client.post("/equipment/", json={"name": "Ёмкость Синхротест"}).json()["id"]
+    assert _found(client.get("/search/", params={"q": "ЁМКОСТЬ синхро"})) == {("equipment", e_id)}
+
+    client.put(f"/equipment/{e_id}", json={"name": "Бак Синхротест"})
+    assert client.get("/search/", params={"q": "ёмкость синхро"}).json() == []
+    assert _found(client.get("/search/", params={"q": "бак синхро"})) == {("equipment", e_id)}
+
+    client.delete(f"/equipment/{e_id}")
+    assert client.get("/search/", params={"q": "бак синхро"}).json() == []
+    response = client.get("/search/", params={"q": "бак синхро", "include_inactive": True})
+    assert _found(response) == {("equipment", e_id)}
+
+
+def test_search_pagination(client: TestClient):
+    """Тест постраничной выдачи результатов поиска."""
+    for i in range(5):
+        client.post("/equipment/", json={"name": f"Датчик Страничтест {i}"})
+    first = client.get("/search/", params={"q": "страничтест", "limit": 3}).json()
+    second = client.get("/search/", params={"q": "страничтест", "skip": 3, "limit": 3}).json()
+    assert len(first) == 3
+    assert len(second) == 2
+    assert not {item["id"] for item in first} & {item["id"] for item in second}
+
+
+def test_search_query_syntax_is_escaped(client: TestClient):
+    """Тест: операторы FTS5 в запросе воспринимаются как обычный текст."""
+    response = client.get("/search/", params={"q": 'NEAR( "OR * -'})
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get("/search/", params={"q": "***"}).json() == []
+    assert crud.build_search_match('насос "OR" д*') == '"насос"* "OR"* "д"*'
@@ -191,3 +191,193 @@ def test_soft_delete_section_with_dependent_equipment(client: TestClient):
     assert response.status_code == status.HTTP_409_CONFLICT
     assert "активное оборудование" in response.json()["detail"]
     assert "без других активных участков" in response.json()["detail"]
+
+
+def test_bulk_create_sections(client: TestClient):
+    """Тест пакетного создания участков с проверкой фабрики и дубликатов."""
+    factory_id = client.post(
+        "/factories/", json={"name": "Фабрика для пакета участков"}
+    ).json()["id"]
+    response = client.post(
+        "/sections/bulk",
+        json=[
+            {"name": "Пакетный участок 1", "factory_id": factory_id},
+            {"name": "Пакетный участок 2", "factory_id": factory_id},
+        ]
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["created"] == 2
+
+    response = client.post(
+        "/sections/bulk?mode=best_effort",
+        json=[
+            {"name": "Пакетный участок 1", "factory_id": factory_id},
+            {"name": "Пакетный участок 3", "factory_id": 99999},
+        ]
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    items = response.json()["items"]
+    assert "уже существует" in items[0]["detail"]
+    assert "Активная фабрика" in items[1]["detail"]
+
+
+def test_bulk_create_sections_rejects_out_of_range_ids(client: TestClient):
+    """Тест: ID вне диапазона INTEGER SQLite отклоняются при проверке тела запроса."""
+    factory_id = client.post(
+        "/factories/", json={"name": "Фабрика для пакета с большими ID"}
+    ).json()["id"]
+    for mode in ("all_or_nothing", "best_effort"):
+        for item in (
+            {"name": "Участок с большой фабрикой", "factory_id": 2 ** 63},
+            {"name": "Участок с большим обор.", "factory_id": factory_id, "equipment_ids": [2 ** 63]},
+        ):
+            response = client.post(f"/sections/bulk?mode={mode}", json=[item])
+            assert response.status_code == 422
+    response = client.post(
+        "/equipment/bulk", json=[{"name": "Обор. с большим участком", "section_ids": [2 ** 63]}]
+    )
+    assert response.status_code == 422
+    assert client.get("/sections/", params={"factory_id": factory_id}).json() == []
+
+
+def test_soft_delete_section_query_count(client: TestClient, monkeypatch):
+    """Тест: проверка зависимого оборудования не зависит от его количества."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "db_stats_headers", True)
+
+    factory_id = client.post(
+        "/factories/", json={"name": "Фабрика для проверки удаления участков"}
+    ).json()["id"]
+
+    def make_section(name, equipment_count, backup_section_id=None):
+        section_id = client.post(
+            "/sections/", json={"name": name, "factory_id": factory_id}
+        ).json()["id"]
+        section_ids = [section_id] if backup_section_id is None else [section_id, backup_section_id]
+        client.post("/equipment/bulk", json=[
+            {"name": f"{name} обор. {i}", "section_ids": section_ids}
+            for i in range(equipment_count)
+        ])
+        return section_id
+
+    backup_id = client.post(
+        "/sections/", json={"name": "Резервный участок", "factory_id": factory_id}
+    ).json()["id"]
+    small = client.delete(f"/sections/{make_section('Участок 1 обор.', 1, backup_id)}")
+    large = client.delete(f"/sections/{make_section('Участок 40 обор.', 40, backup_id)}")
+    assert small.status_code == large.status_code == status.HTTP_200_OK
+    assert small.headers["X-DB-Queries"] == large.headers["X-DB-Queries"]
+
+    small = client.delete(f"/sections/{make_section('Участок 1 обор. без резерва', 1)}")
+    large = client.delete(f"/sections/{make_section('Участок 40 обор. без резерва', 40)}")
+    assert small.status_code == large.status_code == status.HTTP_409_CONFLICT
+    assert "обор. без резерва обор. 39" in large.json()["detail"]
+    assert small.headers["X-DB-Queries"] == large.headers["X-DB-Queries"]
+
+
+def test_section_cascade_deactivate_and_activate(client: TestClient):
+    """Тест каскадной деактивации участка с зависимым оборудованием и обратной активации."""
+    factory_id = client.post("/factories/", json={"name": "Фабрика каскада участка"}).json()["id"]
+    section_id = client.post(
+        "/sections/", json={"name": "Участок каскада", "factory_id": factory_id}
+    ).json()["id"]
+    other_id = client.post(
+        "/sections/", json={"name": "Участок каскада другой", "factory_id": factory_id}
+    ).json()["id"]
+    only_here = client.post(
+        "/equipment/", json={"name": "Обор. только здесь", "section_ids": [section_id]}
+    ).json()["id"]
+    shared = client.post(
+        "/equipment/", json={"name": "Обор. общее каскад", "section_ids": [section_id, other_id]}
+    ).json()["id"]
+
+    assert client.delete(f"/sections/{section_id}").status_code == status.HTTP_409_CONFLICT
+    response = client.delete(f"/sections/{section_id}?cascade=true")
+    assert response.status_code == status.HTTP_200_OK
+    assert (response.json()["sections"], response.json()["equipment"]) == (1, 1)
+    assert client.get(f"/equipment/{only_here}").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(f"/equipment/{shared}").json()["sections"] == [
+        {"id": other_id, "name": "Участок каскада другой"}
+    ]
+
+    response = client.put(f"/sections/{section_id}/activate?cascade=true")
+    assert response.status_code == status.HTTP_200_OK
+    assert (response.json()["sections"], response.json()["equipment"]) == (1, 1)
+    assert client.get(f"/equipment/{only_here}").status_code == status.HTTP_200_OK
+    assert client.put(f"/sections/{section_id}/activate?cascade=true").status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_section_cascade_activate_invalidates_sibling_hierarchy(client: TestClient):
+    """Тест: каскадная активация сбрасывает кэш иерархии других участков оборудования."""
+    factory_id = client.post("/factories/", json={"name": "Фабрика кэша каскада"}).json()["id"]
+    s1, s2 = [
+        client.post(
+            "/sections/", json={"name": f"Участок кэша каскада {i}", "factory_id": factory_id}
+        ).json()["id"]
+        for i in range(2)
+    ]
+    equipment_id = client.post(
+        "/equipment/", json={"name": "Обор. кэша каскада", "section_ids": [s1, s2]}
+    ).json()["id"]
+    assert client.delete(f"/sections/{s2}?cascade=true").status_code == status.HTTP_200_OK
+    assert client.delete(f"/equipment/{equipment_id}").status_code == status.HTTP_200_OK
+
+    def children(entity_type: str, entity_id: int) -> list:
+        response = client.get(f"/hierarchy/?entity_type={entity_type}&entity_id={entity_id}")
+        return [child["id"] for child in response.json()["children"]]
+
+    # Прогрев кэша иерархии соседнего участка
+    assert children("section", s1) == []
+
+    response = client.put(f"/sections/{s2}/activate?cascade=true")
+    assert response.json()["equipment"] == 1
+    assert children("section", s1) == [equipment_id]
+
+
+def test_bulk_deactivate_sections_checks_dependencies_set_wise(client: TestClient):
+    """Тест: правила зависимостей проверяются для всего набора участков."""
+    factory_id = client.post("/factories/", json={"name": "Фабрика пакетной деактивации"}).json()["id"]
+    s1, s2, s3 = [
+        client.post(
+            "/sections/", json={"name": f"Участок пакетной деактивации {i}", "factory_id": factory_id}
+        ).json()["id"]
+        for i in range(3)
+    ]
+    client.post("/equipment/", json={"name": "Обор. двух участков", "section_ids": [s1, s2]})
+
+    response = client.post("/sections/bulk/deactivate?mode=best_effort", json=[s1, s2, s3])
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert results[str(s1)]["status"] == results[str(s2)]["status"] == "conflict"
+    assert "Обор. двух участков" in results[str(s1)]["detail"]
+    assert results[str(s3)]["status"] == "deactivated"
+
+    response = client.post("/sections/bulk/deactivate", json=[s1])
+    assert response.json()["results"][str(s1)]["status"] == "deactivated"
+    response = client.post("/sections/bulk/activate", json=[s1, s3])
+    assert response.json()["changed"] == 2
+
+
+def test_read_sections_filters(client: TestClient):
+    """Тест фильтров списка участков по фабрике и привязанному оборудованию."""
+    factory_id = client.post("/factories/", json={"name": "Фабрика Фильтр Участков"}).json()["id"]
+    other_factory_id = client.post("/factories/", json={"name": "Фабрика Фильтр Участков 2"}).json()["id"]
+    section_ids = [
+        client.post(
+            "/sections/", json={"name": f"Участок Фильтра {i}", "factory_id": factory_id}
+        ).json()["id"]
+        for i in range(3)
+    ]
+    client.post("/sections/", json={"name": "Участок Фильтра 9", "factory_id": other_factory_id})
+    equipment_id = client.post(
+        "/equipment/", json={"name": "Обор. Фильтр Участков", "section_ids": section_ids[1:]}
+    ).json()["id"]
+
+    by_factory = client.get("/sections/", params={"factory_id": factory_id, "sort": "-id"})
+    assert [item["id"] for item in by_factory.json()] == section_ids[::-1]
+    by_equipment = client.get("/sections/", params={"equipment_id": equipment_id})
+    assert [item["id"] for item in by_equipment.json()] == section_ids[1:]
+    combined = client.get(
+        "/sections/", params={"factory_id": factory_id, "name_prefix": "Участок Фильтра 1"}
+    )
+    assert [item["id"] for item in combined.json()] == [section_ids[1]]
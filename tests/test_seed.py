@@ -0,0 +1,50 @@
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.seed import SeedConfig, seed_database, upgrade_schema
+
+
+def test_seed_database_builds_consistent_dataset(tmp_path):
+    """Тест генерации данных: связи в пределах фабрики, индексы поиска, замыкания и версии."""
+    database_url = f"sqlite:///{tmp_path / 'seed.db'}"
+    upgrade_schema(database_url)
+    engine = create_engine(database_url)
+    config = SeedConfig(factories=3, sections=30, equipment=200, links_per_equipment=2, seed=7)
+    try:
+        with Session(engine) as db:
+            versions_before = crud.get_change_versions(db)
+            report = seed_database(db, config)
+            assert report["factories"] == 3
+            assert report["sections"] == 30
+            assert report["equipment"] == 200
+            assert report["links"] == 400
+
+            # Все участки одной единицы оборудования принадлежат одной фабрике
+            factories_per_equipment = db.execute(
+                select(func.count(models.Section.factory_id.distinct()))
+                .join(models.section_equipment_association_table)
+                .group_by(models.section_equipment_association_table.c.equipment_id)
+            ).scalars().all()
+            assert set(factories_per_equipment) == {1}
+
+            # Триггеры поиска восстановлены, индекс перестроен
+            triggers = db.execute(text(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'equipment_fts_%'"
+            )).scalar()
+            assert triggers == 3
+            first = db.get(models.Equipment, 1)
+            results = crud.search_entities(db, first.name.split()[-1], entity_types=["equipment"])
+            assert results[0].id == first.id
+
+            hierarchy = crud.build_entity_hierarchy(db, "equipment", first.id)
+            assert sorted(p.type for p in hierarchy.parents) == ["factory", "section", "section"]
+            assert report["closure_rows"] > report["links"]
+            versions_after = crud.get_change_versions(db)
+            assert all(versions_after[t] > versions_before[t] for t in versions_before)
+
+            # Повторная генерация с тем же seed дополняет данные новыми ID
+            report = seed_database(db, config)
+            assert db.execute(select(func.count(models.Equipment.id))).scalar() == 400
+    finally:
+        engine.dispose()